@@ -0,0 +1,156 @@
+import itertools
+import random
+import time
+
+"""
+    :module:: accusation
+    :platform: Unix, Windows
+    :synopsis: Estimating which cards are in the envelope and deciding when to accuse.
+
+"""
+
+
+def envelope_probabilities(pad, player_id, categories, time_limit, max_samples=2000, rng=random, weights=None):
+    """
+    Estimate the probability of each hypothesis about the envelope from what is marked on a player's pad.
+
+    A hypothesis is one unknown card from each category. Hypotheses are sampled in proportion to the product of the
+    weights of their cards and, for each sample, the remaining unknown cards are dealt at random to the other
+    players. A sample is kept when the deal gives every player at least one card of each of their c2 groups (see
+    auto.pad.Pad.c2_groups). The probability of a hypothesis is its share of the samples kept. If no sample is kept,
+    the probability of a hypothesis is its share of the weights.
+
+    :param pad: the auto.pad.Pad of the player
+    :param player_id: id of the player whose pad it is. The player's own cards are all known.
+    :param categories: the cards of each category, such as suspects, weapons and rooms <list<set<string>>>
+    :param time_limit: seconds the estimate can take. Sampling stops when the slowest sample so far wouldn't fit in
+    the time left <float>
+    :param max_samples: the most samples to take <int>
+    :param rng: the random number generator to sample with
+    :param weights: the prior weight of each card as an envelope card, such as auto.pad.Pad.envelope_weights.
+    Defaults to every card having the same weight <dict<string:float>>
+    :rtype : dict<frozenset<string>:float>
+    :return: the probability of each hypothesis with a probability above zero
+    """
+    deadline = time.perf_counter() + time_limit
+
+    unknown = pad.unknown_cards()
+    hypotheses = list(itertools.product(*[sorted(unknown.intersection(category)) for category in categories]))
+
+    if len(hypotheses) <= 1:
+        return {frozenset(hypothesis): 1.0 for hypothesis in hypotheses}
+
+    prior = [_product(weights[card] for card in hypothesis) if weights else 1.0 for hypothesis in hypotheses]
+
+    others = [player for player in pad.players_list if player != player_id]
+
+    # groups that already have a card marked in c1 for the same player need no checking
+    groups = [(player, group) for player in others for group in pad.c2_groups(player)
+              if not any(pad.has_card(player, card) for card in group)]
+
+    counts = dict.fromkeys(hypotheses, 0)
+    samples = 0
+
+    # the clock is read once per sample. A sample is only started if the slowest one so far would still finish in
+    # time, so a sample slowed down by a busy CPU stops the sampling early instead of overrunning the time limit
+    now = time.perf_counter()
+    slowest = 0.0
+
+    while samples < max_samples and now + slowest < deadline:
+        samples += 1
+        hypothesis = rng.choices(hypotheses, prior)[0]
+
+        # deal the unknown cards that aren't in the envelope to the other players
+        holders = {card: rng.choice(others) for card in unknown if card not in hypothesis}
+
+        if all(any(holders.get(card) == player for card in group) for player, group in groups):
+            counts[hypothesis] += 1
+
+        previous, now = now, time.perf_counter()
+        slowest = max(slowest, now - previous)
+
+    kept = sum(counts.values())
+    if not kept:
+        total = sum(prior)
+        return {frozenset(hypothesis): weight / total for hypothesis, weight in zip(hypotheses, prior)}
+
+    return {frozenset(hypothesis): count / kept for hypothesis, count in counts.items() if count}
+
+
+class AccusationPolicy:
+    """
+    Decides when a computer player accuses. Without a policy, a player only accuses when exactly three cards are
+    unknown. With a policy, the player accuses the most likely hypothesis about the envelope once its probability
+    reaches a threshold or once the expected number of turns to be certain goes over a budget.
+
+    """
+
+    def __init__(self, threshold=0.9, turn_budget=None, time_limit=0.01, max_samples=2000, seed=None):
+        """
+        :param threshold: the probability of the most likely hypothesis at which to accuse <float>
+        :param turn_budget: the expected number of turns to certainty at which to accuse the most likely hypothesis
+        anyway, or None to only use the threshold <int>
+        :param time_limit: seconds the probability estimate can take on each call <float>
+        :param max_samples: the most samples taken for the estimate <int>
+        :param seed: seed for the random number generator used for sampling
+        """
+        self.threshold = threshold
+        self.turn_budget = turn_budget
+        self.time_limit = time_limit
+        self.max_samples = max_samples
+        self._random = random.Random(seed)
+
+    def decide(self, pad, player_id, categories):
+        """
+        :param pad: the auto.pad.Pad of the player
+        :param player_id: id of the player whose pad it is
+        :param categories: the cards of each category, such as suspects, weapons and rooms <list<set<string>>>
+        :rtype : set<string>
+        :return: the cards to accuse, or None if it isn't time to accuse
+        """
+        # the suggestions of the other players weigh the hypotheses (see auto.pad.Pad.envelope_weights)
+        probabilities = envelope_probabilities(pad, player_id, categories, self.time_limit, self.max_samples,
+                                               self._random, pad.envelope_weights(player_id))
+        if not probabilities:
+            return None
+
+        hypothesis, probability = max(probabilities.items(), key=lambda item: item[1])
+
+        if probability >= self.threshold or \
+                (self.turn_budget is not None and self.expected_turns(pad, categories) > self.turn_budget):
+            return set(hypothesis)
+
+    def set_random_state(self, state):
+        """
+        :param state: the state of the random number generator used for sampling, from random.Random.getstate
+        """
+        self._random.setstate(state)
+
+    @staticmethod
+    def expected_turns(pad, categories):
+        """
+        Estimate the turns needed to be certain of the envelope. Each suggestion shows this player at most one
+        card, so every unknown card outside the envelope takes about one turn to find.
+
+        :rtype : int
+        """
+        return max(0, len(pad.unknown_cards()) - len(categories))
+
+
+def decide_in_executor(policy, pad, player_id, categories):
+    """
+    Decide with a policy in an executor. A process executor decides with a copy of the policy, so the state of the
+    copy's random number generator is returned for the caller to carry over (see AccusationPolicy.set_random_state).
+
+    :rtype : tuple<set<string>, tuple>
+    :return: the cards to accuse or None, and the state of the policy's random number generator
+    """
+    return policy.decide(pad, player_id, categories), policy._random.getstate()
+
+
+def _product(values):
+    result = 1.0
+    for value in values:
+        result *= value
+
+    return result
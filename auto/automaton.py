@@ -1 +1,1110 @@
-import randomimport itertoolsfrom auto.board import Boardfrom auto.pad import Padimport numpy as np"""    :module:: automaton    :platform: Unix, Windows    :synopsis: The AI/Computer Player object for the game of Clue-Less.    :moduleauthor: Ethan Wilansky, Shambhavi Sanskrit and Henoke Shiferaw"""class Player:    """    The player class to be instantiated for each requested Clue-Less computer/AI player    """    _board = Board()    # _player_count class variable enforces the maximum # of players allowed. See IndexError in constructor    _player_count = 0    def __init__(self, player_id, available_suspects_list, total_players):        """        Instantiate a player for the game and provided that the upper-limit of        allowed players has not been reached.        :param player_id: the id assigned to this player by the caller (p01 - p06)        :param available_suspects_list [list <string>]        :param total_players: int        :var            class vars:            _board: networkx.Graph            _player_count: int            instance vars:            _selected_suspect: string            _location: string            _prior_moves: set<string>            _prior_moves_stack: stack<string>            _is_move_from_suggest: bool            _pad: dictionary<auto.PlayerMatrix            player_id: string        :raise            IndexError if player count > 5        """        # the total number of allowed computer players        if self._player_count <= 5:            # add to the player count so server knows # active autonomous player            self._player_count += 1            # instance variables needed for game play            self._selected_suspect = self._get_player(available_suspects_list)            # to start, the _location is the starting position for this player based on selected suspect            self._location = self._get_starting_location(self._selected_suspect)            # prior moves set will initially contain just the starting position for this player            self._prior_moves = {self._location}            # this stack is used for tracking in exactly what order moves were taken. This is important for            # managing failed moves and knowing the order of prior moves. The set functionality in _prior_moves            # is important and separate of this since Python does not support stack capabilities on sets            self._prior_moves_stack = [self._location]            # if this player is moved as a result of a suggestion, then this player should make a suggestion from            # this room before leaving it. This will get set to true, if the room is not part of _prior_moves when            # position information is sent in the update function.            self._is_move_from_suggest = False            # create a player _pad for this player with the total number of players specified            self._pad = Pad(total_players)            # get the cards for various private functions            self._cards = self._pad.get_player_table(player_id).axes[0].tolist()            self.player_id = player_id        else:            raise IndexError('no more than 5 computer players allowed')    def receive_cards(self, dealt_cards):        """        Receive a set of cards from the dealer and store them.        :param dealt_cards: list        :return:  dealt cards        :rtype: list<str>        :raise:            IndexError if # of cards not between 3 and 6            ValueError if cards dealt are not in Cards data structure        """        # if 3 <= len(dealt_cards) <= 6:        # self.dealt_cards = dealt_cards        # else:        if not 3 <= len(dealt_cards) <= 6:            raise IndexError('the number of cards dealt, must be between 3 and 6')        for card in dealt_cards:            verified = self._verify_card(card)            if not verified:                raise ValueError('the card {0} is not valid'.format(card))        self._mark_my_cards_on_pad(dealt_cards)    def update(self, game_state):        """        The central controller responsible for receiving and responding to game states from a caller.        :param game_state: a dictionary containing a variety of game states that a caller (server) can send.        game state schema:            player locations:                                {'position': {player_id<str>:location<str>, ...}}            move acknowledgement:                                {'move_made': <bool>}            suggestion sent to each player to respond:                                {'suggestion': {'from_player': player_id<str>},                                                'cards': {card<str>, card<str>, card<str>}}            ack move & player with card (directed response):                                {'move_made': <bool>, 'answer': {'from_player': player_id<str>, 'card': card<str>}}            ack no players with suggested cards (response sent to asking player (directed answer):                                {'move_made': <bool>, 'answer': 'no_match'}            ack player with card sent to all players except the asking player (undirected answer):                                {'answer': {'from_player': player_id<str>, 'has_card': True},                                'cards': {card<str>, card<str>, card<str>}}}            ack no players with suggested cards (response sent to all players except asking player):                                {'answer': 'no_match', 'cards': {card<str>, card<str>, card<str>}            ack move and win/lose:                                {'move_made': <bool>, 'answer': {'win' <bool>}}            ack game over:                                {'game_over': <bool>, 'winning_player: player_id<str>}        :return: a dictionary response to the game state sent by the caller        return schema:            player move:                                {'move': location<str>}            turn complete ack:                                {'turn_complete': <bool>}            player move & suggest:                                {'move': location<str>, 'suggestion': {'from_player': player_id<str>},                                                                       'cards': {card<str>, card<str>, card<str>}}            player has card:                                {'card': card<str>}            player move & accuse:                                {'move': location<str>, 'accusation': {'from_player': player_id<str>},                                                                       'cards': {card<str>, card<str>, card<str>}}        """        # use case: The caller (server) sends a position update to each player. This player checks to see if        # the position is their current position and, if not, adds position to prior_moves        if 'positions' in game_state:            player_position = game_state['positions'][self.player_id]            if not self._prior_moves.issubset(player_position):                self._prior_moves.add(player_position)                self._prior_moves_stack.append(player_position)                self._location = player_position        # use case: The caller (server) sends an update and directs the question to one of the players in each update.        # The caller knows the player order and therefore the order in which the suggestion should be asked.        elif 'suggestion' in game_state:            if self._selected_suspect in game_state['suggestion']['cards']:                # sets flag indicating a forced move to a room as a result of another player making this suggestion                self._is_move_from_suggest = True            # this player answers whether they have a match in their cards            return self._answer(game_state['suggestion']['cards'])        # all players acknowledge an undirected answer about a player having at least one of the suggested cards        elif 'answer' in game_state and 'cards' in game_state:            # manage the pad based on the information provided by the undirected response            self._mark_pad(game_state)            return {'acknowledged': True}        # use case: One of the players responded to the caller (server) with an answer. The caller takes the        # answer and sends an update to the autonomous player who made the original suggestion.        elif 'answer' in game_state:            accusation = self._mark_pad(game_state)            if not accusation:                return {'turn_complete': True}            else:                return {'accusation': {'from_player': self.player_id, 'cards': accusation}, 'turn_complete': True}        # use case: The caller (server) acknowledges to the player who just moved that the move was successful.        # If the code lands on this condition, the player taking a turn must have moved to a hallway because no        # suggestion or accusation was made. Therefore, the only option then is for this autonomous player to return        # that they have completed their move.        elif 'move_made' in game_state and game_state['move_made']:            return {'turn_complete': True}        # The server claims the move was unsuccessful. For now, assume that there is no where else to move and end        # the turn. This is probably not even an edge case since the Player code will not attempt to move to a blocked        # position        elif 'move_made' in game_state and not game_state['move_made']:            # get the last move from the stack            last_move = self._prior_moves_stack.pop()            self._location = last_move            self._prior_moves.remove(last_move)            return {'turn_complete': True}        else:            return    def take_turn(self, game_state):        # move block        """        Take a turn given the game state.        :param game_state: dictionary containing the state of the game position, suggestion and accusation keys.        :return: dictionary containing a move, suggest and accuse key. Suggest and accuse values are        dictionary<string>        """        rooms = self._get_rooms()        available_moves = self._filter_moves(game_state)        turn_response = self._make_move(available_moves)        # optimistically set the new location to the last move value, which stores the move requested. If the move        # failed, the update function will move the player back to it's previous location        self._location = self._prior_moves_stack[len(self._prior_moves_stack) - 1]        # make a suggestion if moving to a room        if turn_response['move'] in rooms:            return self._make_suggestion(turn_response, False)        # make a suggestion if stuck in a room or if moved to the room as a result of a suggestion by another players        elif not (turn_response['move'] and game_state['positions'][self.player_id] in rooms) \                or self._is_move_from_suggest:            turn_response = {'move': game_state['positions'][self.player_id]}            self._is_move_from_suggest = False            return self._make_suggestion(turn_response, True)        # just return a move since not in a room        else:            return turn_response    @staticmethod    def _get_suspects():        """        Get the suspects that are valid for this game.        :return: valid suspects        :rtype: set<str>        """        return {'Mustard', 'Scarlet', 'White', 'Plum', 'Green', 'Peacock'}    # @property    @staticmethod    def _get_rooms():        """        Get the rooms that are valid for this game.        :return: valid rooms        :rtype: set<str>        """        return {'Study', 'Hall', 'Lounge', 'Library', 'Billiard', 'Dining', 'Conservatory', 'Ballroom', 'Kitchen'}    # @property    @staticmethod    def _get_weapons():        """        Get the weapons that are valid for this game.        :return: valid weapons        :rtype: set<str>        """        return {'Knife', 'Wrench', 'Revolver', 'Pipe', 'Rope', 'Candlestick'}    @property    def _get_location(self):        """        Get the _location of this player and store it as an instance variable for tracking _location.        :return: current _location        :rtype: str        """        return self._location    def _set_location(self, game_state):        """        Sets the current _location based on the game_state returned by the caller/server        :param game_state: {'positions': {<pid>: <_location>, ...}}        :return:        """        self._location = game_state['positions'][self.player_id]        self._prior_moves.add(self._location)    def _verify_card(self, card_to_verify):        """        Verify that the card dealt is valid        :param: card_to_verify <string>        :return: true if card is valid. Otherwise, false        :rtype: bool        """        # all_cards = self._get_suspects.union(self._get_rooms.union(self._get_weapons))        # all_cards = list(itertools.chain(*cards))        if card_to_verify in self._cards:            return True        else:            return False    def _next_moves(self, current_location):        """        Finds all possible locations that can be the next move from the player's current position.        :param current_location:        :return: a list of possible next moves        :rtype: list<str>        """        return self._board.neighborhood(current_location, 1)    def _filter_moves(self, game_state):        """        Remove moves that are blocked and favor moves that haven't been taken.        :param game_state:        :return: a available, non-blocked move        :rtype: set<str>        """        # set current _location to the position reported in game_state        self._set_location(game_state)        # get the possible next moves, given the current _location        next_moves = self._next_moves(self._location)        # get this player's prior moves        prior_moves = self._prior_moves        # get current positions of all players        occupied_locations = game_state['positions'].values()        # if next moves is a position currently occupied by another player or next moves contains a match with        # prior moves, then it's not an available move or a favored move from the set of possible moves.        available_moves = next_moves.difference(occupied_locations)        available_moves = available_moves.difference(prior_moves)        # if available_moves is an empty set, then randomly select an available move if there is one available        if not available_moves:            possible_moves = next_moves.difference(occupied_locations)            if len(possible_moves) > 0:                pick_me = random.sample(possible_moves, 1)                available_moves.add(pick_me[0])        return available_moves    def _make_move(self, available_moves):        """        Make a move        :param available_moves: available places to move        :return: a dictionary containing the move command and a _location to move or empty string        :rtype : dict{'move':<str>} example: {'move': 'Kitchen'}        """        turn_response = {'move': ''}        for move in available_moves:            if move not in self._prior_moves:                # populate the move key with this move (will be sent to caller)                turn_response['move'] = move                # add the move to prior moves set                self._prior_moves.add(move)                # store the order of the move taken                self._prior_moves_stack.append(move)                # return because no more available moves should be evaluated                return turn_response        # after evaluating all available moves, the only thing to do is take any of the available moves even        # if it's a move that already been taken        if available_moves:            turn_response['move'] = available_moves.pop()            # store the order of the move taken. This stack can contain duplicate moves unlike _prior_moves (set)            self._prior_moves_stack.append(move)        return turn_response    def _make_suggestion(self, move_response, prior_position):        """        :param move_response: the room where self.player just  moved or the rooms where self.player remains        :param prior_position: boolean indicating whether self.player remains in prior position. Blocked from moving.        :return:        """        rooms = self._get_rooms()        weapons = self._get_weapons()        suspects = self._get_suspects()        # the suggested room must be the room where self.player is located, per game rules        room = move_response['move']        # check the pad to see what cards are unknown        cards = self._get_unknown_cards()        # except for the room card, pick two unknown cards, one suspect, one weapon        # if there is only one category of unknown card, choose one of your cards in the known        # card category to trip-up opponents        # randomly choose a weapon        unknown_weapons = cards.intersection(weapons)        suggested_weapon = random.sample(unknown_weapons, 1)        if not suggested_weapon:            # pick any weapon            suggested_weapon = random.sample(weapons, 1)        unknown_suspects = cards.intersection(suspects)        suggested_suspect = random.sample(unknown_suspects, 1)        if not suggested_suspect:            # pick any suspect            suggested_suspect = random.sample(suspects, 1)        return {'move': '' if prior_position else room,                'suggestion': {'from_player': self.player_id,                               'cards': {room, suggested_weapon[0], suggested_suspect[0]}}}    def _answer(self, suggestion):        """        Ask this computer player a question about whether they have one of three cards        :param suggestion: list<string> containing three valid card values.        :return: string containing a valid card value or no_match        """        cards = self._pad.get_player_table(self.player_id)['c1']        # improve this by preferring not to return room cards because there are more        # room cards than any other cards. Helps to keep the other players guessing.        # might want to create a stack where the first items in are rooms so that rooms would        # be the last items that are popped off the stack in an answer        for card in suggestion:            if card in cards[cards == 1]:                return card        return 'no_match'    def _mark_my_cards_on_pad(self, dealt_cards):        """        Mark the cards this player was dealt.        :type dealt_cards: list        :param dealt_cards:         """        player_tbl = self._pad.get_player_table(self.player_id)        for card in dealt_cards:            # get this player's sub-table and mark that they have this set of cards (from 3 to 6)            player_tbl['c1'][card] = 1    def _mark_pad(self, game_state):        # three possible suggestions are: True ("I have one of the cards suggested") if this player is not the one        # making the suggestion. False, ("I don't have one of the cards suggested") whether or not this player is        # the one making the suggestion. The actual card if this player is the one making the suggestion and there is        # a match to share.        """        Given the suggestion, mark this player's _pad.        :param game_state:        """        # example game_state for letting other players know of a response (undirected answer)        # {'answer': {'has_card': True, 'from_player': 'p02'}, 'suggestion': ['Plum', 'Hall', 'Candlestick']}        answer = game_state['answer']        responding_player = answer['from_player']        # for the current player, get the sub-table for the responding player        responding_player_tbl = self._pad.get_player_table(responding_player)        if 'has_card' in answer and answer['has_card'] is True:            suggestions = game_state['cards'].copy()            card01 = suggestions.pop()            card02 = suggestions.pop()            card03 = suggestions.pop()            # get the tracking cell lists            cell01 = responding_player_tbl['c2'][card01]            cell02 = responding_player_tbl['c2'][card02]            cell03 = responding_player_tbl['c2'][card03]            # check if any of the cards have been asked of this player before. If so, add the greatest increment            # to each of the cells. This is done here by getting the length of the union of the cells and adding 1            new_entry = len(cell01.union(cell02.union(cell03))) + 1            cell01.add(new_entry)            cell02.add(new_entry)            cell03.add(new_entry)        elif answer == 'no_match':            # no one has the suggested cards. It might be time to make an accusation            return self._analyze_table_to_accuse()        elif answer and 'has_card' in answer and answer['has_card'] is False:            # the global/undirected update about suggested cards should just pass for now. This is the update            # sent to all other players in the game.            pass        # the asking player is given a directed answer in this final condition        else:            card_provided = answer['card']            # locate player 1's column 1 for the specified card and put a 1 in it            # if c1 is already checked somewhere else then a player is lie (game violation) or a code bug.            # should deal with this condition in code.            responding_player_tbl['c1'][answer['card']] = 1            self._clear_c2_cells(card_provided)        # this will only return a set of cards if it's time to accuse        return self._analyze_table_to_accuse()    def _clear_c2_cells(self, card_provided):        # clear the corresponding col2 cell for the answered card        # and do this for all of the players including this player        for player in self._pad.players_list:            tbl = self._pad.get_player_table(player)            tbl['c2'][card_provided].clear()    def _get_player(self, available_players_list):        """        Randomly choose a player from a list of available players. This determines starting position on _board.        :param available_players_list:list        :return: a randomly selected player        :rtype : str        """        return random.choice(available_players_list)    def _get_starting_location(self, selected_player):        """        Gets the starting position of the selected player.        :param selected_player <string>        :return: the selected player's starting hallway position        :rtype : str        """        starting_positions = {            'Scarlet': 'Hallway_02',            'Plum': 'Hallway_03',            'Mustard': 'Hallway_05',            'Peacock': 'Hallway_08',            'Green': 'Hallway_11',            'White': 'Hallway_12'        }        return starting_positions[selected_player]    def _analyze_table_to_accuse(self):        # get all of the cards        cards = self._pad.get_player_table(self.player_id).axes[0].tolist()        unverified_cards = self._get_unknown_cards()        if len(unverified_cards) == 3:            return unverified_cards    def _get_unknown_cards(self):        """        Get the cards that aren't marked in a player's tracking pad        :param cards: list of all cards in deck        :return: unknown cards        """        # get this player's pad        pad = self._pad        # get all of the cards in the game        cards = self._pad.get_player_table(self.player_id).axes[0].tolist()        # create a set to hold unverified cards        unverified_cards = set()        # for each card, check each c1 cell sub-table. If not checked, add it to unverified_cards        for card in cards:            i = 0            for key in pad.player_pad.keys():                if pad.get_player_table(key).c1[card] == 1:                    break                else:                    # the cell must not be marked                    # if self._pad.get_player_table(key).c1[card] == np.nan:                    i += 1                if i == 4:                    unverified_cards.add(card)        return unverified_cards
\ No newline at end of file
+import asyncio
+import copy
+import random
+import itertools
+import time
+from auto.accusation import envelope_probabilities, decide_in_executor
+from auto.board import Board
+from auto import events
+from auto.pad import Pad
+import numpy as np
+
+# seconds kept back from a take_turn deadline for returning the response
+DEADLINE_MARGIN = 0.002
+
+# the share of the time left before a take_turn deadline given to sampling. The rest is kept for turning the
+# samples into a suggestion and returning it, which takes longer when the CPU is busy
+SAMPLING_SHARE = 0.5
+
+"""
+    :module:: automaton
+    :platform: Unix, Windows
+    :synopsis: The AI/Computer Player object for the game of Clue-Less.
+
+    :moduleauthor: Ethan Wilansky, Shambhavi Sanskrit and Henoke Shiferaw
+
+"""
+
+
+class Player:
+    """
+    The player class to be instantiated for each requested Clue-Less computer/AI player
+
+    """
+    # the compiled board is shared by all players using the same board spec
+    _board = Board.from_spec()
+
+    # _player_count class variable enforces the maximum # of players allowed. See IndexError in constructor
+    _player_count = 0
+
+    def __init__(self, player_id, available_suspects_list, total_players, player_ids=None, board=None,
+                 opponent_priors=None):
+        """
+        Instantiate a player for the game and provided that the upper-limit of
+        allowed players has not been reached.
+
+        :param player_id: the id assigned to this player by the caller (p01 - p06)
+        :param available_suspects_list [list <string>]
+        :param total_players: int
+        :param player_ids: the ids of all of the players in seat order, when the caller doesn't use p01 - p0n
+        [list <string>]
+        :param board: the auto.board.Board for a variant of the game (see auto.board.Board.from_spec)
+        :param opponent_priors: the auto.priors.OpponentPriors learned about the other players in past games. The
+        pad is biased by them and they are updated with this game. The caller saves them (see
+        auto.priors.OpponentPriors.save)
+
+        :var
+            class vars:
+            _board: auto.board.Board
+            _player_count: int
+            instance vars:
+            _selected_suspect: string
+            _location: string
+            _prior_moves: set<string>
+            _prior_moves_stack: stack<string>
+            _is_move_from_suggest: bool
+            _pad: dictionary<auto.PlayerMatrix
+            _pending_c2_clears: set<string> or None
+            _diagnostics: auto.diagnostics.SlowCallRecorder or None
+            _accusation_policy: auto.accusation.AccusationPolicy or None
+            _executor: concurrent.futures.Executor or None
+            _opening_book: auto.opening.OpeningBook or None
+            _first_turn_taken: bool
+            _event_sink: auto.events.EventSink or None
+            _opponent_priors: auto.priors.OpponentPriors or None
+            _positions: dictionary<player_id<string>:location<string>>
+            _positions_version: int
+            player_id: string
+
+        :raise
+            IndexError if player count > 5
+        """
+        # the total number of allowed computer players
+        if self._player_count <= 5:
+
+            # add to the player count so server knows # active autonomous player
+            self._player_count += 1
+
+            # a variant board replaces the Clue-Less board shared by all players
+            if board is not None:
+                self._board = board
+
+            # instance variables needed for game play
+            self._selected_suspect = self._get_player(available_suspects_list)
+            # to start, the _location is the starting position for this player based on selected suspect
+            self._location = self._get_starting_location(self._selected_suspect)
+
+            # prior moves set will initially contain just the starting position for this player
+            self._prior_moves = {self._location}
+
+            # this stack is used for tracking in exactly what order moves were taken. This is important for
+            # managing failed moves and knowing the order of prior moves. The set functionality in _prior_moves
+            # is important and separate of this since Python does not support stack capabilities on sets
+            self._prior_moves_stack = [self._location]
+
+            # if this player is moved as a result of a suggestion, then this player should make a suggestion from
+            # this room before leaving it. This will get set to true, if the room is not part of _prior_moves when
+            # position information is sent in the update function.
+            self._is_move_from_suggest = False
+
+            # create a player _pad for this player with the total number of players specified
+            self._pad = Pad(total_players, player_ids, priors=opponent_priors)
+            # get the cards for various private functions
+            self._cards = self._pad.cards
+
+            # while a batch of game states is being applied (see update_many), cards confirmed in c1 are
+            # collected here so that their c2 cells are cleared once at the end of the batch. None otherwise.
+            self._pending_c2_clears = None
+
+            # opt-in diagnostic mode for capturing profiles of slow calls (see set_diagnostics)
+            self._diagnostics = None
+
+            # when to accuse. Without a policy, accuse only when exactly three cards are unknown (see
+            # set_accusation_policy)
+            self._accusation_policy = None
+
+            # where the heavy analysis of the async variants runs (see set_executor)
+            self._executor = None
+
+            # the first turn to take for the dealt hand (see set_opening_book)
+            self._opening_book = None
+
+            # whether this player has taken a turn yet. The prior moves can't tell, since position updates sent
+            # before the first turn add to them
+            self._first_turn_taken = False
+
+            # where the trace events of this player go (see set_event_sink)
+            self._event_sink = None
+
+            # what is learned about the other players across games
+            self._opponent_priors = opponent_priors
+
+            self.player_id = player_id
+
+            # a mirror of the positions of all of the players, kept up to date by full positions and by position
+            # deltas, and the version of the last change applied (see _sync_positions)
+            self._positions = {player_id: self._location}
+            self._positions_version = 0
+
+        else:
+            raise IndexError('no more than 5 computer players allowed')
+
+    def receive_cards(self, dealt_cards):
+        """
+        Receive a set of cards from the dealer and store them.
+
+        :param dealt_cards: list
+        :return:  dealt cards
+        :rtype: list<str>
+        :raise:
+            IndexError if # of cards not between 3 and 6
+            ValueError if cards dealt are not in Cards data structure
+        """
+        # if 3 <= len(dealt_cards) <= 6:
+        # self.dealt_cards = dealt_cards
+        # else:
+
+        if not 3 <= len(dealt_cards) <= 6:
+            raise IndexError('the number of cards dealt, must be between 3 and 6')
+
+        for card in dealt_cards:
+            verified = self._verify_card(card)
+            if not verified:
+                raise ValueError('the card {0} is not valid'.format(card))
+
+        self._mark_my_cards_on_pad(dealt_cards)
+
+    def update(self, game_state):
+
+        """
+        The central controller responsible for receiving and responding to game states from a caller.
+
+        :param game_state: a dictionary containing a variety of game states that a caller (server) can send.
+        game state schema:
+
+            player locations:
+                                {'position': {player_id<str>:location<str>, ...}, 'version': <int>}
+
+            player location changes since a version (each version is one token moving):
+                                {'position_deltas': [{'version': <int>, 'player_id': <str>, 'from': location<str>,
+                                                      'to': location<str>}, ...]}
+
+            move acknowledgement:
+                                {'move_made': <bool>}
+
+            suggestion sent to each player to respond:
+                                {'suggestion': {'from_player': player_id<str>},
+                                                'cards': {card<str>, card<str>, card<str>}}
+
+            ack move & player with card (directed response):
+                                {'move_made': <bool>, 'answer': {'from_player': player_id<str>, 'card': card<str>}}
+
+            ack no players with suggested cards (response sent to asking player (directed answer):
+                                {'move_made': <bool>, 'answer': 'no_match'}
+
+            ack player with card sent to all players except the asking player (undirected answer):
+                                {'answer': {'from_player': player_id<str>, 'has_card': True},
+                                'cards': {card<str>, card<str>, card<str>}}}
+
+            ack no players with suggested cards (response sent to all players except asking player):
+                                {'answer': 'no_match', 'cards': {card<str>, card<str>, card<str>}
+
+            ack move and win/lose:
+                                {'move_made': <bool>, 'answer': {'win' <bool>}}
+
+            ack game over:
+                                {'game_over': <bool>, 'winning_player: player_id<str>}
+
+
+        :return: a dictionary response to the game state sent by the caller
+        return schema:
+            request for all of the positions when position deltas are missing (see _sync_positions):
+                                {'resync': {'from_player': player_id<str>, 'version': <int>}}
+
+            player move:
+                                {'move': location<str>}
+
+            turn complete ack:
+                                {'turn_complete': <bool>}
+
+            player move & suggest:
+                                {'move': location<str>, 'suggestion': {'from_player': player_id<str>},
+                                                                       'cards': {card<str>, card<str>, card<str>}}
+            player has card:
+                                {'card': card<str>}
+
+            player move & accuse:
+                                {'move': location<str>, 'accusation': {'from_player': player_id<str>},
+                                                                       'cards': {card<str>, card<str>, card<str>}}
+
+        """
+
+        # in diagnostic mode, make this call under the profilers and keep the trace if it is slow
+        if self._diagnostics is not None and not self._diagnostics.recording:
+            return self._diagnostics.record(self, self.update, game_state)
+
+        # with an event sink, the events leading up to an error are dumped
+        if self._event_sink is not None and not self._event_sink.guarding:
+            return self._event_sink.guard(self, self.update, game_state)
+
+        # use case: The caller (server) sends a position update to each player. This player checks to see if
+        # the position is their current position and, if not, adds position to prior_moves
+        if 'positions' in game_state or 'position_deltas' in game_state:
+            if not self._sync_positions(game_state):
+                return self._resync_request()
+
+            player_position = self._positions[self.player_id]
+            if not self._prior_moves.issubset(player_position):
+                self._prior_moves.add(player_position)
+                self._prior_moves_stack.append(player_position)
+                self._location = player_position
+
+        # use case: The caller (server) sends an update and directs the question to one of the players in each update.
+        # The caller knows the player order and therefore the order in which the suggestion should be asked.
+        elif 'suggestion' in game_state:
+            # keep count of what the other players suggest. Repeated suggestions hint at the envelope
+            suggesting_player = game_state['suggestion'].get('from_player')
+            if suggesting_player != self.player_id and suggesting_player in self._pad.players_list:
+                self._pad.note_suggestion(suggesting_player, game_state['suggestion']['cards'])
+                self._emit(events.SUGGESTION, suggesting_player, game_state['suggestion']['cards'])
+
+            if self._selected_suspect in game_state['suggestion']['cards']:
+                # sets flag indicating a forced move to a room as a result of another player making this suggestion
+                self._is_move_from_suggest = True
+            # this player answers whether they have a match in their cards
+            return self._answer(game_state['suggestion']['cards'])
+
+        # all players acknowledge an undirected answer about a player having at least one of the suggested cards
+        elif 'answer' in game_state and 'cards' in game_state:
+            # manage the pad based on the information provided by the undirected response
+            self._mark_pad(game_state)
+            return {'acknowledged': True}
+
+        # use case: One of the players responded to the caller (server) with an answer. The caller takes the
+        # answer and sends an update to the autonomous player who made the original suggestion.
+        elif 'answer' in game_state:
+            accusation = self._mark_pad(game_state)
+            if not accusation:
+                return {'turn_complete': True}
+            else:
+                self._emit(events.ACCUSATION, None, accusation)
+                return {'accusation': {'from_player': self.player_id, 'cards': accusation}, 'turn_complete': True}
+
+        # use case: The caller (server) acknowledges to the player who just moved that the move was successful.
+        # If the code lands on this condition, the player taking a turn must have moved to a hallway because no
+        # suggestion or accusation was made. Therefore, the only option then is for this autonomous player to return
+        # that they have completed their move.
+        elif 'move_made' in game_state and game_state['move_made']:
+            return {'turn_complete': True}
+
+        # The server claims the move was unsuccessful. For now, assume that there is no where else to move and end
+        # the turn. This is probably not even an edge case since the Player code will not attempt to move to a blocked
+        # position
+        elif 'move_made' in game_state and not game_state['move_made']:
+            # get the last move from the stack
+            last_move = self._prior_moves_stack.pop()
+            self._location = last_move
+            self._prior_moves.remove(last_move)
+            return {'turn_complete': True}
+
+        # the game is over. What the pad shows about the other players' suggestions is added to the priors
+        elif 'game_over' in game_state:
+            if self._opponent_priors is not None:
+                self._opponent_priors.note_game(self._pad, self.player_id)
+            return
+
+        else:
+            return
+
+    def update_many(self, game_states):
+        """
+        Apply a batch of game states in one call, for example the queued messages a reconnecting client receives
+        or a replayed log. Each game state is handled as it would be by update, except that clearing c2 cells for
+        confirmed cards and analyzing the pad to accuse are deferred and done once at the end of the batch.
+
+        :param game_states: an iterable of game state dictionaries (see update for the game state schema)
+        :return: the response to each game state, in the order the game states were received. If the pad shows
+        that it's time to accuse once the batch is applied, the accusation is added to the response for the last
+        directed answer in the batch.
+        :rtype: list<dict>
+        """
+        responses, last_answer = self._apply_batch(game_states)
+
+        if last_answer is not None:
+            self._add_accusation(responses, last_answer, self._analyze_table_to_accuse())
+
+        return responses
+
+    async def update_async(self, game_state):
+        """
+        Respond to a game state as update does. When the game state is a directed answer, the pad is marked in the
+        event loop and the analysis of whether to accuse runs in the executor (see set_executor).
+
+        :param game_state: a game state dictionary (see update for the game state schema)
+        :return: the same response as update
+        """
+        if not self._is_directed_answer(game_state):
+            return self.update(game_state)
+
+        responses = await self.update_many_async([game_state])
+
+        return responses[0]
+
+    async def update_many_async(self, game_states):
+        """
+        Apply a batch of game states as update_many does, analyzing whether to accuse in the executor (see
+        set_executor) so that the event loop isn't blocked.
+
+        :param game_states: an iterable of game state dictionaries (see update for the game state schema)
+        :return: the same responses as update_many
+        :rtype: list<dict>
+        """
+        responses, last_answer = self._apply_batch(game_states)
+
+        if last_answer is not None:
+            if self._accusation_policy is None:
+                # counting the unknown cards is cheap
+                accusation = self._analyze_table_to_accuse()
+            else:
+                # updates handled by the event loop while the policy decides must not change the pad it reads
+                accusation, random_state = await self._run_in_executor(
+                    decide_in_executor, self._accusation_policy, copy.deepcopy(self._pad), self.player_id,
+                    self._get_categories())
+
+                # a process executor decided with a copy of the policy. Carry its random state over so that the
+                # next decision is the one update would make
+                self._accusation_policy.set_random_state(random_state)
+
+            self._add_accusation(responses, last_answer, accusation)
+
+        return responses
+
+    def _apply_batch(self, game_states):
+        """
+        Apply a batch of game states, deferring the clearing of c2 cells until the end of the batch (see
+        update_many).
+
+        :rtype: tuple<list<dict>, int>
+        :return: the response to each game state and the index of the last directed answer, or None
+        """
+        responses = []
+        last_answer = None
+
+        self._pending_c2_clears = set()
+        try:
+            for game_state in game_states:
+                responses.append(self.update(game_state))
+
+                # remember where the last directed answer is. This is where update would have returned an accusation
+                if self._is_directed_answer(game_state):
+                    last_answer = len(responses) - 1
+        finally:
+            # propagate all of the confirmed cards at once, even if one of the game states raised
+            pending_c2_clears = self._pending_c2_clears
+            self._pending_c2_clears = None
+            for card in pending_c2_clears:
+                self._clear_c2_cells(card)
+
+        return responses, last_answer
+
+    def _add_accusation(self, responses, last_answer, accusation):
+        """
+        Add an accusation to the response for the last directed answer of a batch.
+        """
+        if accusation:
+            self._emit(events.ACCUSATION, None, accusation)
+            responses[last_answer] = {'accusation': {'from_player': self.player_id, 'cards': accusation},
+                                      'turn_complete': True}
+
+    def take_turn(self, game_state, deadline=None):
+
+        # move block
+        """
+        Take a turn given the game state.
+
+        With a deadline, the turn is taken in anytime mode: the move and suggestion are chosen right away as usual,
+        then the suggestion is refined with an estimate of the envelope probabilities for as long as the deadline
+        allows (see _refine_suggestion). The response is returned before the deadline.
+
+        :param game_state: dictionary containing the state of the game position, suggestion and accusation keys.
+        The positions can be sent as position deltas instead (see update).
+        :param deadline: the time.monotonic() time by which the turn must be taken, or None to take the turn
+        without refining it <float>
+        :return: dictionary containing a move, suggest and accuse key. Suggest and accuse values are
+        dictionary<string>. If a position delta is missing, the request for all of the positions is returned
+        instead (see update).
+        """
+        # in diagnostic mode, make this call under the profilers and keep the trace if it is slow
+        if self._diagnostics is not None and not self._diagnostics.recording:
+            return self._diagnostics.record(self, self.take_turn, game_state, deadline=deadline)
+
+        # with an event sink, the events leading up to an error are dumped
+        if self._event_sink is not None and not self._event_sink.guarding:
+            return self._event_sink.guard(self, self.take_turn, game_state, deadline=deadline)
+
+        turn_response, from_opening = self._choose_turn(game_state)
+
+        # in anytime mode, use the time left to improve the suggestion. A suggestion from the opening book is kept
+        # as the book has it
+        if deadline is not None and 'suggestion' in turn_response and not from_opening:
+            probabilities = _estimate_envelope(deadline, self._pad, self.player_id, self._get_categories())
+
+            # the sampling may have been slowed down. Only refine if there is still time
+            if time.monotonic() < deadline - DEADLINE_MARGIN:
+                self._refine_suggestion(turn_response['suggestion'], probabilities)
+
+        self._emit_turn(turn_response)
+
+        return turn_response
+
+    async def take_turn_async(self, game_state, deadline=None):
+        """
+        Take a turn as take_turn does, estimating the envelope probabilities for anytime mode in the executor (see
+        set_executor) so that the event loop isn't blocked. The move, the pad and the cheap suggestion are handled
+        in the event loop.
+
+        :param game_state: dictionary containing the state of the game position, suggestion and accusation keys.
+        :param deadline: the time.monotonic() time by which the turn must be taken, or None <float>
+        :return: the same response as take_turn
+        """
+        # in diagnostic mode and with an event sink, the call is recorded and guarded as take_turn is
+        if self._diagnostics is not None and not self._diagnostics.recording:
+            return await self._diagnostics.record_async(self, self.take_turn_async, game_state, deadline=deadline)
+
+        if self._event_sink is not None and not self._event_sink.guarding:
+            return await self._event_sink.guard_async(self, self.take_turn_async, game_state, deadline=deadline)
+
+        turn_response, from_opening = self._choose_turn(game_state)
+
+        if deadline is not None and 'suggestion' in turn_response and not from_opening:
+            # updates handled by the event loop while the estimate runs must not change the pad it reads
+            probabilities = await self._run_in_executor(_estimate_envelope, deadline, copy.deepcopy(self._pad),
+                                                        self.player_id, self._get_categories())
+
+            if time.monotonic() < deadline - DEADLINE_MARGIN:
+                self._refine_suggestion(turn_response['suggestion'], probabilities)
+
+        self._emit_turn(turn_response)
+
+        return turn_response
+
+    def _choose_turn(self, game_state):
+        """
+        Choose the move and suggestion of a turn without refining the suggestion.
+
+        :param game_state: dictionary containing the state of the game position, suggestion and accusation keys.
+        :rtype : tuple<dict, bool>
+        :return: dictionary containing a move and suggest key, and true if the turn came from the opening book
+        """
+        rooms = self._board.rooms
+
+        # the mirror holds the positions of record, whether the caller sent all of the positions or deltas
+        if not self._sync_positions(game_state):
+            return self._resync_request(), False
+        game_state = dict(game_state, positions=self._positions)
+
+        available_moves = self._filter_moves(game_state)
+
+        # the first turn comes from the opening book when it has one for this player
+        opening_response = self._play_opening(available_moves)
+        self._first_turn_taken = True
+        if opening_response is not None:
+            return opening_response, True
+
+        turn_response = self._make_move(available_moves)
+        # optimistically set the new location to the last move value, which stores the move requested. If the move
+        # failed, the update function will move the player back to it's previous location
+        self._location = self._prior_moves_stack[len(self._prior_moves_stack) - 1]
+
+        # make a suggestion if moving to a room
+        if turn_response['move'] in rooms:
+            turn_response = self._make_suggestion(turn_response, False)
+        # make a suggestion if stuck in a room or if moved to the room as a result of a suggestion by another players
+        elif not (turn_response['move'] and game_state['positions'][self.player_id] in rooms) \
+                or self._is_move_from_suggest:
+            turn_response = {'move': game_state['positions'][self.player_id]}
+            self._is_move_from_suggest = False
+            turn_response = self._make_suggestion(turn_response, True)
+        # otherwise, just return a move since not in a room
+
+        return turn_response, False
+
+    def set_diagnostics(self, diagnostics):
+        """
+        Turn on the diagnostic mode, in which take_turn and update calls that are slow or allocate too much are
+        recorded along with the game state sent and the state of this player.
+
+        :param diagnostics: an auto.diagnostics.SlowCallRecorder, which can be shared by players, or None to turn
+        the diagnostic mode off
+        """
+        self._diagnostics = diagnostics
+
+    def set_executor(self, executor):
+        """
+        Run the heavy analysis of take_turn_async, update_async and update_many_async in an executor, such as a
+        concurrent.futures.ThreadPoolExecutor or ProcessPoolExecutor shared by the players of a server.
+
+        :param executor: a concurrent.futures.Executor, or None for the default executor of the event loop
+        """
+        self._executor = executor
+
+    def set_opening_book(self, opening_book):
+        """
+        Take the first turn from an opening book: move into the room of the opening and suggest from it.
+
+        :param opening_book: an auto.opening.OpeningBook, which can be shared by players, or None to take the first
+        turn like any other
+        """
+        self._opening_book = opening_book
+
+    def _play_opening(self, available_moves):
+        """
+        Take the first turn from the opening book, if this is the first turn and the room of the opening can be
+        moved into.
+
+        :param available_moves: available places to move
+        :return: dictionary containing a move and suggest key, or None to take the turn as usual
+        """
+        if self._opening_book is None or self._first_turn_taken:
+            return None
+
+        hand = [card for card in self._cards if self._pad.has_card(self.player_id, card)]
+        opening = self._opening_book.lookup(self._selected_suspect, hand, len(self._pad.players_list))
+        if opening is None or opening[0] not in available_moves:
+            return None
+
+        room, suspect_held, weapon_held = opening
+
+        self._prior_moves.add(room)
+        self._prior_moves_stack.append(room)
+        self._location = room
+
+        # suggest a suspect and a weapon from the hand or from the unknown cards, as the opening says
+        unknown = self._get_unknown_cards()
+        weights = self._pad.envelope_weights(self.player_id)
+        cards = {room}
+        for category, held in ((self._get_suspects(), suspect_held), (self._get_weapons(), weapon_held)):
+            choices = category.intersection(hand) if held else category.intersection(unknown)
+            cards.add(self._pick_card(choices or category, weights))
+
+        return {'move': room, 'suggestion': {'from_player': self.player_id, 'cards': cards}}
+
+    def set_event_sink(self, event_sink):
+        """
+        Send the trace events of this player's turns, answers and accusations to a sink, which dumps the last events
+        when a take_turn or update call raises.
+
+        :param event_sink: an auto.events.EventSink, which can be shared by players, or None to send no events
+        """
+        self._event_sink = event_sink
+
+    def _emit(self, kind, player_id=None, cards=()):
+        """
+        Send an event to the event sink, if there is one and it keeps the events of this player's seat. Nothing is
+        formatted: the other player is sent as their seat and the cards as their codes.
+
+        :param kind: the code of the kind of event, such as auto.events.TURN <int>
+        :param player_id: id of the other player of the event, if any
+        :param cards: the cards of the event. A list, such as the location and cards of a turn, is sent in its
+        order and other iterables, such as sets, are sent sorted
+        """
+        if self._event_sink is None:
+            return
+
+        seat = self._pad.seat(self.player_id)
+        if not self._event_sink.enabled(seat):
+            return
+
+        fields = [self._pad.seat(player_id)] if player_id is not None else []
+        if not isinstance(cards, list):
+            cards = sorted(cards)
+        fields.extend(self._event_sink.code(card) for card in cards)
+
+        self._event_sink.emit(kind, seat, *fields)
+
+    def _emit_turn(self, turn_response):
+        """
+        Send the event of a turn: the move and the suggested room, suspect and weapon.
+        """
+        if self._event_sink is None or 'move' not in turn_response or \
+                not self._event_sink.enabled(self._pad.seat(self.player_id)):
+            return
+
+        cards = turn_response.get('suggestion', {}).get('cards', ())
+        categories = self._get_categories()
+        suggested = [card for category in (categories[2], categories[0], categories[1])
+                     for card in cards if card in category]
+
+        self._emit(events.TURN, None, [turn_response['move']] + suggested)
+
+    def _run_in_executor(self, function, *args):
+        """
+        :return: an awaitable for the result of the function called in the executor
+        """
+        return asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def set_accusation_policy(self, accusation_policy):
+        """
+        Accuse once the most likely hypothesis about the envelope is likely enough, rather than waiting until only
+        three cards are unknown.
+
+        :param accusation_policy: an auto.accusation.AccusationPolicy, or None to accuse only when certain
+        """
+        self._accusation_policy = accusation_policy
+
+    def _get_categories(self):
+        """
+        :return: the suspects, weapons and rooms
+        :rtype: list<set<str>>
+        """
+        return [self._get_suspects(), self._get_weapons(), self._get_rooms()]
+
+    @staticmethod
+    def _get_suspects():
+        """
+        Get the suspects that are valid for this game.
+
+        :return: valid suspects
+        :rtype: set<str>
+        """
+        return {'Mustard', 'Scarlet', 'White', 'Plum', 'Green', 'Peacock'}
+
+    # @property
+    @staticmethod
+    def _get_rooms():
+        """
+        Get the rooms that are valid for this game.
+
+        :return: valid rooms
+        :rtype: set<str>
+        """
+        return {'Study', 'Hall', 'Lounge', 'Library', 'Billiard', 'Dining', 'Conservatory', 'Ballroom', 'Kitchen'}
+
+    # @property
+    @staticmethod
+    def _get_weapons():
+        """
+        Get the weapons that are valid for this game.
+
+        :return: valid weapons
+        :rtype: set<str>
+        """
+        return {'Knife', 'Wrench', 'Revolver', 'Pipe', 'Rope', 'Candlestick'}
+
+    @property
+    def _get_location(self):
+
+        """
+        Get the _location of this player and store it as an instance variable for tracking _location.
+
+        :return: current _location
+        :rtype: str
+        """
+        return self._location
+
+    def _sync_positions(self, game_state):
+        """
+        Bring the mirror of the players' positions up to date with a game state. All of the positions replace the
+        mirror, unless their version is older than the mirror's, such as a snapshot delayed behind later deltas.
+        Position deltas are applied in version order; deltas already applied are skipped.
+
+        :param game_state: a game state with positions, position deltas or neither
+        :rtype: bool
+        :return: false if a delta is missing (the next delta isn't the next version) or doesn't start from the
+        position in the mirror. The mirror is then left at the last version applied.
+        """
+        if 'positions' in game_state and game_state.get('version', self._positions_version) >= self._positions_version:
+            self._positions = dict(game_state['positions'])
+            self._positions_version = game_state.get('version', self._positions_version)
+
+        for delta in game_state.get('position_deltas', ()):
+            if delta['version'] <= self._positions_version:
+                continue
+
+            if delta['version'] != self._positions_version + 1 or \
+                    ('from' in delta and self._positions.get(delta['player_id']) != delta['from']):
+                return False
+
+            self._positions[delta['player_id']] = delta['to']
+            self._positions_version = delta['version']
+
+        return True
+
+    def _resync_request(self):
+        """
+        :return: the response asking the caller for all of the positions
+        :rtype: dict
+        """
+        return {'resync': {'from_player': self.player_id, 'version': self._positions_version}}
+
+    def _set_location(self, game_state):
+        """
+        Sets the current _location based on the game_state returned by the caller/server
+
+        :param game_state: {'positions': {<pid>: <_location>, ...}}
+        :return:
+        """
+
+        self._location = game_state['positions'][self.player_id]
+        self._prior_moves.add(self._location)
+
+    def _verify_card(self, card_to_verify):
+
+        """
+        Verify that the card dealt is valid
+
+        :param: card_to_verify <string>
+        :return: true if card is valid. Otherwise, false
+        :rtype: bool
+        """
+        # all_cards = self._get_suspects.union(self._get_rooms.union(self._get_weapons))
+        # all_cards = list(itertools.chain(*cards))
+
+        if card_to_verify in self._cards:
+            return True
+        else:
+            return False
+
+    def _next_moves(self, current_location):
+        """
+        Finds all possible locations that can be the next move from the player's current position.
+
+        :param current_location:
+        :return: a set of possible next moves
+        :rtype: set<str>
+        """
+        return set(self._board.neighbors(current_location))
+
+    def _filter_moves(self, game_state):
+
+        """
+        Remove moves that are blocked and favor moves that haven't been taken.
+
+        :param game_state:
+        :return: a available, non-blocked move
+        :rtype: set<str>
+        """
+        # set current _location to the position reported in game_state
+        self._set_location(game_state)
+
+        # the board keeps a precomputed location mask of the possible next moves from each location. Convert the
+        # current positions of all players and this player's prior moves to location masks as well
+        next_moves = self._board.neighbor_mask(self._location)
+        occupied_locations = self._board.location_mask(game_state['positions'].values())
+        prior_moves = self._board.location_mask(self._prior_moves)
+
+        # if next moves is a position currently occupied by another player or next moves contains a match with
+        # prior moves, then it's not an available move or a favored move from the set of possible moves.
+        possible_moves = next_moves & ~occupied_locations
+        available_moves = possible_moves & ~prior_moves
+
+        # if there are no available moves, then randomly select a possible move if there is one
+        if not available_moves and possible_moves:
+            return {random.choice(sorted(self._board.locations(possible_moves)))}
+
+        return self._board.locations(available_moves)
+
+    def _make_move(self, available_moves):
+
+        """
+        Make a move
+
+        :param available_moves: available places to move
+        :return: a dictionary containing the move command and a _location to move or empty string
+        :rtype : dict{'move':<str>} example: {'move': 'Kitchen'}
+
+        """
+        turn_response = {'move': ''}
+
+        for move in available_moves:
+            if move not in self._prior_moves:
+                # populate the move key with this move (will be sent to caller)
+                turn_response['move'] = move
+                # add the move to prior moves set
+                self._prior_moves.add(move)
+                # store the order of the move taken
+                self._prior_moves_stack.append(move)
+                # return because no more available moves should be evaluated
+                return turn_response
+
+        # after evaluating all available moves, the only thing to do is take any of the available moves even
+        # if it's a move that already been taken
+        if available_moves:
+            turn_response['move'] = available_moves.pop()
+            # store the order of the move taken. This stack can contain duplicate moves unlike _prior_moves (set)
+            self._prior_moves_stack.append(move)
+
+        return turn_response
+
+    def _make_suggestion(self, move_response, prior_position, rng=random):
+
+        """
+
+        :param move_response: the room where self.player just  moved or the rooms where self.player remains
+        :param prior_position: boolean indicating whether self.player remains in prior position. Blocked from moving.
+        :param rng: the random number generator picking the suspect and weapon
+        :return:
+        """
+        rooms = self._get_rooms()
+        weapons = self._get_weapons()
+        suspects = self._get_suspects()
+
+        # the suggested room must be the room where self.player is located, per game rules
+        room = move_response['move']
+
+        # check the pad to see what cards are unknown
+        cards = self._get_unknown_cards()
+        # cards the other players keep suggesting are more likely to be in the envelope
+        weights = self._pad.envelope_weights(self.player_id)
+
+        # except for the room card, pick two unknown cards, one suspect, one weapon
+        # if there is only one category of unknown card, choose one of your cards in the known
+        # card category to trip-up opponents
+        suggested_weapon = self._pick_card(cards.intersection(weapons) or weapons, weights, rng)
+        suggested_suspect = self._pick_card(cards.intersection(suspects) or suspects, weights, rng)
+
+        return {'move': '' if prior_position else room,
+                'suggestion': {'from_player': self.player_id,
+                               'cards': {room, suggested_weapon, suggested_suspect}}}
+
+    def _refine_suggestion(self, suggestion, probabilities):
+        """
+        Replace the suspect and weapon of a suggestion with the unknown suspect and weapon most likely to be in the
+        envelope. When there was no time for an estimate, the suggestion is left as it is.
+
+        :param suggestion: the suggestion of the turn response, changed in place <dict>
+        :param probabilities: the envelope probabilities estimated before the deadline (see _estimate_envelope)
+        """
+        categories = self._get_categories()
+
+        # the probability of each card being in the envelope
+        marginals = {}
+        for hypothesis, probability in probabilities.items():
+            for card in hypothesis:
+                marginals[card] = marginals.get(card, 0.0) + probability
+
+        cards = set(suggestion['cards'])
+        for category in categories[:2]:
+            current = next(iter(cards & category))
+            best = max(sorted(category & marginals.keys()), key=lambda card: marginals[card], default=current)
+
+            if marginals.get(best, 0.0) > marginals.get(current, 0.0):
+                cards = (cards - {current}) | {best}
+
+        suggestion['cards'] = cards
+
+    @staticmethod
+    def _pick_card(cards, weights, rng=random):
+        """
+        Randomly pick one of the cards, favoring cards with a higher weight.
+
+        :param cards: the cards to pick from <set<string>>
+        :param weights: weight of each card (see auto.pad.Pad.envelope_weights) <dict<string:float>>
+        :param rng: the random number generator to pick with
+        :rtype : string
+        """
+        cards = sorted(cards)
+
+        return rng.choices(cards, [weights.get(card, 1.0) for card in cards])[0]
+
+    def _answer(self, suggestion):
+
+        """
+        Ask this computer player a question about whether they have one of three cards
+
+        :param suggestion: list<string> containing three valid card values.
+
+        :return: string containing a valid card value or no_match
+        """
+
+        # improve this by preferring not to return room cards because there are more
+        # room cards than any other cards. Helps to keep the other players guessing.
+        # might want to create a stack where the first items in are rooms so that rooms would
+        # be the last items that are popped off the stack in an answer
+        for card in suggestion:
+            if self._pad.has_card(self.player_id, card):
+                return card
+
+        return 'no_match'
+
+    def _mark_my_cards_on_pad(self, dealt_cards):
+
+        """
+        Mark the cards this player was dealt.
+
+        :type dealt_cards: list
+        :param dealt_cards: 
+        """
+        for card in dealt_cards:
+            # mark this player's sub-table to show that they have this set of cards (from 3 to 6)
+            self._pad.mark_card(self.player_id, card)
+
+    def _mark_pad(self, game_state):
+
+        # three possible suggestions are: True ("I have one of the cards suggested") if this player is not the one
+        # making the suggestion. False, ("I don't have one of the cards suggested") whether or not this player is
+        # the one making the suggestion. The actual card if this player is the one making the suggestion and there is
+        # a match to share.
+
+        """
+        Given the suggestion, mark this player's _pad.
+        :param game_state:
+        """
+
+        # example game_state for letting other players know of a response (undirected answer)
+        # {'answer': {'has_card': True, 'from_player': 'p02'}, 'suggestion': ['Plum', 'Hall', 'Candlestick']}
+
+        answer = game_state['answer']
+
+        # a no_match answer is a string, so check for it before reading the answer as a dictionary
+        if answer == 'no_match':
+            # no one has the suggested cards. It might be time to make an accusation (see below)
+            self._emit(events.NO_MATCH)
+        elif 'has_card' in answer and answer['has_card'] is True:
+            # mark c2 in the responding player's sub-table for each of the suggested cards
+            self._pad.mark_has_card(answer['from_player'], game_state['cards'])
+            self._emit(events.HAS_CARD, answer['from_player'], game_state['cards'])
+        elif answer and 'has_card' in answer and answer['has_card'] is False:
+            # the global/undirected update about suggested cards should just pass for now. This is the update
+            # sent to all other players in the game.
+            pass
+        # the asking player is given a directed answer in this final condition
+        else:
+            card_provided = answer['card']
+
+            # locate player 1's column 1 for the specified card and put a 1 in it
+            # if c1 is already checked somewhere else then a player is lie (game violation) or a code bug.
+            # should deal with this condition in code.
+            self._pad.mark_card(answer['from_player'], card_provided)
+            self._emit(events.ANSWER, answer['from_player'], [card_provided])
+
+            # when applying a batch of game states, clear c2 once after the batch (see update_many)
+            if self._pending_c2_clears is not None:
+                self._pending_c2_clears.add(card_provided)
+            else:
+                self._clear_c2_cells(card_provided)
+
+        # only the asking player gets to accuse, on a directed answer. When applying a batch of game states, the pad
+        # is analyzed once after the batch
+        if self._pending_c2_clears is not None or not self._is_directed_answer(game_state):
+            return
+
+        # this will only return a set of cards if it's time to accuse
+        return self._analyze_table_to_accuse()
+
+    def _acknowledge_marked_answer(self, game_state):
+        """
+        Acknowledge an undirected answer that a stacked table has already marked in c2 of this player's pad (see
+        auto.table.Table.broadcast). The answer is resolved on the pad and sent to the event sink as update would,
+        and the call is recorded and guarded as update is.
+
+        :param game_state: the undirected answer that a player has one of the suggested cards
+        :return: the same response as update
+        """
+        if self._diagnostics is not None and not self._diagnostics.recording:
+            return self._diagnostics.record(self, self._acknowledge_marked_answer, game_state)
+
+        if self._event_sink is not None and not self._event_sink.guarding:
+            return self._event_sink.guard(self, self._acknowledge_marked_answer, game_state)
+
+        responding_player = game_state['answer']['from_player']
+        self._pad.resolve_has_card(responding_player, game_state['cards'])
+        self._emit(events.HAS_CARD, responding_player, game_state['cards'])
+
+        return {'acknowledged': True}
+
+    def _clear_c2_cells(self, card_provided):
+        # clear the corresponding col2 cell for the answered card
+        # and do this for all of the players including this player
+        self._pad.clear_c2(card_provided)
+
+    def _get_state(self):
+        """
+        Get a snapshot of this player's state, including what is marked on the pad.
+
+        :return: the player's state using only builtin types
+        :rtype: dict
+        """
+        pad = {}
+        for player in self._pad.players_list:
+            c2 = {card: sorted(self._pad.c2_entries(player, card)) for card in self._cards}
+            pad[player] = {'c1': sorted(card for card in self._cards if self._pad.has_card(player, card)),
+                           'c2': {card: entries for card, entries in c2.items() if entries}}
+
+        return {'player_id': self.player_id,
+                'selected_suspect': self._selected_suspect,
+                'location': self._location,
+                'prior_moves': sorted(self._prior_moves),
+                'prior_moves_stack': list(self._prior_moves_stack),
+                'is_move_from_suggest': self._is_move_from_suggest,
+                'pad': pad}
+
+    @staticmethod
+    def _is_directed_answer(game_state):
+        """
+        Checks whether update handles this game state as the answer sent only to the asking player.
+
+        :param game_state: a game state dictionary (see update)
+        :return: true if the game state is a directed answer. Otherwise, false
+        :rtype: bool
+        """
+        return 'answer' in game_state and not ('positions' in game_state or 'suggestion' in game_state or
+                                                'cards' in game_state)
+
+    def _get_player(self, available_players_list):
+        """
+        Randomly choose a player from a list of available players. This determines starting position on _board.
+
+        :param available_players_list:list
+        :return: a randomly selected player
+        :rtype : str
+        """
+        return random.choice(available_players_list)
+
+    def _get_starting_location(self, selected_player):
+        """
+        Gets the starting position of the selected player.
+
+        :param selected_player <string>
+        :return: the selected player's starting hallway position
+        :rtype : str
+        """
+        return self._board.starting_positions[selected_player]
+
+    def _analyze_table_to_accuse(self):
+
+        if self._accusation_policy is not None:
+            return self._accusation_policy.decide(self._pad, self.player_id, self._get_categories())
+
+        unverified_cards = self._get_unknown_cards()
+
+        if len(unverified_cards) == 3:
+            return unverified_cards
+
+    def _get_unknown_cards(self):
+        """
+        Get the cards that aren't marked in a player's tracking pad
+
+        :return: unknown cards
+        """
+
+        # a card is unknown if c1 for the card isn't checked in any of the sub-tables
+        return self._pad.unknown_cards()
+
+
+def _estimate_envelope(deadline, pad, player_id, categories):
+    """
+    Estimate the envelope probabilities for anytime mode, sampling for SAMPLING_SHARE of the time left before the
+    deadline. This is a module function so that it can be sent to a process executor.
+
+    :param deadline: the time.monotonic() time by which the turn must be taken <float>
+    :return: the envelope probabilities (see auto.accusation.envelope_probabilities), or an empty dictionary when
+    there is no time left
+    :rtype: dict<frozenset<string>:float>
+    """
+    time_left = deadline - time.monotonic() - DEADLINE_MARGIN
+    if time_left <= 0:
+        return {}
+
+    return envelope_probabilities(pad, player_id, categories, time_left * SAMPLING_SHARE, max_samples=10 ** 9,
+                                  weights=pad.envelope_weights(player_id))
@@ -1,4 +1,37 @@
+import hashlib
+import json
+
 import networkx as nx
+import numpy as np
+
+# the declarative spec of the Clue-Less mansion: a 3 x 3 grid of rooms joined by 12 hallways, with secret passages
+# between opposite corner rooms. Each hallway joins the two rooms listed for it.
+CLUE_LESS = {
+    'rooms': ['Study', 'Hall', 'Lounge', 'Library', 'Billiard', 'Dining', 'Conservatory', 'Ballroom', 'Kitchen'],
+    'hallways': {
+        'Hallway_01': ['Study', 'Hall'],
+        'Hallway_02': ['Hall', 'Lounge'],
+        'Hallway_03': ['Study', 'Library'],
+        'Hallway_04': ['Hall', 'Billiard'],
+        'Hallway_05': ['Lounge', 'Dining'],
+        'Hallway_06': ['Library', 'Billiard'],
+        'Hallway_07': ['Billiard', 'Dining'],
+        'Hallway_08': ['Library', 'Conservatory'],
+        'Hallway_09': ['Billiard', 'Ballroom'],
+        'Hallway_10': ['Dining', 'Kitchen'],
+        'Hallway_11': ['Conservatory', 'Ballroom'],
+        'Hallway_12': ['Ballroom', 'Kitchen']
+    },
+    'secret_passages': [['Conservatory', 'Lounge'], ['Kitchen', 'Study']],
+    'starting_positions': {
+        'Scarlet': 'Hallway_02',
+        'Plum': 'Hallway_03',
+        'Mustard': 'Hallway_05',
+        'Peacock': 'Hallway_08',
+        'Green': 'Hallway_11',
+        'White': 'Hallway_12'
+    }
+}
 
 
 class Board:
@@ -7,27 +40,123 @@ class Board:
 
     """
 
-    def __init__(self):
+    # compiled boards, keyed by the hash of their spec (see from_spec)
+    _compiled = {}
+
+    def __init__(self, spec=None, cache=None):
         """
-        Creates the _board for the game of Clue-Less
+        Creates the _board for the game of Clue-Less or for a variant of the game described by a spec. A spec is a
+        dictionary in the form of CLUE_LESS:
+
+            {'rooms': [room<str>, ...],
+             'hallways': {hallway<str>: [room<str>, room<str>], ...},
+             'secret_passages': [[room<str>, room<str>], ...],
+             'starting_positions': {suspect<str>: location<str>, ...}}
+
+        Boards are compiled once and should not be changed afterwards. Use from_spec to share one compiled board
+        between all of the games using a spec.
+
+        :param spec: the spec of the board. Defaults to CLUE_LESS <dict>
+        :param cache: an auto.tablecache.TableCache to read the distance table from instead of computing it
 
         :var _board <networkx.Graph> class variable
+        :var spec_hash <string> the hash of the spec (see spec_hash)
+        :var rooms <frozenset<string>>
+        :var hallways <frozenset<string>>
+        :var starting_positions <dictionary<string:string>> the starting location of each suspect
+        :var _location_bits <dictionary<string:int>> the bit for each location in a location mask
+        :var _neighbors <dictionary<string:frozenset<string>>> the locations next to each location
+        :var _neighbor_masks <dictionary<string:int>> the location mask of the locations next to each location
+        :var _locations <list<string>> the locations, sorted
+        :var _location_index <dictionary<string:int>> the index of each location in _locations
+        :var _distances <numpy.ndarray<int16>> the number of moves between any two locations, by index, or -1 when
+        there is no way between them
+
+        :raise
+            ValueError if a hallway, secret passage or starting position refers to a location not on the board
 
         """
+        spec = spec if spec is not None else CLUE_LESS
+
+        self.spec_hash = spec_hash(spec)
+        self.rooms = frozenset(spec['rooms'])
+        self.hallways = frozenset(spec['hallways'])
+        self.starting_positions = dict(spec.get('starting_positions', {}))
+
         self._board = nx.Graph()
-        self._board.add_edges_from([('Study', 'Hallway_01'), ('Study', 'Hallway_03')])
-        self._board.add_edges_from([('Hallway_01', 'Hall'), ('Hallway_03', 'Library')])
-        self._board.add_edges_from([('Library', 'Hallway_08'), ('Hallway_08', 'Conservatory')])
-        self._board.add_edges_from([('Conservatory', 'Hallway_11'), ('Hallway_11', 'Ballroom')])
-        self._board.add_edges_from([('Ballroom', 'Hallway_12'), ('Hallway_12', 'Kitchen')])
-        self._board.add_edges_from([('Hall', 'Hallway_04'), ('Hallway_04', 'Billiard')])
-        self._board.add_edges_from([('Billiard', 'Hallway_09'), ('Hallway_09', 'Ballroom')])
-        self._board.add_edges_from([('Hall', 'Hallway_02'), ('Hallway_02', 'Lounge')])
-        self._board.add_edges_from([('Lounge', 'Hallway_05'), ('Hallway_05', 'Dining')])
-        self._board.add_edges_from([('Dining', 'Hallway_10'), ('Hallway_10', 'Kitchen')])
-        self._board.add_edges_from([('Library', 'Hallway_06'), ('Hallway_06', 'Billiard')])
-        self._board.add_edges_from([('Billiard', 'Hallway_07'), ('Hallway_07', 'Dining')])
-        self._board.add_edges_from([('Conservatory', 'Lounge'), ('Kitchen', 'Study')])
+        self._board.add_nodes_from(self.rooms)
+
+        for hallway, rooms in sorted(spec['hallways'].items()):
+            self._check_rooms(hallway, rooms)
+            self._board.add_edges_from([(rooms[0], hallway), (hallway, rooms[1])])
+
+        for rooms in spec.get('secret_passages', []):
+            self._check_rooms('secret passage', rooms)
+            self._board.add_edge(rooms[0], rooms[1])
+
+        for suspect, location in self.starting_positions.items():
+            if location not in self._board:
+                raise ValueError('the starting position {0} of {1} is not on the board'.format(location, suspect))
+
+        self._compile(cache)
+
+    @classmethod
+    def from_spec(cls, spec=None, cache=None):
+        """
+        Gets the compiled board for a spec, compiling it the first time the spec is used.
+
+        :param spec: the spec of the board. Defaults to CLUE_LESS <dict>
+        :param cache: an auto.tablecache.TableCache to compile the board from, the first time the spec is used
+        :rtype : Board
+        """
+        key = spec_hash(spec if spec is not None else CLUE_LESS)
+
+        board = cls._compiled.get(key)
+        if board is None:
+            board = cls._compiled[key] = cls(spec, cache)
+
+        return board
+
+    def _check_rooms(self, name, rooms):
+        """
+        :raise
+            ValueError if the rooms joined by a hallway or secret passage aren't two rooms of the board
+        """
+        if len(rooms) != 2 or not self.rooms.issuperset(rooms):
+            raise ValueError('{0} must join two rooms of the board, not {1}'.format(name, rooms))
+
+    def _compile(self, cache=None):
+        """
+        Precompute the tables used on every turn: a bit for each location, so that a set of locations can be held
+        in one int (location mask), the neighbors of each location as a set and as a location mask, and the number
+        of moves between any two locations. With a cache, the distance table is built once for the spec and mapped
+        from disk afterwards.
+        """
+        locations = sorted(self._board.nodes)
+
+        self._locations = locations
+        self._location_index = {location: i for i, location in enumerate(locations)}
+        self._location_bits = {location: 1 << i for i, location in enumerate(locations)}
+        self._neighbors = {location: frozenset(self._board.neighbors(location)) for location in locations}
+        self._neighbor_masks = {location: self.location_mask(neighbors)
+                                for location, neighbors in self._neighbors.items()}
+
+        if cache is not None:
+            self._distances = cache.get('board', {'spec_hash': self.spec_hash}, self._build_tables)['distances']
+        else:
+            self._distances = self._build_tables()['distances']
+
+    def _build_tables(self):
+        """
+        :rtype : dict<string:numpy.ndarray>
+        :return: the distance table (see _compile)
+        """
+        distances = np.full((len(self._locations), len(self._locations)), -1, dtype=np.int16)
+        for location, lengths in nx.all_pairs_shortest_path_length(self._board):
+            for other, length in lengths.items():
+                distances[self._location_index[location], self._location_index[other]] = length
+
+        return {'distances': distances}
 
     def neighborhood(self, node, n):
         """
@@ -37,5 +166,62 @@ class Board:
         :param n: number of nodes away from the target node <int>
         :return: set of nodes set<string>
         """
-        path_lengths = nx.single_source_dijkstra_path_length(self._board, node)
-        return {node for node, length in path_lengths.items() if length == n}
\ No newline at end of file
+        return {self._locations[i] for i in np.flatnonzero(self._distances[self._location_index[node]] == n)}
+
+    def distance(self, source, target):
+        """
+        :param source: name of a location <string>
+        :param target: name of a location <string>
+        :return: the number of moves from source to target, or None if target can't be reached <int>
+        """
+        length = self._distances[self._location_index[source], self._location_index[target]]
+
+        return int(length) if length >= 0 else None
+
+    def neighbors(self, node):
+        """
+        Gets the locations next to a location, which are the possible next moves from it.
+
+        :param node: name of the location <string>
+        :return: set of locations frozenset<string>
+        """
+        return self._neighbors[node]
+
+    def neighbor_mask(self, node):
+        """
+        :param node: name of the location <string>
+        :return: the location mask of the locations next to the location <int>
+        """
+        return self._neighbor_masks[node]
+
+    def location_mask(self, locations):
+        """
+        Converts a set of locations to a location mask. Names that aren't locations on the board are ignored.
+
+        :param locations: names of locations <iterable<string>>
+        :return: location mask <int>
+        """
+        mask = 0
+        for location in locations:
+            mask |= self._location_bits.get(location, 0)
+
+        return mask
+
+    def locations(self, mask):
+        """
+        Converts a location mask back to the set of locations.
+
+        :param mask: location mask <int>
+        :return: set of locations set<string>
+        """
+        return {location for location, bit in self._location_bits.items() if mask & bit}
+
+
+def spec_hash(spec):
+    """
+    Hash a board spec. Specs that describe the same board in a different order of keys hash the same.
+
+    :param spec: the spec of a board <dict>
+    :rtype : string
+    """
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode('UTF-8')).hexdigest()
@@ -0,0 +1,226 @@
+import contextlib
+import contextvars
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+
+"""
+    :module:: diagnostics
+    :platform: Unix, Windows
+    :synopsis: Opt-in capture of profiles for slow or allocation heavy take_turn and update calls.
+
+"""
+
+
+# the recorder profiling a call in the current thread or asyncio task, if any
+_recording = contextvars.ContextVar('recording', default=None)
+
+# tracemalloc is process wide, so it is started by the first call recorded and stopped when the last call being
+# recorded in any thread has finished. It is left alone if it was already tracing before that
+_tracing_lock = threading.Lock()
+_tracing_calls = 0
+_started_tracing = False
+
+
+class SlowCallRecorder:
+    """
+    Records a cProfile trace and a tracemalloc snapshot of a computer player's take_turn or update call when the call
+    takes longer than a latency threshold or allocates more than an allocation threshold. The game state sent to the
+    call and the state of the player are stored with the trace.
+
+    A call can't be known to be slow until it has finished, so every call made while recording is profiled and the
+    trace is kept only for slow calls. This is a diagnostic mode, not something to leave on for every seat. A recorder
+    can be shared by players whose calls are made in different threads or asyncio tasks. A thread runs one profiler at
+    a time, so a call that starts while another call of the same thread is being profiled, such as overlapping
+    record_async calls, is timed and traced but not profiled. Recording never makes the call fail: a trace that
+    can't be written is reported as a warning.
+
+    Traces are written to a bounded ring of slot directories, slow_call_00 to slow_call_<ring_size - 1>. Once the ring
+    is full, the oldest slot is overwritten.
+
+    """
+
+    def __init__(self, directory, latency_threshold=0.1, allocation_threshold=None, ring_size=16):
+        """
+        :param directory: the directory holding the ring of slow call traces
+        :param latency_threshold: seconds a call can take before it is recorded, None to ignore latency <float>
+        :param allocation_threshold: bytes a call can allocate before it is recorded, None to ignore allocation <int>
+        :param ring_size: the number of slow calls kept on disk <int>
+
+        """
+        self.directory = directory
+        self.latency_threshold = latency_threshold
+        self.allocation_threshold = allocation_threshold
+        self.ring_size = ring_size
+
+        # calls in different threads write to the ring one at a time
+        self._ring_lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def recording(self):
+        """
+        :rtype: bool
+        :return: true while a call is being profiled in the current thread or asyncio task
+        """
+        return _recording.get() is self
+
+    def record(self, player, call, game_state, **kwargs):
+        """
+        Make a call for a player under the profilers and write the trace to the ring if the call is slow.
+
+        :param player: the auto.automaton.Player making the call
+        :param call: the bound take_turn or update method of the player
+        :param game_state: the game state sent to the call
+        :param kwargs: other arguments of the call, such as the take_turn deadline
+        :return: whatever the call returns
+        """
+        with self._recorded(player, call.__name__, game_state):
+            return call(game_state, **kwargs)
+
+    async def record_async(self, player, call, game_state, **kwargs):
+        """
+        Await a coroutine call for a player under the profilers, as record does. The profile also holds whatever
+        else the event loop ran while the call was waiting.
+
+        :param player: the auto.automaton.Player making the call
+        :param call: the bound take_turn_async method of the player
+        :param game_state: the game state sent to the call
+        :param kwargs: other arguments of the call, such as the take_turn deadline
+        :return: whatever the call returns
+        """
+        with self._recorded(player, call.__name__, game_state):
+            return await call(game_state, **kwargs)
+
+    @contextlib.contextmanager
+    def _recorded(self, player, call_name, game_state):
+        """
+        Profile the body of the with statement and write the trace to the ring if it is slow.
+        """
+        # the call may change the game state and the player, so keep a copy of both as they were when it was made
+        sent_game_state = json.dumps(game_state, default=_encode)
+        player_state = json.dumps(player._get_state(), default=_encode)
+
+        _start_tracing()
+
+        # the peak can't be reset for one call while other calls are traced, so the allocation of a call is the
+        # memory it leaves allocated, together with whatever calls in other threads allocated meanwhile
+        start_memory = tracemalloc.get_traced_memory()[0]
+
+        profiler = cProfile.Profile() if sys.getprofile() is None else None
+        token = _recording.set(self)
+        start = time.perf_counter()
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # another profiling tool is active
+                profiler = None
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+            _recording.reset(token)
+
+            try:
+                allocated = tracemalloc.get_traced_memory()[0] - start_memory
+
+                if self._is_slow(elapsed, allocated):
+                    with self._ring_lock:
+                        self._write(player, call_name, sent_game_state, player_state, elapsed, allocated, profiler,
+                                    tracemalloc.take_snapshot())
+            except Exception as error:
+                warnings.warn('slow {0} call of {1} not recorded: {2!r}'.format(call_name, player.player_id, error),
+                              RuntimeWarning)
+            finally:
+                _stop_tracing()
+
+    def _is_slow(self, elapsed, allocated):
+        """
+        :rtype: bool
+        :return: true if the call went over either of the thresholds
+        """
+        return (self.latency_threshold is not None and elapsed > self.latency_threshold) or \
+               (self.allocation_threshold is not None and allocated > self.allocation_threshold)
+
+    def _write(self, player, call_name, sent_game_state, player_state, elapsed, allocated, profiler, snapshot):
+        """
+        Write the trace of a slow call into the next slot of the ring. A call that wasn't profiled has no
+        profile.prof.
+        """
+        slot = os.path.join(self.directory, 'slow_call_{0:02d}'.format(self._next_slot()))
+        os.makedirs(slot, exist_ok=True)
+
+        if profiler is not None:
+            profiler.dump_stats(os.path.join(slot, 'profile.prof'))
+        snapshot.dump(os.path.join(slot, 'tracemalloc.snapshot'))
+
+        call = {'call': call_name,
+                'player_id': player.player_id,
+                'recorded_at': time.time(),
+                'elapsed': elapsed,
+                'allocated': allocated,
+                'profiled': profiler is not None,
+                'game_state': json.loads(sent_game_state),
+                'player_state': json.loads(player_state)}
+
+        with open(os.path.join(slot, 'call.json'), 'w') as call_file:
+            json.dump(call, call_file, default=_encode, indent=2)
+
+    def _next_slot(self):
+        """
+        Gets the slot to write and advances the ring. The position in the ring is kept on disk so that it carries
+        over between processes writing to the same directory.
+
+        :rtype: int
+        """
+        ring_path = os.path.join(self.directory, 'ring.json')
+
+        try:
+            with open(ring_path) as ring_file:
+                slot = json.load(ring_file)['next_slot'] % self.ring_size
+        except (OSError, ValueError, KeyError):
+            slot = 0
+
+        with open(ring_path, 'w') as ring_file:
+            json.dump({'next_slot': (slot + 1) % self.ring_size}, ring_file)
+
+        return slot
+
+
+def _start_tracing():
+    global _tracing_calls, _started_tracing
+
+    with _tracing_lock:
+        if _tracing_calls == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_calls += 1
+
+
+def _stop_tracing():
+    global _tracing_calls, _started_tracing
+
+    with _tracing_lock:
+        _tracing_calls -= 1
+        if _tracing_calls == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+def _encode(value):
+    """
+    Encode the sets used in game states and player state for json.
+    """
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+
+    raise TypeError('{0} is not JSON serializable'.format(type(value).__name__))
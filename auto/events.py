@@ -0,0 +1,255 @@
+import contextlib
+import contextvars
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+from auto.board import Board
+from auto.playermatrix import PlayerMatrix
+
+"""
+    :module:: events
+    :platform: Unix, Windows
+    :synopsis: Structured trace events of the computer players, sampled into a binary ring buffer dumped on error.
+
+"""
+
+# the kinds of events, in the order of their codes. The fields of an event depend on its kind:
+#
+#   turn:       the location moved to and the suggested room, suspect and weapon (-1 without a suggestion)
+#   suggestion: the seat of the suggesting player and the suggested cards
+#   answer:     the seat of the answering player and the card shown
+#   has_card:   the seat of the answering player and the suggested cards
+#   no_match:   no fields
+#   accusation: the accused cards
+#   error:      no fields
+KINDS = ('turn', 'suggestion', 'answer', 'has_card', 'no_match', 'accusation', 'error')
+TURN, SUGGESTION, ANSWER, HAS_CARD, NO_MATCH, ACCUSATION, ERROR = range(len(KINDS))
+
+# the most fields an event has
+FIELDS = 4
+
+# a record of the ring buffer. Names, such as cards and locations, are recorded as their code (see EventSink.code)
+_RECORD = np.dtype([('time', np.float64), ('kind', np.int8), ('seat', np.int8), ('fields', np.int16, FIELDS)])
+
+# the sink guarding a call in the current thread or asyncio task, if any
+_guarding = contextvars.ContextVar('guarding', default=None)
+
+
+class EventSink:
+    """
+    The one sink the computer players send their trace events to. An event is a kind, the seat of the player and up
+    to FIELDS small ints, so sending an event formats nothing: names are recorded as codes and events are only
+    turned into text when a dump is read (see format_events).
+
+    Events are kept in a binary ring buffer of the last capacity events. The buffer is only written to disk when a
+    call of a player fails (see guard), so the events leading up to an error are kept without writing anything the
+    rest of the time.
+
+    Which events are kept is decided when they are sent, cheapest check first:
+
+        seats:        only the events of these seats are kept
+        sample_rates: the share of the events of each kind that is kept, at random
+        rate_limit:   at most this many events a second are kept, with bursts of up to one second of events
+
+    """
+
+    def __init__(self, directory, capacity=4096, seats=None, sample_rates=None, rate_limit=None, names=None,
+                 seed=None, clock=time.monotonic):
+        """
+        :param directory: the directory dumps are written to. Created on the first dump
+        :param capacity: the number of events kept in the ring buffer <int>
+        :param seats: the seats whose events are kept, or None for all seats <iterable<int>>
+        :param sample_rates: the share (0 - 1) of the events of a kind that is kept. Kinds left out are all kept
+        <dict<string:float>>
+        :param rate_limit: the most events kept a second, or None for no limit <float>
+        :param names: the names of the cards and locations that events refer to. Defaults to the Clue-Less cards
+        and board <iterable<string>>
+        :param seed: the seed of the sampling <int>
+        :param clock: the clock of the event times and the rate limit, in seconds
+
+        :var
+            dropped: int, the number of events sent but not kept
+        """
+        self.directory = directory
+        self.capacity = capacity
+        self.dropped = 0
+
+        if names is None:
+            names = set(PlayerMatrix.cards) | set(Board.from_spec()._locations)
+        self.names = sorted(names)
+        self._codes = {name: code for code, name in enumerate(self.names)}
+
+        self._seats = frozenset(seats) if seats is not None else None
+        self._sample_rates = [(sample_rates or {}).get(kind, 1.0) for kind in KINDS]
+        self._rng = random.Random(seed)
+        self._clock = clock
+
+        # the token bucket of the rate limit
+        self._rate_limit = rate_limit
+        self._tokens = rate_limit
+        self._refilled = clock()
+
+        self._records = np.zeros(capacity, dtype=_RECORD)
+        self._count = 0
+
+    def code(self, name):
+        """
+        :param name: a card or location <string>
+        :rtype : int
+        :return: the code recorded for the name, -1 for None or an empty name
+        """
+        return self._codes[name] if name else -1
+
+    def enabled(self, seat):
+        """
+        :param seat: the seat of a player
+        :rtype : bool
+        :return: true if events of the seat can be kept. Check this before working out the fields of an event
+        """
+        return self._seats is None or seat in self._seats
+
+    def emit(self, kind, seat, *fields):
+        """
+        Send an event to the sink.
+
+        :param kind: the code of the kind of the event, such as TURN <int>
+        :param seat: the seat of the player sending the event <int>
+        :param fields: the fields of the event <int>
+        """
+        if not self.enabled(seat):
+            return
+
+        rate = self._sample_rates[kind]
+        if rate < 1.0 and self._rng.random() >= rate:
+            self.dropped += 1
+            return
+
+        now = self._clock()
+        if self._rate_limit is not None:
+            self._tokens = min(self._rate_limit, self._tokens + (now - self._refilled) * self._rate_limit)
+            self._refilled = now
+            if self._tokens < 1.0:
+                self.dropped += 1
+                return
+            self._tokens -= 1.0
+
+        record = self._records[self._count % self.capacity]
+        record['time'] = now
+        record['kind'] = kind
+        record['seat'] = seat
+        record['fields'] = fields + (-1,) * (FIELDS - len(fields))
+
+        self._count += 1
+
+    def events(self):
+        """
+        :rtype : numpy.ndarray
+        :return: the events in the ring buffer, oldest first
+        """
+        if self._count <= self.capacity:
+            return self._records[:self._count].copy()
+
+        start = self._count % self.capacity
+
+        return np.concatenate([self._records[start:], self._records[:start]])
+
+    @property
+    def guarding(self):
+        """
+        :rtype : bool
+        :return: true while a call is guarded in the current thread or asyncio task
+        """
+        return _guarding.get() is self
+
+    def guard(self, player, call, game_state, **kwargs):
+        """
+        Make a call for a player, dumping the ring buffer if the call raises.
+
+        :param player: the auto.automaton.Player making the call
+        :param call: the bound take_turn or update method of the player
+        :param game_state: the game state sent to the call
+        :param kwargs: other arguments of the call, such as the take_turn deadline
+        :return: whatever the call returns
+        """
+        with self._guarded(player):
+            return call(game_state, **kwargs)
+
+    async def guard_async(self, player, call, game_state, **kwargs):
+        """
+        Await a coroutine call for a player, dumping the ring buffer if the call raises.
+
+        :param player: the auto.automaton.Player making the call
+        :param call: the bound take_turn_async method of the player
+        :param game_state: the game state sent to the call
+        :param kwargs: other arguments of the call, such as the take_turn deadline
+        :return: whatever the call returns
+        """
+        with self._guarded(player):
+            return await call(game_state, **kwargs)
+
+    @contextlib.contextmanager
+    def _guarded(self, player):
+        """
+        Dump the ring buffer if the body of the with statement raises.
+        """
+        # the seat is looked up before the call, so that the error event can't raise in turn
+        seat = player._pad.seat(player.player_id)
+
+        token = _guarding.set(self)
+        try:
+            yield
+        except Exception as error:
+            self.emit(ERROR, seat)
+            self.dump(player.player_id, error)
+            raise
+        finally:
+            _guarding.reset(token)
+
+    def dump(self, player_id, error):
+        """
+        Write the ring buffer to the directory, as <name>.npy with the events and <name>.json with what is needed
+        to read them.
+
+        :param player_id: id of the player whose call failed
+        :param error: the exception raised
+        :rtype : string
+        :return: the path of the dump, without the extension
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, 'events_{0}_{1}_{2}'.format(player_id, os.getpid(), self._count))
+
+        np.save(path + '.npy', self.events())
+        with open(path + '.json', 'w') as meta_file:
+            json.dump({'player_id': player_id, 'error': repr(error), 'dumped_at': time.time(), 'kinds': list(KINDS),
+                       'names': self.names, 'dropped': self.dropped}, meta_file)
+
+        return path
+
+
+def format_events(path):
+    """
+    Read a dump of the ring buffer as text, one line per event.
+
+    :param path: the path of the dump, without the extension (see EventSink.dump)
+    :rtype : generator<string>
+    """
+    with open(path + '.json') as meta_file:
+        meta = json.load(meta_file)
+
+    kinds, names = meta['kinds'], meta['names']
+
+    for record in np.load(path + '.npy'):
+        kind = kinds[record['kind']]
+        fields = [int(field) for field in record['fields'] if field >= 0]
+
+        # the fields naming a seat come first and are kept as numbers
+        if kind in ('suggestion', 'answer', 'has_card'):
+            fields = ['seat {0}'.format(fields[0])] + [names[field] for field in fields[1:]]
+        else:
+            fields = [names[field] for field in fields]
+
+        yield '{0:.6f} seat {1} {2} {3}'.format(record['time'], record['seat'], kind, ' '.join(fields)).rstrip()
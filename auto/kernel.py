@@ -0,0 +1,418 @@
+import numpy as np
+
+from auto.automaton import Player
+from auto.board import Board
+from auto.playermatrix import PlayerMatrix, _suspects, _weapons, _rooms
+
+"""
+    :module:: kernel
+    :platform: Unix, Windows
+    :synopsis: A vectorized kernel that plays many Clue-Less games in lockstep for evaluating strategies.
+
+"""
+
+
+def deal(seed, number_of_players):
+    """
+    Deal a game from a seed: one card of each category goes into the envelope and the rest are shuffled and dealt
+    around the table. The kernel and reference_game deal the same game from the same seed.
+
+    :param seed: the seed of the game <int>
+    :param number_of_players: the number of players at the table <int>
+    :rtype : tuple<list<string>, list<list<string>>>
+    :return: the envelope (suspect, weapon, room) and the hand of each seat
+    """
+    rng = np.random.default_rng(seed)
+
+    envelope = [sorted(category)[rng.integers(len(category))] for category in (_suspects, _weapons, _rooms)]
+
+    rest = [card for card in sorted(PlayerMatrix.cards) if card not in envelope]
+    rest = [rest[i] for i in rng.permutation(len(rest))]
+
+    return envelope, [sorted(rest[seat::number_of_players]) for seat in range(number_of_players)]
+
+
+class GameKernel:
+    """
+    Plays a batch of Clue-Less games in lockstep. The state of every game is held in numpy arrays indexed by game,
+    seat, card and location, and each turn is a handful of array operations over all of the games at once.
+
+    The rules are the ones auto.automaton.Player plays by:
+        move:    to a neighboring location that isn't occupied, favoring locations the player hasn't been to. A
+                 player with nowhere to go stays. A player whose suspect was named in a suggestion they were asked
+                 about stays in their room to suggest from it, rather than leave it for a hallway.
+        suggest: when in a room after moving, the room with an unknown suspect and an unknown weapon (any suspect
+                 or weapon when every card of the category is known)
+        answer:  the first player after the suggesting player holding a suggested card shows it to them. The
+                 other players note that the answering player holds one of the suggested cards (a c2 group)
+        deduce:  a player holds the last card of one of their c2 groups once the other cards of the group are
+                 known to be held by other players (see auto.watches.WatchedGroups)
+        accuse:  after being shown a card, or told that nobody could answer, once exactly three cards are unknown to
+                 the player, which is then the envelope
+
+    What a player knows is the holder of the cards they hold, have been shown or have deduced. Suggested suspects
+    aren't moved into the room of the suggestion.
+
+    Seat n plays the n-th suspect of the board's starting positions.
+
+    """
+
+    def __init__(self, seeds, number_of_players, board=None, max_turns=500, deals=None):
+        """
+        Deal a game for each seed.
+
+        :param seeds: the seed of each game (see deal) <list<int>>
+        :param number_of_players: the number of players in every game (3 - 6) <int>
+        :param board: the auto.board.Board to play on, defaults to the Clue-Less board
+        :param max_turns: games still going after this many turns end without a winner <int>
+        :param deals: the envelope and hands of each game, in the form returned by deal, to play instead of the
+        games dealt from the seeds. The seeds still seed the choices of the players <list<tuple>>
+
+        :var
+            hands: numpy.ndarray<bool>, games x seats x cards, the cards dealt to each seat
+            envelope: numpy.ndarray<int>, games x 3, the envelope cards
+            holder: numpy.ndarray<int8>, games x seats x cards, the holder of each card as known to each seat, or -1
+            location: numpy.ndarray<int>, games x seats, the location of each seat
+            visited: numpy.ndarray<bool>, games x seats x locations, the locations each seat has been to
+            summoned: numpy.ndarray<bool>, games x seats, whether the seat's suspect was named in a suggestion
+            finished: numpy.ndarray<bool>, games
+            winner: numpy.ndarray<int>, games, the winning seat or -1
+            turns: numpy.ndarray<int>, games, the turns taken in each game
+        """
+        board = board if board is not None else Board.from_spec()
+
+        self.number_of_players = number_of_players
+        self.max_turns = max_turns
+        self.turn = 0
+
+        self.cards = sorted(PlayerMatrix.cards)
+        self.locations = sorted(board.rooms | board.hallways)
+        card_index = {card: c for c, card in enumerate(self.cards)}
+        location_index = {location: l for l, location in enumerate(self.locations)}
+
+        # the tables shared by all of the games: the neighbors of each location, the card of each room (-1 for a
+        # hallway) and the cards of each category
+        self._adjacency = np.zeros((len(self.locations), len(self.locations)), dtype=bool)
+        for location, l in location_index.items():
+            self._adjacency[l, [location_index[neighbor] for neighbor in board.neighbors(location)]] = True
+
+        self._room_card = np.array([card_index.get(location, -1) if location in board.rooms else -1
+                                    for location in self.locations])
+        self._suspects = np.array([card in _suspects for card in self.cards])
+        self._weapons = np.array([card in _weapons for card in self.cards])
+
+        # the suspect card of each seat
+        self._seat_suspects = np.array([card_index[suspect]
+                                        for suspect in list(board.starting_positions)[:number_of_players]])
+
+        games = len(seeds)
+        self.hands = np.zeros((games, number_of_players, len(self.cards)), dtype=bool)
+        self.envelope = np.zeros((games, 3), dtype=int)
+
+        if deals is None:
+            deals = [deal(seed, number_of_players) for seed in seeds]
+
+        for g, (envelope, hands) in enumerate(deals):
+            self.envelope[g] = [card_index[card] for card in envelope]
+            for seat, hand in enumerate(hands):
+                self.hands[g, seat, [card_index[card] for card in hand]] = True
+
+        self.holder = np.where(self.hands, np.arange(number_of_players, dtype=np.int8)[:, None], -1).astype(np.int8)
+
+        # the c2 groups noted by each seat: the three cards and the player holding one of them, or -1 once the
+        # group is resolved. Grown as groups are added (see _add_groups)
+        self._group_cards = np.zeros((games, number_of_players, 16, 3), dtype=np.int8)
+        self._group_player = np.full((games, number_of_players, 16), -1, dtype=np.int8)
+        self._group_count = np.zeros((games, number_of_players), dtype=int)
+
+        starting_positions = list(board.starting_positions.values())[:number_of_players]
+        self.location = np.tile([location_index[location] for location in starting_positions], (games, 1))
+        self.visited = np.zeros((games, number_of_players, len(self.locations)), dtype=bool)
+        self.visited[np.arange(games)[:, None], np.arange(number_of_players), self.location] = True
+        self.summoned = np.zeros((games, number_of_players), dtype=bool)
+
+        self.finished = np.zeros(games, dtype=bool)
+        self.winner = np.full(games, -1)
+        self.turns = np.zeros(games, dtype=int)
+
+        self._rng = np.random.default_rng(list(seeds))
+
+    @property
+    def known(self):
+        """
+        :rtype : numpy.ndarray<bool>
+        :return: games x seats x cards, the cards each seat knows the holder of
+        """
+        return self.holder >= 0
+
+    def run(self):
+        """
+        Play every game to the end.
+
+        :rtype : dict<string:numpy.ndarray>
+        :return: the winning seat (-1 for none) and the turns taken in each game
+        """
+        while not self.finished.all():
+            self.step()
+
+        return {'winner': self.winner, 'turns': self.turns}
+
+    def step(self, moves=None, suggestions=None, shown=None):
+        """
+        Play one turn of every game that hasn't finished. Every game is at the same seat's turn.
+
+        The choices of the players can be given instead of made by the kernel, which is how the kernel is checked
+        against auto.automaton.Player (see reference_game):
+
+        :param moves: the location index each game's player moves to <numpy.ndarray<int>>
+        :param suggestions: the suspect and weapon card indexes each game's player suggests, -1 for no suggestion
+        <numpy.ndarray<int>> games x 2
+        :param shown: the card index shown to each game's player, -1 to show the first suggested card held
+        <numpy.ndarray<int>>
+        :rtype : dict<string:numpy.ndarray>
+        :return: the seat whose turn it was and, for each game, the location moved to, the suggested cards (-1 for
+        none), the answering seat (-1 for none), the card shown (-1 for none) and whether the player accused
+        """
+        games = np.flatnonzero(~self.finished)
+        seat = self.turn % self.number_of_players
+
+        location = self.location[games, seat]
+
+        if moves is None:
+            occupied = np.zeros((len(games), len(self.locations)), dtype=bool)
+            occupied[np.arange(len(games))[:, None], self.location[games]] = True
+
+            possible = self._adjacency[location] & ~occupied
+            available = possible & ~self.visited[games, seat]
+            choices = np.where(available.any(axis=1)[:, None], available, possible)
+
+            moved = np.where(choices.any(axis=1), self._pick(choices), location)
+
+            # a summoned player stays in their room rather than go into a hallway
+            stays = self.summoned[games, seat] & (self._room_card[location] >= 0) & (self._room_card[moved] < 0)
+            self.summoned[games[stays | (moved == location)], seat] = False
+
+            location = np.where(stays, location, moved)
+        else:
+            location = np.asarray(moves)[games]
+
+        self.location[games, seat] = location
+        self.visited[games, seat, location] = True
+
+        # suggest from a room
+        room = self._room_card[location]
+        suggesting = room >= 0
+
+        known = self.holder[games, seat] >= 0
+        if suggestions is None:
+            suspect = self._pick_unknown(known, self._suspects)
+            weapon = self._pick_unknown(known, self._weapons)
+        else:
+            suspect, weapon = np.asarray(suggestions)[games].T
+            suggesting &= suspect >= 0
+
+        suggested = np.where(suggesting[:, None], np.stack([room, suspect, weapon], axis=1), -1)
+
+        # answer: the players after the suggesting player are asked in turn
+        answerer = np.full(len(games), -1)
+        for k in range(1, self.number_of_players):
+            other = (seat + k) % self.number_of_players
+            asked = suggesting & (answerer < 0)
+            self.summoned[games[asked & (suggested == self._seat_suspects[other]).any(axis=1)], other] = True
+
+            holds = asked & self.hands[games[:, None], other, suggested].any(axis=1)
+            answerer[holds] = other
+
+        answered = answerer >= 0
+        held = self.hands[games[:, None], np.maximum(answerer, 0)[:, None], suggested] & answered[:, None]
+
+        card = np.where(answered, suggested[np.arange(len(games)), held.argmax(axis=1)], -1)
+        if shown is not None:
+            card = np.where(answered & (np.asarray(shown)[games] >= 0), np.asarray(shown)[games], card)
+
+        self.holder[games[answered], seat, card[answered]] = answerer[answered]
+
+        # the players that weren't part of the answer note that the answering player holds one of the cards
+        observers = [other for other in range(self.number_of_players) if other != seat]
+        rows_games, rows_seats = [games[answered]], [np.full(answered.sum(), seat)]
+        for other in observers:
+            noting = answered & (answerer != other)
+            self._add_groups(games[noting], other, answerer[noting], suggested[noting])
+            rows_games.append(games[noting])
+            rows_seats.append(np.full(noting.sum(), other))
+
+        self._resolve_groups(np.concatenate(rows_games), np.concatenate(rows_seats))
+
+        # accuse once the envelope is all that is unknown. The player looks at the pad after any answer to a
+        # suggestion, including the answer that nobody could show a card
+        accused = suggesting & ((self.holder[games, seat] < 0).sum(axis=1) == 3)
+        self.winner[games[accused]] = seat
+
+        self.turns[games] += 1
+        self.turn += 1
+        self.finished[games[accused]] = True
+        self.finished[self.turns >= self.max_turns] = True
+
+        return {'seat': seat, 'games': games, 'move': location, 'suggestion': suggested, 'answerer': answerer,
+                'shown': card, 'accused': accused}
+
+    def _add_groups(self, games, seat, players, cards):
+        """
+        Add a c2 group to a seat in each of the games.
+
+        :param games: the game indexes <numpy.ndarray<int>>
+        :param seat: the seat noting the groups <int>
+        :param players: the player holding one of the cards in each game <numpy.ndarray<int>>
+        :param cards: the three cards of each group <numpy.ndarray<int>> games x 3
+        """
+        slots = self._group_count[games, seat]
+
+        if len(slots) and slots.max() >= self._group_player.shape[2]:
+            # double the room for groups
+            self._group_cards = np.concatenate([self._group_cards, np.zeros_like(self._group_cards)], axis=2)
+            self._group_player = np.concatenate([self._group_player, np.full_like(self._group_player, -1)], axis=2)
+
+        self._group_cards[games, seat, slots] = cards
+        self._group_player[games, seat, slots] = players
+        self._group_count[games, seat] += 1
+
+    def _resolve_groups(self, games, seats):
+        """
+        Mark the cards forced by the c2 groups of a seat in each game, until no more cards are forced. A group is
+        resolved once its player is known to hold one of its cards or no card of it is left for them.
+
+        :param games: the game indexes <numpy.ndarray<int>>
+        :param seats: the seat to resolve in each game <numpy.ndarray<int>>
+        """
+        while len(games):
+            # only the slots used by one of the rows
+            used = self._group_count[games, seats].max()
+
+            cards = self._group_cards[games, seats, :used].astype(np.intp)
+            players = self._group_player[games, seats, :used]
+
+            holders = self.holder[games[:, None, None], seats[:, None, None], cards]
+            possible = holders < 0
+
+            # the three cards of a group are handled as columns, which is faster than reducing over a short axis
+            satisfied = (holders[:, :, 0] == players) | (holders[:, :, 1] == players) | (holders[:, :, 2] == players)
+            open_groups = (players >= 0) & ~satisfied
+            possible_count = possible[:, :, 0] + possible[:, :, 1].astype(int) + possible[:, :, 2]
+
+            forced = open_groups & (possible_count == 1)
+            self._group_player[games, seats, :used] = np.where(open_groups & (possible_count > 0), players, -1)
+
+            row, group = np.nonzero(forced)
+            forced_cards = cards[row, group, possible[row, group].argmax(axis=1)]
+            self.holder[games[row], seats[row], forced_cards] = players[row, group]
+
+            # only the rows with a forced card can force more
+            rows = np.unique(row)
+            games, seats = games[rows], seats[rows]
+
+    def _pick(self, choices):
+        """
+        Pick one of the true entries of each row at random.
+
+        :param choices: numpy.ndarray<bool>, rows with at least one true entry
+        :rtype : numpy.ndarray<int>
+        """
+        keys = self._rng.random(choices.shape)
+        keys[~choices] = -1.0
+
+        return keys.argmax(axis=1)
+
+    def _pick_unknown(self, known, category):
+        """
+        Pick an unknown card of a category for each game, or any card of the category when all are known.
+        """
+        unknown = ~known & category
+
+        return self._pick(np.where(unknown.any(axis=1)[:, None], unknown, category))
+
+
+def reference_game(seed, number_of_players, max_turns=500, setup=None):
+    """
+    Play the game dealt from a seed with auto.automaton.Player objects, acting as the server between them. The
+    players choose their own moves and suggestions; the record of each turn can be replayed through
+    GameKernel.step to check that the kernel resolves the same answers, knowledge and accusations.
+
+    :param seed: the seed of the game (see deal) <int>
+    :param number_of_players: the number of players <int>
+    :param max_turns: the turns after which the game ends without a winner <int>
+    :param setup: a function called with the seat and auto.automaton.Player of each seat before the game starts,
+    such as to give a seat an accusation policy
+    :rtype : dict
+    :return: the winning seat (-1 for none), the envelope, the hand of each seat, the players and a record of each
+    turn: the seat, location moved to, suggested suspect and weapon (None for no suggestion), the answering seat
+    (-1 for none), the card shown and whether the player accused
+    """
+    board = Board.from_spec()
+    envelope, hands = deal(seed, number_of_players)
+
+    player_ids = ['p{0:02d}'.format(seat + 1) for seat in range(number_of_players)]
+    suspects = list(board.starting_positions)[:number_of_players]
+
+    players = []
+    for seat, player_id in enumerate(player_ids):
+        player = Player(player_id, [suspects[seat]], number_of_players)
+        player.receive_cards(hands[seat])
+        if setup is not None:
+            setup(seat, player)
+        players.append(player)
+
+    positions = {player_id: board.starting_positions[suspects[seat]] for seat, player_id in enumerate(player_ids)}
+
+    turns = []
+    winner = -1
+    for turn in range(max_turns):
+        seat = turn % number_of_players
+        player_id = player_ids[seat]
+
+        response = players[seat].take_turn({'positions': dict(positions)})
+        if response.get('move'):
+            positions[player_id] = response['move']
+
+        record = {'seat': seat, 'move': positions[player_id], 'suggestion': None, 'answerer': -1, 'shown': None,
+                  'accused': False}
+
+        # a suggestion is only made from a room. The room is the one the player is in.
+        if 'suggestion' in response and positions[player_id] in board.rooms:
+            cards = set(response['suggestion']['cards'])
+            record['suggestion'] = (next(iter(cards & _suspects)), next(iter(cards & _weapons)))
+
+            for k in range(1, number_of_players):
+                other = (seat + k) % number_of_players
+                answer = players[other].update({'suggestion': {'from_player': player_id, 'cards': cards}})
+                if answer != 'no_match':
+                    record['answerer'], record['shown'] = other, answer
+                    break
+
+            if record['answerer'] >= 0:
+                answering_id = player_ids[record['answerer']]
+                for other in range(number_of_players):
+                    if other not in (seat, record['answerer']):
+                        players[other].update({'answer': {'from_player': answering_id, 'has_card': True},
+                                               'cards': cards})
+
+                answer = {'from_player': answering_id, 'card': record['shown']}
+            else:
+                # nobody could answer. The other players are told so, and so is the suggesting player, who may
+                # accuse on that answer
+                for other in range(number_of_players):
+                    if other != seat:
+                        players[other].update({'answer': 'no_match', 'cards': cards})
+
+                answer = 'no_match'
+
+            response = players[seat].update({'move_made': True, 'answer': answer})
+
+            if 'accusation' in response:
+                record['accused'] = True
+                winner = seat if set(response['accusation']['cards']) == set(envelope) else -1
+
+        turns.append(record)
+        if record['accused']:
+            break
+
+    return {'winner': winner, 'envelope': envelope, 'hands': hands, 'players': players, 'turns': turns}
@@ -0,0 +1,227 @@
+import argparse
+import itertools
+
+import numpy as np
+
+from auto.board import Board
+from auto.kernel import GameKernel
+from auto.playermatrix import _suspects, _weapons
+from auto.tablecache import TableCache
+
+"""
+    :module:: opening
+    :platform: Unix, Windows
+    :synopsis: An opening book of first turns, built offline by playing games with the vectorized kernel.
+
+"""
+
+# the most cards of a category a player can be dealt, plus one. A hand class counts the suspects and weapons held
+_COUNTS = 7
+
+# the number of players a book can be built for
+_PLAYERS = (3, 4, 5, 6)
+
+# an opening: the neighbor room of the starting position to move to, and whether the suggested suspect and weapon
+# are cards of the player's own hand (1) or unknown to the player (0)
+_CANDIDATES = list(itertools.product(range(2), range(2), range(2)))
+
+
+class OpeningBook:
+    """
+    The first turn to take for each selected suspect, class of dealt hand and number of players. A first turn is a
+    move from the starting hallway into one of its two rooms and a suggestion from that room.
+
+    The players treat the cards of a category alike (see auto.symmetry.DealSymmetry), so which suspect or weapon
+    is suggested only matters by whether it is in the player's hand. A hand class is what matters to the first
+    turn: which of the two rooms next to the starting position are in the hand, and how many suspects and weapons
+    are. For each hand class, the book holds the opening that won the most games when the seat of the suspect
+    played it in games of auto.kernel.GameKernel, and the share of those games won.
+
+    A suspect only has openings for the numbers of players in which they are seated in the kernel (see
+    auto.kernel.GameKernel). Looking up an opening is a few index computations into the tables.
+
+    """
+
+    def __init__(self, tables, board=None):
+        """
+        :param tables: the tables of the book, from build_tables or a auto.tablecache.TableCache <dict>
+        :param board: the auto.board.Board the book was built for, defaults to the Clue-Less board
+
+        :var
+            openings: numpy.ndarray<int8>, suspects x hand classes x numbers of players x 3, the index of the
+            opening in _CANDIDATES, or -1 where there is no opening
+            values: numpy.ndarray<float32>, the same shape without the last axis, the share of games won
+        """
+        self._board = board if board is not None else Board.from_spec()
+        self._suspect_index = {suspect: s for s, suspect in enumerate(self._board.starting_positions)}
+
+        # the two rooms next to each suspect's starting position, in the order of their names
+        self._rooms = {suspect: _start_rooms(self._board, suspect) for suspect in self._suspect_index}
+
+        self.openings = tables['openings']
+        self.values = tables['values']
+
+    @classmethod
+    def from_cache(cls, cache, board=None, players=_PLAYERS, games=2000, seed=0, max_turns=500, min_games=20):
+        """
+        Gets the book from a cache, building it the first time (see build_tables).
+
+        :param cache: the auto.tablecache.TableCache to keep the book in
+        :rtype : OpeningBook
+        """
+        board = board if board is not None else Board.from_spec()
+        key = {'spec_hash': board.spec_hash, 'players': list(players), 'games': games, 'seed': seed,
+               'max_turns': max_turns, 'min_games': min_games}
+
+        return cls(cache.get('opening', key, lambda: build_tables(board, players, games, seed, max_turns,
+                                                                  min_games)), board)
+
+    def lookup(self, suspect, hand, number_of_players):
+        """
+        Gets the opening for a player.
+
+        :param suspect: the selected suspect <string>
+        :param hand: the cards dealt to the player <iterable<string>>
+        :param number_of_players: the number of players in the game <int>
+        :rtype : tuple<string, bool, bool>
+        :return: the room to move to and whether to suggest a suspect and a weapon from the player's hand, or None
+        if the book has no opening for the player
+        """
+        if suspect not in self._suspect_index or number_of_players not in _PLAYERS:
+            return None
+
+        rooms = self._rooms[suspect]
+        opening = self.openings[self._suspect_index[suspect], hand_class(hand, rooms),
+                                _PLAYERS.index(number_of_players)]
+
+        if opening < 0:
+            return None
+
+        room, suspect_held, weapon_held = _CANDIDATES[opening]
+
+        return rooms[room], bool(suspect_held), bool(weapon_held)
+
+
+def hand_class(hand, rooms):
+    """
+    :param hand: the cards dealt to a player <iterable<string>>
+    :param rooms: the two rooms next to the player's starting position <list<string>>
+    :rtype : int
+    :return: the index of the class of the hand (see OpeningBook)
+    """
+    hand = set(hand)
+    room_bits = (rooms[0] in hand) + 2 * (rooms[1] in hand)
+
+    return (room_bits * _COUNTS + len(hand & _suspects)) * _COUNTS + len(hand & _weapons)
+
+
+def build_tables(board=None, players=_PLAYERS, games=2000, seed=0, max_turns=500, min_games=20):
+    """
+    Build the tables of an opening book by self-play. For each number of players and seat, the same games are
+    played once for each opening, with the seat's first turn forced to the opening and every other turn played by
+    the kernel. Each game counts towards the hand class of the seat's hand.
+
+    :param board: the auto.board.Board to play on, defaults to the Clue-Less board
+    :param players: the numbers of players to build openings for <iterable<int>>
+    :param games: the games played for each opening of each seat <int>
+    :param seed: the seed of the first game. The games are dealt from seed, seed + 1, ... <int>
+    :param max_turns: games still going after this many turns end without a winner <int>
+    :param min_games: the fewest games of a hand class in which an opening was played for it to be considered
+    <int>
+    :rtype : dict<string:numpy.ndarray>
+    """
+    board = board if board is not None else Board.from_spec()
+
+    suspects = list(board.starting_positions)
+    shape = (len(suspects), 4 * _COUNTS * _COUNTS, len(_PLAYERS))
+    openings = np.full(shape, -1, dtype=np.int8)
+    values = np.zeros(shape, dtype=np.float32)
+
+    seeds = list(range(seed, seed + games))
+
+    for number_of_players in players:
+        for seat in range(number_of_players):
+            wins, played = _play_openings(board, seeds, number_of_players, seat, max_turns)
+
+            # the share of games won by each opening in each hand class
+            rates = np.where(played >= min_games, wins / np.maximum(played, 1), -1.0)
+            best = rates.argmax(axis=1)
+
+            classes = np.flatnonzero(rates.max(axis=1) >= 0)
+            openings[seat, classes, _PLAYERS.index(number_of_players)] = best[classes]
+            values[seat, classes, _PLAYERS.index(number_of_players)] = rates[classes, best[classes]]
+
+    return {'openings': openings, 'values': values}
+
+
+def _play_openings(board, seeds, number_of_players, seat, max_turns):
+    """
+    Play the games dealt from the seeds once for each opening of a seat, all in one batch of the kernel.
+
+    :rtype : tuple<numpy.ndarray, numpy.ndarray>
+    :return: hand classes x openings, the games won by the seat and the games in which the opening was played
+    """
+    kernel = GameKernel(seeds * len(_CANDIDATES), number_of_players, board, max_turns)
+    candidates = np.repeat(np.arange(len(_CANDIDATES)), len(seeds))
+
+    suspect = list(board.starting_positions)[seat]
+    card_index = {card: c for c, card in enumerate(kernel.cards)}
+    location_index = {location: l for l, location in enumerate(kernel.locations)}
+
+    rooms = _start_rooms(board, suspect)
+    room_cards = np.array([card_index[room] for room in rooms])
+    room_locations = np.array([location_index[room] for room in rooms])
+
+    hands = kernel.hands[:, seat]
+    classes = ((hands[:, room_cards[0]] + 2 * hands[:, room_cards[1]].astype(int)) * _COUNTS +
+               (hands & kernel._suspects).sum(axis=1)) * _COUNTS + (hands & kernel._weapons).sum(axis=1)
+
+    room, suspect_held, weapon_held = np.array([_CANDIDATES[c] for c in candidates]).T
+
+    # the seat's first turn is its only turn before the turn of the seat number
+    while kernel.turn < seat:
+        kernel.step()
+
+    # an opening is played when its room is free and the hand has a card to suggest where one is wanted
+    moves = room_locations[room]
+    occupied = (kernel.location[:, :, None] == room_locations).any(axis=1)
+    played = ~occupied[np.arange(len(candidates)), room]
+
+    suggestions = np.zeros((len(candidates), 2), dtype=int)
+    for column, (category, held) in enumerate([(kernel._suspects, suspect_held), (kernel._weapons, weapon_held)]):
+        choices = np.where(held[:, None], hands, ~hands) & category
+        played &= choices.any(axis=1)
+        suggestions[:, column] = kernel._pick(np.where(choices.any(axis=1)[:, None], choices, category))
+
+    # games that can't play their opening are played anyway and left out of the counts
+    moves = np.where(played, moves, kernel.location[:, seat])
+    suggestions[~played] = -1
+    kernel.step(moves, suggestions)
+
+    kernel.run()
+
+    wins = np.zeros((4 * _COUNTS * _COUNTS, len(_CANDIDATES)))
+    counts = np.zeros_like(wins)
+    np.add.at(wins, (classes[played], candidates[played]), kernel.winner[played] == seat)
+    np.add.at(counts, (classes[played], candidates[played]), 1)
+
+    return wins, counts
+
+
+def _start_rooms(board, suspect):
+    """
+    :rtype : list<string>
+    :return: the rooms next to a suspect's starting position, in the order of their names
+    """
+    return sorted(board.neighbors(board.starting_positions[suspect]) & board.rooms)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the opening book into a table cache.')
+    parser.add_argument('cache', help='the directory of the table cache')
+    parser.add_argument('--games', type=int, default=2000, help='games played for each opening of each seat')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    arguments = parser.parse_args()
+
+    book = OpeningBook.from_cache(TableCache(arguments.cache), games=arguments.games, seed=arguments.seed)
+    print('openings for {0} hand classes'.format(int((book.openings >= 0).sum())))
@@ -1,4 +1,11 @@
+import collections
+
 import auto.playermatrix as pm
+from auto.watches import WatchedGroups
+
+# how much each repeated suggestion of a card by another player adds to the card's weight as an envelope card
+REPEATED_SUGGESTION_WEIGHT = 0.5
+
 
 class Pad:
     """
@@ -6,29 +13,280 @@ class Pad:
 
     """
 
-    def __init__(self, number_of_players):
+    # how much the repeated suggestions of each player are trusted, by seat and card (see envelope_weights). None
+    # when the pad was created without priors, in which case every player is trusted alike
+    _trust = None
+
+    def __init__(self, number_of_players, player_ids=None, cards=None, priors=None):
+        """
+        :param number_of_players: the number of players in the game <int>
+        :param player_ids: the ids of the players, in seat order. Defaults to p01, p02, ... <list<string>>
+        :param cards: the cards in the game. Defaults to the Clue-Less cards (see auto.playermatrix) <list<string>>
+        :param priors: the auto.priors.OpponentPriors learned about the players in past games
+        :raise
+            ValueError if the number of player ids isn't number_of_players
+        """
+        if player_ids is None:
+            player_ids = ['p{0:02d}'.format(x) for x in range(1, number_of_players + 1)]
+        elif len(player_ids) != number_of_players:
+            raise ValueError('{0} player ids given for {1} players'.format(len(player_ids), number_of_players))
+
+        # the players tracked in this _pad. Inside the _pad, players are identified by seat, which is the index of
+        # the player id in this list. Player ids are only used at the methods below.
+        self._players = list(player_ids)
+        self._seats = {player_id: seat for seat, player_id in enumerate(self._players)}
+
+        self._cards = list(cards) if cards is not None else list(pm.PlayerMatrix.cards)
+
+        # inside the _pad, a card is identified by its id, which is the row of the card in each player table
+        self._card_ids = {card: card_id for card_id, card in enumerate(self._cards)}
+
+        # create a list, indexed by seat, containing the players as columns with a set of sub-columns to track
+        # cards that are played. A player's table is only created when it is first written to. Until then, nothing
+        # is marked for the player and the read methods below treat the table as empty.
+        self.player_pad = [None] * len(self._players)
+
+        # the c1 and c2 columns of each created player table, by seat (see auto.playermatrix.PlayerMatrix). Answers
+        # are marked in these arrays by card id, in place, so marking an answer doesn't allocate.
+        self._c1 = [None] * len(self._players)
+        self._c2 = [None] * len(self._players)
 
-        # create a dictionary containing all of the players as columns
-        # with a set of sub-columns to track cards that are played
-        self.player_pad = {}
+        # a model of the other players: how many times each player has suggested each card, by seat. A player
+        # suggesting the same card again is likely not holding it and not yet shown it (see envelope_weights). Only
+        # suggestions are modeled. Where the other players move, and which rooms they head for, isn't.
+        self._suggestions = [None] * len(self._players)
 
-        for x in range(1, number_of_players + 1):
-            self.player_pad['p0' + str(x)] = pm.PlayerMatrix()
+        # what past games say about how far to trust each player's suggestions, read once for the whole game
+        if priors is not None:
+            self._trust = [priors.category_trust(player_id) for player_id in self._players]
+
+        # the c2 groups still waiting for a card to be forced into c1 (see resolve_has_card)
+        self._watches = WatchedGroups()
 
     @property
     def players_list(self):
         """
         Gets the list of players in this players _pad
 
-        :rtype : list of dictionary keys
+        :rtype : list<string>
         :return: the list of active players in this player's _pad
         """
-        return self.player_pad.keys()
+        return list(self._players)
 
     def get_player_table(self, player_id):
         """
+        Gets a player's table, creating it if nothing has been written to it yet. The table is built on the arrays
+        that are marked, without copying them, so use the read methods below when only reading and the mark methods
+        when writing.
+
         :param player_id: id of player table to retrieve
         :rtype : Pandas.DataFrame
         :return : the entire table (in the _pad) for this player to track the game
         """
-        return self.player_pad[player_id].table
\ No newline at end of file
+        return self._get_player_matrix(player_id).table
+
+    @property
+    def cards(self):
+        """
+        Gets all of the cards tracked in this player's _pad
+
+        :rtype : list<string>
+        :return: the cards in the order of the rows of each player table
+        """
+        return list(self._cards)
+
+    def card_id(self, card):
+        """
+        :param card: a card tracked in this _pad
+        :rtype : int
+        :return: the id of the card, which is its row in each player table
+        """
+        return self._card_ids[card]
+
+    def seat(self, player_id):
+        """
+        :param player_id: id of a player in this _pad
+        :rtype : int
+        :return: the seat of the player
+        """
+        return self._seats[player_id]
+
+    def has_card(self, player_id, card):
+        """
+        :param player_id: id of the player table to check
+        :param card: the card to check
+        :rtype : bool
+        :return: true if c1 is marked for the card in the player's table
+        """
+        c1 = self._c1[self._seats[player_id]]
+
+        return c1 is not None and c1[self._card_ids[card]] == 1
+
+    def c2_entries(self, player_id, card):
+        """
+        :param player_id: id of the player table to check
+        :param card: the card to check
+        :rtype : frozenset<int>
+        :return: the entries in the c2 cell for the card in the player's table
+        """
+        c2 = self._c2[self._seats[player_id]]
+
+        return frozenset(c2[self._card_ids[card]]) if c2 is not None else frozenset()
+
+    def c2_groups(self, player_id):
+        """
+        Gets the groups of cards that a player is known to hold at least one of. Each undirected answer of the
+        player is its own group of the three suggested cards. The groups aren't read from the c2 entries: two
+        answers with no card in common get the same entry, and a card cleared from c2 still belongs to its group.
+
+        :param player_id: id of the player table to check
+        :rtype : list<frozenset<string>>
+        :return: the groups, in the order the answers were given
+        """
+        return self._watches.groups(player_id)
+
+    def mark_card(self, player_id, card):
+        """
+        Marks c1 for a card that a player is known to hold. Any card this forces another player to hold (see
+        resolve_has_card) is marked in c1 as well.
+
+        :param player_id: id of the player holding the card
+        :param card: the card held
+        """
+        self._mark_c1(player_id, card)
+
+        for forced_player, forced_card in self._watches.card_held(self, player_id, card):
+            if not self.has_card(forced_player, forced_card):
+                self.mark_card(forced_player, forced_card)
+
+    def clear_c2(self, card):
+        """
+        Clears the c2 cell for a card in all of the player tables, including this player's table. Tables that
+        haven't been created have nothing to clear.
+
+        :param card: a card that is now known to be held by a player
+        """
+        card_id = self._card_ids[card]
+
+        for c2 in self._c2:
+            if c2 is not None:
+                c2[card_id].clear()
+
+    def unknown_cards(self):
+        """
+        Gets the cards that aren't marked in c1 of any of the player tables. These are the cards that may be hidden.
+
+        :rtype : set<string>
+        :return: unknown cards
+        """
+        c1_columns = [c1 for c1 in self._c1 if c1 is not None]
+
+        return {card for card_id, card in enumerate(self._cards) if not any(c1[card_id] == 1 for c1 in c1_columns)}
+
+    def mark_has_card(self, player_id, cards):
+        """
+        Marks c2 for a player that has answered that they have one of the suggested cards (undirected answer).
+
+        :param player_id: id of the player that answered
+        :param cards: the three suggested cards <iterable<string>>
+        """
+        c2 = self._get_player_matrix(player_id).c2
+        first, second, third = (c2[self._card_ids[card]] for card in cards)
+
+        # check if any of the cards have been asked of this player before. If so, add the greatest increment
+        # to each of the cells. This is the number of entries in the union of the cells plus 1, counted without
+        # building the union
+        new_entry = len(first) + 1
+        for entry in second:
+            if entry not in first:
+                new_entry += 1
+        for entry in third:
+            if entry not in first and entry not in second:
+                new_entry += 1
+
+        first.add(new_entry)
+        second.add(new_entry)
+        third.add(new_entry)
+
+        self.resolve_has_card(player_id, cards)
+
+    def resolve_has_card(self, player_id, cards):
+        """
+        Keeps track of an undirected answer marked in c2 until it forces a card into c1. The answering player holds
+        one of the cards, so once every other card of the answer is marked in c1 for other players, the player is
+        marked in c1 for the card that is left.
+
+        :param player_id: id of the player that answered
+        :param cards: the three suggested cards <iterable<string>>
+        """
+        for forced_player, forced_card in self._watches.add(self, player_id, cards):
+            self.mark_card(forced_player, forced_card)
+
+    def note_suggestion(self, player_id, cards):
+        """
+        Counts a suggestion made by a player in the model of that player.
+
+        :param player_id: id of the player making the suggestion
+        :param cards: the suggested cards <iterable<string>>
+        """
+        seat = self._seats[player_id]
+
+        counts = self._suggestions[seat]
+        if counts is None:
+            counts = self._suggestions[seat] = collections.Counter()
+
+        counts.update(cards)
+
+    def suggestion_count(self, player_id, card):
+        """
+        :param player_id: id of a player
+        :param card: a card
+        :rtype : int
+        :return: the number of times the player has suggested the card
+        """
+        counts = self._suggestions[self._seats[player_id]]
+
+        return counts[card] if counts is not None else 0
+
+    def envelope_weights(self, player_id):
+        """
+        Gets how likely each card is to be in the envelope according to the suggestions of the other players,
+        relative to a card no one has suggested more than once. Each time another player suggests a card again adds
+        REPEATED_SUGGESTION_WEIGHT to the card's weight of 1, scaled by how much the player's suggestions of the
+        card's category are trusted when the pad has priors (see auto.priors.OpponentPriors.trust). The weights only
+        come from the suggestions of the other players, not from their moves.
+
+        :param player_id: id of the player whose pad it is. Their own suggestions are left out.
+        :rtype : dict<string:float>
+        """
+        weights = dict.fromkeys(self.cards, 1.0)
+
+        for player in self.players_list:
+            if player != player_id:
+                trust = self._trust[self.seat(player)] if self._trust is not None else {}
+                for card in weights:
+                    count = self.suggestion_count(player, card)
+                    if count > 1:
+                        weights[card] += REPEATED_SUGGESTION_WEIGHT * (count - 1) * trust.get(card, 1.0)
+
+        return weights
+
+    def _mark_c1(self, player_id, card):
+        self._get_player_matrix(player_id).c1[self._card_ids[card]] = 1
+
+    def _get_player_matrix(self, player_id):
+        """
+        Gets a player's matrix, creating it the first time it is needed.
+
+        :param player_id: id of the player
+        :rtype : auto.playermatrix.PlayerMatrix
+        """
+        seat = self._seats[player_id]
+        player_matrix = self.player_pad[seat]
+
+        if player_matrix is None:
+            player_matrix = self.player_pad[seat] = pm.PlayerMatrix(self._cards)
+            self._c1[seat] = player_matrix.c1
+            self._c2[seat] = player_matrix.c2
+
+        return player_matrix
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+from auto.pad import Pad
+from auto.watches import WatchedGroups
+
+"""
+    :module:: padstack
+    :platform: Unix, Windows
+    :synopsis: The pads of the computer players co-hosted at one table, stored as one set of NumPy arrays.
+
+"""
+
+# c2 entries are stored as the bits of an unsigned 64 bit integer, entry n in bit n - 1. Entries past 64 are
+# stored in the last bit.
+_C2_BITS = 64
+
+
+class PadStack:
+    """
+    The pads of every computer player seated at a table stored as two arrays of seats x tracked players x cards:
+    c1, which is 1 where a card is known to be held by a player, and c2, the bits of the entries made when a player
+    answered that they have one of the suggested cards.
+
+    """
+
+    def __init__(self, number_of_seats, players, cards):
+        """
+        Create an empty stack of pads.
+
+        :param number_of_seats: the number of computer players hosted at the table <int>
+        :param players: the ids of the players tracked in each pad <list<string>>
+        :param cards: the cards tracked in each pad <list<string>>
+
+        :var
+            c1: numpy.ndarray<int8>
+            c2: numpy.ndarray<uint64>
+            suggestions: numpy.ndarray<uint16>, the number of times each player has suggested each card
+            watches: list<auto.watches.WatchedGroups>, the pending c2 groups of each seat
+            trust: list, the trust of each seat's pad in the suggestions of each player, None for a pad without
+                priors (see auto.pad.Pad.envelope_weights)
+        """
+        self.players = list(players)
+        self.cards = list(cards)
+
+        self._player_index = {player_id: i for i, player_id in enumerate(self.players)}
+        self._card_index = {card: i for i, card in enumerate(self.cards)}
+
+        shape = (number_of_seats, len(self.players), len(self.cards))
+        self.c1 = np.zeros(shape, dtype=np.int8)
+        self.c2 = np.zeros(shape, dtype=np.uint64)
+        self.suggestions = np.zeros(shape, dtype=np.uint16)
+        self.watches = [WatchedGroups() for seat in range(number_of_seats)]
+        self.trust = [None] * number_of_seats
+
+    @classmethod
+    def from_pads(cls, pads):
+        """
+        Create a stack holding a copy of what is marked on each pad, one seat per pad.
+
+        :param pads: the auto.pad.Pad of each seat <list>
+        :rtype : PadStack
+        """
+        stack = cls(len(pads), pads[0].players_list, pads[0].cards)
+
+        for seat, pad in enumerate(pads):
+            # the watched groups only refer to players and cards, so the stacked pad carries on with them
+            stack.watches[seat] = pad._watches
+            stack.trust[seat] = pad._trust
+            for p, player_id in enumerate(stack.players):
+                for c, card in enumerate(stack.cards):
+                    if pad.has_card(player_id, card):
+                        stack.c1[seat, p, c] = 1
+                    stack.suggestions[seat, p, c] = pad.suggestion_count(player_id, card)
+                    for entry in pad.c2_entries(player_id, card):
+                        stack.c2[seat, p, c] |= np.uint64(1) << np.uint64(min(entry, _C2_BITS) - 1)
+
+        return stack
+
+    def pad(self, seat):
+        """
+        :param seat: index of the seat
+        :rtype : StackedPad
+        :return: the pad of the seat, backed by this stack
+        """
+        return StackedPad(self, seat)
+
+    def player_index(self, player_id):
+        """
+        :rtype : int
+        :return: the index of a tracked player in the second axis of c1 and c2
+        """
+        return self._player_index[player_id]
+
+    def card_index(self, card):
+        """
+        :rtype : int
+        :return: the index of a card in the third axis of c1 and c2
+        """
+        return self._card_index[card]
+
+    def mark_has_card(self, seats, player_id, cards):
+        """
+        Marks c2 in the pads of several seats at once for a player that has answered that they have one of the
+        suggested cards. Each seat gets the same entry that auto.pad.Pad.mark_has_card would make.
+
+        :param seats: indexes of the seats to mark <list<int>>
+        :param player_id: id of the player that answered
+        :param cards: the three suggested cards <iterable<string>>
+        """
+        seats = np.asarray(seats, dtype=np.intp)[:, np.newaxis]
+        p = self._player_index[player_id]
+        c = [self._card_index[card] for card in cards]
+
+        # seats x cards
+        cells = self.c2[seats, p, c]
+
+        # the new entry is the number of entries in the union of the cells plus 1
+        new_entry = np.minimum(_popcount(np.bitwise_or.reduce(cells, axis=1)) + 1, _C2_BITS)
+        bits = np.left_shift(np.uint64(1), (new_entry - 1).astype(np.uint64))
+
+        self.c2[seats, p, c] = cells | bits[:, np.newaxis]
+
+    def unknown_cards_mask(self):
+        """
+        :rtype : numpy.ndarray<bool>
+        :return: seats x cards, true where a card isn't marked in c1 of any player table in the seat's pad
+        """
+        return ~self.c1.any(axis=1)
+
+
+class StackedPad(Pad):
+    """
+    The pad of one seat in a PadStack. It has the same interface as auto.pad.Pad.
+
+    """
+
+    def __init__(self, stack, seat):
+        # the player tables live in the stack, so no PlayerMatrix is created
+        self._stack = stack
+        self._seat = seat
+        self._watches = stack.watches[seat]
+        self._trust = stack.trust[seat]
+
+    @property
+    def players_list(self):
+        return self._stack.players
+
+    @property
+    def cards(self):
+        return list(self._stack.cards)
+
+    def get_player_table(self, player_id):
+        """
+        :param player_id: id of player table to retrieve
+        :rtype : Pandas.DataFrame
+        :return : the table for this player. c1 is a view into the stack. c2 is a copy of the entries in the stack,
+        so it should only be changed through the pad.
+        """
+        p = self._stack.player_index(player_id)
+        c2 = self._stack.c2[self._seat, p]
+
+        table = pd.DataFrame({'c1': self._stack.c1[self._seat, p]}, index=self._stack.cards, copy=False)
+        table['c2'] = [{bit + 1 for bit in range(_C2_BITS) if int(cell) >> bit & 1} for cell in c2]
+
+        return table
+
+    def card_id(self, card):
+        return self._stack.card_index(card)
+
+    def seat(self, player_id):
+        return self._stack.player_index(player_id)
+
+    def has_card(self, player_id, card):
+        return self._stack.c1[self._seat, self._stack.player_index(player_id), self._stack.card_index(card)] == 1
+
+    def c2_entries(self, player_id, card):
+        cell = int(self._stack.c2[self._seat, self._stack.player_index(player_id), self._stack.card_index(card)])
+
+        return frozenset(bit + 1 for bit in range(_C2_BITS) if cell >> bit & 1)
+
+    def _mark_c1(self, player_id, card):
+        self._stack.c1[self._seat, self._stack.player_index(player_id), self._stack.card_index(card)] = 1
+
+    def clear_c2(self, card):
+        self._stack.c2[self._seat, :, self._stack.card_index(card)] = 0
+
+    def mark_has_card(self, player_id, cards):
+        self._stack.mark_has_card([self._seat], player_id, cards)
+        self.resolve_has_card(player_id, cards)
+
+    def note_suggestion(self, player_id, cards):
+        p = self._stack.player_index(player_id)
+        for card in cards:
+            self._stack.suggestions[self._seat, p, self._stack.card_index(card)] += 1
+
+    def suggestion_count(self, player_id, card):
+        return int(self._stack.suggestions[self._seat, self._stack.player_index(player_id),
+                                           self._stack.card_index(card)])
+
+    def unknown_cards(self):
+        unknown = ~self._stack.c1[self._seat].any(axis=0)
+
+        return {self._stack.cards[c] for c in np.flatnonzero(unknown)}
+
+
+def _popcount(values):
+    """
+    Counts the bits set in each value of an array of unsigned 64 bit integers.
+
+    :param values: numpy.ndarray<uint64>
+    :rtype : numpy.ndarray<int>
+    """
+    values = np.ascontiguousarray(values)
+    return np.unpackbits(values.view(np.uint8).reshape(values.shape + (8,)), axis=-1).sum(axis=-1)
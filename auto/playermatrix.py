@@ -1,39 +1,50 @@
+import numpy as np
 import pandas as pd
 
+_suspects = {
+    'Scarlet', 'Plum', 'Mustard', 'Green', 'White', 'Peacock'
+}
+
+_rooms = {
+    'Study', 'Hall', 'Lounge', 'Library', 'Billiard', 'Dining', 'Conservatory', 'Ballroom', 'Kitchen'
+}
+
+_weapons = {
+    'Knife', 'Wrench', 'Revolver', 'Pipe', 'Rope', 'Candlestick'
+}
+
 
 class PlayerMatrix:
-    def __init__(self):
+    # the cards tracked by every player matrix, in the order of the table rows. The order is sorted so that card ids
+    # are the same in every process, whatever its hash seed
+    cards = sorted(_suspects.union(_rooms.union(_weapons)))
+
+    def __init__(self, cards=None):
         """
         Create a player matrix for tracking a player answers to suggestions.
 
-        :var
-            _suspects: dictionary
-            _rooms: dictionary
-            _weapons: dictionary
-            _cards: dictionary
-            _tracker: dictionary<Pandas.Series>
+        :param cards: the cards to track, for games with an extended deck. Defaults to PlayerMatrix.cards
 
-        :rtype : Pandas.DataFrame
+        :var
+            _cards: list
+            c1: numpy.ndarray<object>, the c1 column of the table, indexed by the row of a card
+            c2: numpy.ndarray<object>, the c2 column of the table, indexed by the row of a card
         """
-        _suspects = {
-            'Scarlet', 'Plum', 'Mustard', 'Green', 'White', 'Peacock'
-        }
-
-        _rooms = {
-            'Study', 'Hall', 'Lounge', 'Library', 'Billiard', 'Dining', 'Conservatory', 'Ballroom', 'Kitchen'
-        }
-
-        _weapons = {
-            'Knife', 'Wrench', 'Revolver', 'Pipe', 'Rope', 'Candlestick'
-        }
+        self._cards = list(cards) if cards is not None else self.cards
 
-        _cards = _suspects.union(_rooms.union(_weapons))
+        # the arrays are what is marked. Reading or writing a cell by its row doesn't go through the pandas indexing
+        # of a table, and a table read from the arrays (see table) can't be copied away from them on write by pandas
+        self.c1 = np.full(len(self._cards), int, dtype=object)
+        self.c2 = np.empty(len(self._cards), dtype=object)
+        for row in range(len(self._cards)):
+            self.c2[row] = set()
 
-        _tracker = {'c1': pd.Series(int, index=_cards),
-                    'c2': pd.Series(
-                        [set(), set(), set(), set(), set(), set(), set(), set(), set(), set(), set(), set(),
-                         set(), set(), set(), set(), set(), set(), set(), set(), set()],
-                        index=_cards)}
+    @property
+    def table(self):
+        """
+        Gets the table of this player matrix, one row for each card. The table is built on the arrays without
+        copying them.
 
-        # data frame is a table for this user
-        self.table = pd.DataFrame(_tracker)
+        :rtype : Pandas.DataFrame
+        """
+        return pd.DataFrame({'c1': self.c1, 'c2': self.c2}, index=self._cards, copy=False)
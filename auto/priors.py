@@ -0,0 +1,169 @@
+import collections
+import os
+import tempfile
+
+import numpy as np
+
+from auto.playermatrix import _rooms, _suspects, _weapons
+
+"""
+    :module:: priors
+    :platform: Unix, Windows
+    :synopsis: What the computer players learn about their regular opponents across games.
+
+"""
+
+# the category of each card, in the order of the last axis of the counts
+_CATEGORIES = {card: category for category, cards in enumerate([_suspects, _weapons, _rooms]) for card in cards}
+
+# the counts kept for each opponent and category: the cards the opponent suggested whose holder was known at the end of
+# the game, and how many of those were cards of the opponent's own hand
+SUGGESTED, SUGGESTED_HELD = range(2)
+
+
+class OpponentPriors:
+    """
+    Counts of how each opponent has played in past games, kept in a fixed-size table of capacity rows so that the
+    memory used doesn't grow with the number of opponents met. A row is assigned to an opponent id the first time
+    the opponent is seen. Once every row is in use, the row of the opponent seen least recently is given to the new
+    opponent.
+
+    Within a game, a player suggesting the same card again is likely looking for the envelope card (see
+    auto.pad.Pad.envelope_weights). Some opponents suggest cards of their own hand to mislead, and keep doing so
+    from one game to the next. The counts give the share of an opponent's suggested cards of each category that
+    were their own, among those whose holder was known by the end of the game, which sets how much their repeated
+    suggestions are trusted (see trust).
+
+    """
+
+    def __init__(self, capacity=256):
+        """
+        :param capacity: the most opponents kept <int>
+
+        :var
+            counts: numpy.ndarray<uint32>, capacity x 2 x 3, the counts of each row (SUGGESTED, SUGGESTED_HELD) for
+            each category (suspects, weapons, rooms)
+        """
+        self.capacity = capacity
+        self.counts = np.zeros((capacity, 2, len(set(_CATEGORIES.values()))), dtype=np.uint32)
+
+        # the row of each opponent id, least recently seen first
+        self._rows = collections.OrderedDict()
+
+    @classmethod
+    def load(cls, path, capacity=256):
+        """
+        Loads the priors saved at a path, or starts empty priors if nothing was saved there yet.
+
+        :param path: the file of the priors (see save) <string>
+        :param capacity: the most opponents kept. Opponents seen least recently are left out if fewer rows are kept
+        than were saved <int>
+        :rtype : OpponentPriors
+        """
+        priors = cls(capacity)
+
+        if os.path.exists(path):
+            with np.load(path) as saved:
+                ids, counts = list(saved['ids']), saved['counts']
+
+            for opponent_id, row_counts in list(zip(ids, counts))[-capacity:]:
+                priors.counts[priors._row(str(opponent_id))] = row_counts
+
+        return priors
+
+    def save(self, path):
+        """
+        Saves the priors, replacing the file in one step so that a reader never sees it half written.
+
+        :param path: the file of the priors <string>
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        handle, temporary = tempfile.mkstemp(dir=directory, prefix='.priors-', suffix='.npz')
+        os.close(handle)
+
+        try:
+            np.savez(temporary, ids=np.array(list(self._rows), dtype=str),
+                     counts=self.counts[list(self._rows.values())])
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def note_game(self, pad, player_id):
+        """
+        At the end of a game, count the cards each opponent suggested and those of them that the pad shows were the
+        opponent's own. Only the cards whose holder the pad shows are counted, both times. A card whose holder isn't
+        known may have been the opponent's, so counting it as suggested only would make the opponent look more
+        trustworthy than they are.
+
+        :param pad: the auto.pad.Pad of the player at the end of the game
+        :param player_id: id of the player whose pad it is
+        """
+        unknown = pad.unknown_cards()
+
+        # a card left as the only unknown card of its category is the envelope card, so its holder is known too
+        for category in (_suspects, _weapons, _rooms):
+            if len(unknown & category) == 1:
+                unknown -= category
+
+        known = [card for card in pad.cards if card in _CATEGORIES and card not in unknown]
+
+        for opponent_id in pad.players_list:
+            if opponent_id == player_id:
+                continue
+
+            row = self._row(opponent_id)
+            for card in known:
+                count = pad.suggestion_count(opponent_id, card)
+                if count:
+                    self.counts[row, SUGGESTED, _CATEGORIES[card]] += count
+                    if pad.has_card(opponent_id, card):
+                        self.counts[row, SUGGESTED_HELD, _CATEGORIES[card]] += count
+
+    def trust(self, opponent_id):
+        """
+        Gets how much the repeated suggestions of an opponent are trusted, for each category. With no counts, the
+        trust is 1. It goes towards 2 for opponents who never suggest their own cards and towards 0 for opponents
+        who only do.
+
+        :param opponent_id: id of an opponent
+        :rtype : list<float>
+        :return: the trust for suspects, weapons and rooms
+        """
+        row = self._rows.get(opponent_id)
+        if row is None:
+            return [1.0] * self.counts.shape[2]
+
+        suggested = self.counts[row, SUGGESTED].astype(float)
+        held = self.counts[row, SUGGESTED_HELD]
+
+        return list(2.0 * (suggested - held + 1.0) / (suggested + 2.0))
+
+    def category_trust(self, opponent_id):
+        """
+        :param opponent_id: id of an opponent
+        :rtype : dict<string:float>
+        :return: the trust (see trust) for each card
+        """
+        trust = self.trust(opponent_id)
+
+        return {card: trust[category] for card, category in _CATEGORIES.items()}
+
+    def _row(self, opponent_id):
+        """
+        Gets the row of an opponent, assigning one if the opponent has none, and marks the opponent as just seen.
+
+        :rtype : int
+        """
+        row = self._rows.get(opponent_id)
+
+        if row is not None:
+            self._rows.move_to_end(opponent_id)
+        elif len(self._rows) < self.capacity:
+            row = self._rows[opponent_id] = len(self._rows)
+        else:
+            _, row = self._rows.popitem(last=False)
+            self.counts[row] = 0
+            self._rows[opponent_id] = row
+
+        return row
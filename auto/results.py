@@ -0,0 +1,223 @@
+import json
+import os
+
+import numpy as np
+
+from auto.board import Board
+from auto.playermatrix import PlayerMatrix
+
+"""
+    :module:: results
+    :platform: Unix, Windows
+    :synopsis: An append-only store of simulation results that is read back as memory-mapped numpy arrays.
+
+"""
+
+# card and location codes for a missing value, such as the suggestion of a turn without one
+NONE = 255
+
+# one record for each seat in each game
+GAME_DTYPE = np.dtype([('seed', '<u8'),
+                       ('seat', 'u1'),
+                       ('suspect', 'u1'),
+                       ('won', '?'),
+                       ('turns', '<u2'),
+                       ('moves', '<u2'),
+                       ('decision_time', '<f4')])
+
+# one record for each turn taken
+TURN_DTYPE = np.dtype([('seed', '<u8'),
+                       ('seat', 'u1'),
+                       ('turn', '<u2'),
+                       ('move', 'u1'),
+                       ('suggestion', 'u1', (3,)),
+                       ('decision_time', '<f4')])
+
+_TABLES = {'games': GAME_DTYPE, 'turns': TURN_DTYPE}
+
+
+class ResultStore:
+    """
+    A sink for the results of self-play runs. Results are appended as fixed-width binary records to one file for
+    each table (games.bin and turns.bin), so a table maps straight onto a numpy structured array and each column,
+    such as games['won'], is a view of the file. Aggregations run over the mapped columns without parsing anything.
+
+    Cards and locations are stored as one byte codes. The codes are kept in schema.json next to the tables so that
+    the results can be read back in another process.
+
+    """
+
+    def __init__(self, directory, buffer_rows=4096, cards=None, locations=None):
+        """
+        Open a store, creating the directory and its schema if they don't exist.
+
+        :param directory: the directory holding the tables
+        :param buffer_rows: the records of a table buffered in memory before they are written <int>
+        :param cards: the cards that can be stored, defaults to the Clue-Less deck <list<string>>
+        :param locations: the locations that can be stored, defaults to the Clue-Less board <list<string>>
+
+        :var
+            _buffers: dictionary<table<string>:numpy.ndarray>, the preallocated buffer of each table
+            _buffered: dictionary<table<string>:int>, the number of records in each buffer
+
+        :raise
+            ValueError if the schema of an existing store doesn't match the record layout of this module
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        schema_path = os.path.join(directory, 'schema.json')
+        if os.path.exists(schema_path):
+            with open(schema_path) as schema_file:
+                schema = json.load(schema_file)
+
+            if schema['tables'] != self._describe_tables():
+                raise ValueError('the results in {0} were written with a different record layout'.format(directory))
+        else:
+            board = Board.from_spec()
+            schema = {'tables': self._describe_tables(),
+                      'cards': list(cards) if cards is not None else sorted(PlayerMatrix.cards),
+                      'locations': list(locations) if locations is not None else sorted(board.rooms | board.hallways)}
+
+            with open(schema_path, 'w') as schema_file:
+                json.dump(schema, schema_file, indent=2)
+
+        self.cards = schema['cards']
+        self.locations = schema['locations']
+        self._card_codes = {card: code for code, card in enumerate(self.cards)}
+        self._location_codes = {location: code for code, location in enumerate(self.locations)}
+
+        self._buffers = {table: np.zeros(buffer_rows, dtype) for table, dtype in _TABLES.items()}
+        self._buffered = dict.fromkeys(_TABLES, 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def append_game(self, seed, seat, suspect, won, turns, moves, decision_time):
+        """
+        Append the result of one seat in one game.
+
+        :param seed: the seed the game was played with <int>
+        :param seat: the seat of the player <int>
+        :param suspect: the suspect the player played <string>
+        :param won: whether the player won <bool>
+        :param turns: the turns the player took <int>
+        :param moves: the moves the player made <int>
+        :param decision_time: the seconds the player spent on its decisions <float>
+        """
+        row = self._next_row('games')
+        row['seed'] = seed
+        row['seat'] = seat
+        row['suspect'] = self._card_codes[suspect]
+        row['won'] = won
+        row['turns'] = turns
+        row['moves'] = moves
+        row['decision_time'] = decision_time
+
+    def append_turn(self, seed, seat, turn, move, suggestion, decision_time):
+        """
+        Append one turn taken by a player.
+
+        :param seed: the seed the game was played with <int>
+        :param seat: the seat of the player <int>
+        :param turn: the number of the turn in the game <int>
+        :param move: the location moved to, or None if the player didn't move <string>
+        :param suggestion: the suggested cards, or None if the player didn't suggest <iterable<string>>
+        :param decision_time: the seconds take_turn took <float>
+        """
+        row = self._next_row('turns')
+        row['seed'] = seed
+        row['seat'] = seat
+        row['turn'] = turn
+        row['move'] = self._location_codes[move] if move else NONE
+        row['suggestion'] = sorted(self._card_codes[card] for card in suggestion) if suggestion else NONE
+        row['decision_time'] = decision_time
+
+    def flush(self):
+        """
+        Write the buffered records to the end of their tables.
+        """
+        for table, buffer in self._buffers.items():
+            if self._buffered[table]:
+                with open(self._table_path(table), 'ab') as table_file:
+                    buffer[:self._buffered[table]].tofile(table_file)
+                self._buffered[table] = 0
+
+    def games(self):
+        """
+        Gets the games table mapped read-only into memory. Records still buffered aren't included (see flush).
+
+        :rtype : numpy.memmap<GAME_DTYPE>
+        """
+        return self._map('games')
+
+    def turns(self):
+        """
+        Gets the turns table mapped read-only into memory. Records still buffered aren't included (see flush).
+
+        :rtype : numpy.memmap<TURN_DTYPE>
+        """
+        return self._map('turns')
+
+    def win_rate_by_suspect(self):
+        """
+        :rtype : dict<string:float>
+        :return: the share of the games won by the players of each suspect played
+        """
+        games = self.games()
+
+        played = np.bincount(games['suspect'], minlength=len(self.cards))
+        won = np.bincount(games['suspect'], weights=games['won'], minlength=len(self.cards))
+
+        return {self.cards[code]: won[code] / played[code] for code in np.flatnonzero(played)}
+
+    def decision_time_percentiles(self, percentiles=(50, 90, 99)):
+        """
+        :param percentiles: the percentiles to compute <tuple<float>>
+        :rtype : dict<float:float>
+        :return: each percentile of the seconds taken by take_turn
+        """
+        decision_time = self.turns()['decision_time']
+        if not len(decision_time):
+            return dict.fromkeys(percentiles, 0.0)
+
+        return dict(zip(percentiles, np.percentile(decision_time, percentiles).tolist()))
+
+    def _next_row(self, table):
+        """
+        Gets the next free record of a table's buffer, writing the buffer out first if it is full.
+
+        :rtype : numpy.void
+        """
+        if self._buffered[table] == len(self._buffers[table]):
+            self.flush()
+
+        row = self._buffers[table][self._buffered[table]]
+        self._buffered[table] += 1
+
+        return row
+
+    def _map(self, table):
+        path = self._table_path(table)
+        dtype = _TABLES[table]
+
+        # a memmap of an empty file isn't possible
+        if not os.path.exists(path) or os.path.getsize(path) < dtype.itemsize:
+            return np.zeros(0, dtype)
+
+        return np.memmap(path, dtype=dtype, mode='r', shape=(os.path.getsize(path) // dtype.itemsize,))
+
+    def _table_path(self, table):
+        return os.path.join(self.directory, table + '.bin')
+
+    @staticmethod
+    def _describe_tables():
+        """
+        :return: the record layout of each table in a json friendly form
+        :rtype : dict
+        """
+        return {table: [[name, dtype.fields[name][0].str, list(dtype.fields[name][0].shape)]
+                        for name in dtype.names] for table, dtype in _TABLES.items()}
@@ -0,0 +1,210 @@
+import argparse
+import json
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from statistics import NormalDist
+
+from auto.accusation import AccusationPolicy
+from auto.kernel import reference_game
+
+"""
+    :module:: sweep
+    :platform: Unix, Windows
+    :synopsis: Evaluating configurations of the computer player by self-play, stopping the bad ones early.
+
+"""
+
+# the parameters a configuration can set
+_PARAMETERS = ('accusation',)
+
+
+def sweep(configurations, path, number_of_players=3, max_games=2000, batch_games=20, processes=None, alpha=0.05,
+          seed=0, max_turns=500):
+    """
+    Evaluate configurations of auto.automaton.Player by self-play. A configuration is a dictionary of parameters:
+
+        accusation: the keyword arguments of an auto.accusation.AccusationPolicy for the player, or None to accuse
+                    only when certain
+
+    The games of a configuration are played by one configured player and default players in the other seats, the
+    configured seat moving round the table from one game to the next. Every configuration plays the games dealt
+    from the same seeds, so configurations are compared on the same deals.
+
+    Games are played in batches of batch_games by a pool of worker processes, always giving the next batch to the
+    configuration that has played the fewest games. After each batch, a configuration is stopped once its win rate
+    is significantly below the best win rate so far, by a two proportion z-test. The test is repeated after every
+    batch, so its critical value is corrected for every look and every comparison (Bonferroni) to keep the chance
+    of stopping a configuration that isn't worse below alpha.
+
+    Each finished batch and each stopped configuration is written to the results file as a json line when it
+    happens, so the results of a long sweep can be read while it runs.
+
+    :param configurations: the configurations to evaluate <list<dict>>
+    :param path: the results file, one json object per line. Replaced if it exists <string>
+    :param number_of_players: the number of players of each game <int>
+    :param max_games: the games played by each configuration that isn't stopped <int>
+    :param batch_games: the games of each batch <int>
+    :param processes: the number of worker processes, defaults to the number of CPUs
+    :param alpha: the chance of wrongly stopping a configuration <float>
+    :param seed: the seed of the first game <int>
+    :param max_turns: the turns after which a game ends without a winner <int>
+    :rtype : list<dict>
+    :return: for each configuration, the games played, the games won, the win rate and whether it was stopped
+    :raise
+        ValueError if a configuration sets a parameter that isn't in _PARAMETERS
+    """
+    for configuration in configurations:
+        unknown = set(configuration) - set(_PARAMETERS)
+        if unknown:
+            raise ValueError('unknown parameters {0}'.format(sorted(unknown)))
+
+    looks = math.ceil(max_games / batch_games)
+    critical = NormalDist().inv_cdf(1 - alpha / (looks * max(1, len(configurations) - 1)))
+
+    results = [{'configuration': configuration, 'games': 0, 'wins': 0, 'stopped': False}
+               for configuration in configurations]
+    scheduled = [0] * len(configurations)
+    pending = {}
+
+    with open(path, 'w') as results_file, ProcessPoolExecutor(processes) as executor:
+        workers = processes or os.cpu_count()
+
+        while True:
+            # keep every worker busy with the configurations that have played the fewest games
+            while len(pending) < 2 * workers:
+                running = [c for c in range(len(configurations))
+                           if not results[c]['stopped'] and scheduled[c] < max_games]
+                if not running:
+                    break
+
+                c = min(running, key=lambda index: scheduled[index])
+                seeds = range(seed + scheduled[c], seed + min(scheduled[c] + batch_games, max_games))
+                scheduled[c] += len(seeds)
+
+                future = executor.submit(_play_batch, configurations[c], number_of_players, list(seeds), max_turns)
+                pending[future] = (c, seeds)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                c, seeds = pending.pop(future)
+                if results[c]['stopped']:
+                    continue
+
+                wins = future.result()
+                results[c]['games'] += len(seeds)
+                results[c]['wins'] += wins
+                _write(results_file, {'event': 'batch', 'index': c, 'seeds': [seeds.start, seeds.stop],
+                                      'wins': wins, 'games': results[c]['games'], 'total_wins': results[c]['wins']})
+
+                for stopped, best in _stop_worse(results, critical, 2 * batch_games):
+                    _write(results_file, {'event': 'stopped', 'index': stopped, 'games': results[stopped]['games'],
+                                          'win_rate': _win_rate(results[stopped]), 'best': best,
+                                          'best_win_rate': _win_rate(results[best])})
+
+        for future in pending:
+            future.cancel()
+
+        for c, result in enumerate(results):
+            result['win_rate'] = _win_rate(result)
+            _write(results_file, dict(result, event='result', index=c))
+
+    return results
+
+
+def _play_batch(configuration, number_of_players, seeds, max_turns):
+    """
+    Worker for sweep. Play the games dealt from the seeds with the configured player.
+
+    :rtype : int
+    :return: the games won by the configured player
+    """
+    wins = 0
+
+    for seed in seeds:
+        configured_seat = seed % number_of_players
+
+        def setup(seat, player):
+            if seat == configured_seat and configuration.get('accusation') is not None:
+                player.set_accusation_policy(AccusationPolicy(seed=seed, **configuration['accusation']))
+
+        # the players choose their moves with the random module, so seed it for the game to be the same for every
+        # configuration up to the configured player's choices
+        random.seed(seed)
+        wins += reference_game(seed, number_of_players, max_turns, setup)['winner'] == configured_seat
+
+    return wins
+
+
+def _stop_worse(results, critical, min_games):
+    """
+    Stop the configurations whose win rate is significantly below the best win rate of the configurations still
+    running.
+
+    :param results: the results of each configuration so far, changed in place <list<dict>>
+    :param critical: the critical value of the z-test <float>
+    :param min_games: the fewest games a configuration must have played to be compared <int>
+    :rtype : list<tuple<int, int>>
+    :return: each configuration stopped, with the configuration it was compared to
+    """
+    compared = [c for c, result in enumerate(results) if not result['stopped'] and result['games'] >= min_games]
+    if len(compared) < 2:
+        return []
+
+    best = max(compared, key=lambda c: _win_rate(results[c]))
+
+    stopped = []
+    for c in compared:
+        if c != best and _z(results[best], results[c]) > critical:
+            results[c]['stopped'] = True
+            stopped.append((c, best))
+
+    return stopped
+
+
+def _z(first, second):
+    """
+    :return: the z statistic of the first win rate being above the second, with a pooled variance
+    :rtype : float
+    """
+    pooled = (first['wins'] + second['wins']) / (first['games'] + second['games'])
+    variance = pooled * (1 - pooled) * (1 / first['games'] + 1 / second['games'])
+
+    if variance == 0:
+        return 0.0
+
+    return (_win_rate(first) - _win_rate(second)) / math.sqrt(variance)
+
+
+def _win_rate(result):
+    return result['wins'] / result['games'] if result['games'] else 0.0
+
+
+def _write(results_file, record):
+    """
+    Write a record as a json line and flush it, so that it can be read while the sweep runs.
+    """
+    results_file.write(json.dumps(record, sort_keys=True) + '\n')
+    results_file.flush()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='sweep the accusation threshold of the computer player')
+    parser.add_argument('results', help='the results file, one json object per line')
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.5, 0.7, 0.9],
+                        help='accusation thresholds to evaluate, besides accusing only when certain')
+    parser.add_argument('--players', type=int, default=3, help='the number of players of each game')
+    parser.add_argument('--games', type=int, default=2000, help='the most games for each configuration')
+    parser.add_argument('-j', '--processes', type=int, default=None, help='worker processes, defaults to CPUs')
+
+    args = parser.parse_args()
+
+    swept = [{'accusation': None}] + [{'accusation': {'threshold': threshold}} for threshold in args.thresholds]
+    for summary in sweep(swept, args.results, args.players, args.games, processes=args.processes):
+        print('{0}: {1} games, win rate {2:.3f}{3}'.format(summary['configuration'], summary['games'],
+                                                          summary['win_rate'],
+                                                          ' (stopped)' if summary['stopped'] else ''))
@@ -0,0 +1,253 @@
+import math
+
+import networkx as nx
+import numpy as np
+
+from auto.board import Board
+from auto.kernel import GameKernel, deal
+from auto.playermatrix import _suspects, _weapons
+
+"""
+    :module:: symmetry
+    :platform: Unix, Windows
+    :synopsis: Grouping dealt games into classes of deals that play the same, for evaluating strategies.
+
+"""
+
+
+class DealSymmetry:
+    """
+    The relabelings of cards that turn one deal into another that plays the same. The computer players treat the
+    cards of a category alike, so what matters about a card is who holds it, except where the card is tied to the
+    board or to a seat:
+
+        weapons:  any weapon can be relabeled as any other weapon
+        suspects: the suspects of the seats start at their own positions and stay as they are. The suspects no one
+                  plays can be relabeled as each other
+        rooms:    a room can only be relabeled along with the board, by a symmetry of the board that leaves the
+                  starting positions of the seats where they are
+
+    Deals that are relabelings of each other form a class. A class is evaluated once, by playing its representative,
+    and the result stands for every deal of the class.
+
+    """
+
+    def __init__(self, number_of_players, board=None, cache=None):
+        """
+        :param number_of_players: the number of players at the table (3 - 6) <int>
+        :param board: the auto.board.Board played on, defaults to the Clue-Less board
+        :param cache: an auto.tablecache.TableCache to read the relabelings of the rooms from instead of searching
+        the board for its symmetries
+
+        :var
+            seated: list<string>, the suspect of each seat (see auto.kernel.GameKernel)
+            unseated: list<string>, the suspects no one plays
+            weapons: list<string>
+            rooms: list<string>
+            room_permutations: list<dictionary<string:string>>, the relabelings of the rooms by the symmetries of
+            the board, the first being the identity
+        """
+        board = board if board is not None else Board.from_spec()
+
+        self.number_of_players = number_of_players
+        self.seated = list(board.starting_positions)[:number_of_players]
+        self.unseated = sorted(_suspects - set(self.seated))
+        self.weapons = sorted(_weapons)
+        self.rooms = sorted(board.rooms)
+
+        if cache is not None:
+            table = cache.get('symmetry', {'spec_hash': board.spec_hash, 'number_of_players': number_of_players},
+                              lambda: self._build_tables(board))['room_permutations']
+            self.room_permutations = [{room: self.rooms[r] for room, r in zip(self.rooms, row)} for row in table]
+        else:
+            self.room_permutations = self._room_permutations(board, self.seated)
+
+    def _build_tables(self, board):
+        """
+        :rtype : dict<string:numpy.ndarray>
+        :return: the relabelings of the rooms as the index of the room each room is relabeled as
+        """
+        room_index = {room: r for r, room in enumerate(self.rooms)}
+        permutations = self._room_permutations(board, self.seated)
+
+        return {'room_permutations': np.array([[room_index[permutation[room]] for room in self.rooms]
+                                               for permutation in permutations], dtype=np.int8)}
+
+    @staticmethod
+    def _room_permutations(board, seated):
+        """
+        Find the symmetries of the board that keep rooms as rooms, hallways as hallways and the starting positions
+        of the seats in place, and the relabeling of the rooms by each of them.
+
+        :rtype : list<dictionary<string:string>>
+        """
+        graph = board._board.copy()
+
+        labels = {location: 'room' if location in board.rooms else 'hallway' for location in graph}
+        labels.update({board.starting_positions[suspect]: suspect for suspect in seated})
+        nx.set_node_attributes(graph, labels, 'label')
+
+        matcher = nx.algorithms.isomorphism.GraphMatcher(graph, graph,
+                                                         node_match=lambda a, b: a['label'] == b['label'])
+
+        identity = {room: room for room in sorted(board.rooms)}
+        permutations = [identity]
+        for mapping in matcher.isomorphisms_iter():
+            permutation = {room: mapping[room] for room in identity}
+            if permutation not in permutations:
+                permutations.append(permutation)
+
+        return permutations
+
+    def canonical(self, envelope, hands):
+        """
+        Gets the key of the class of a deal. Two deals have the same key when one is a relabeling of the other.
+
+        :param envelope: the envelope cards <iterable<string>>
+        :param hands: the hand of each seat <list<iterable<string>>>
+        :rtype : tuple
+        """
+        holders = self._holders(envelope, hands)
+
+        # a category relabeled in any way only keeps how many of its cards each holder has
+        weapons = tuple(sorted(holders[card] for card in self.weapons))
+        unseated = tuple(sorted(holders[card] for card in self.unseated))
+        seated = tuple(holders[card] for card in self.seated)
+        rooms = min(self._room_images(holders))
+
+        return weapons, unseated, seated, rooms
+
+    def class_size(self, envelope, hands):
+        """
+        Gets the number of deals in the class of a deal.
+
+        :param envelope: the envelope cards <iterable<string>>
+        :param hands: the hand of each seat <list<iterable<string>>>
+        :rtype : int
+        """
+        holders = self._holders(envelope, hands)
+
+        size = len(set(self._room_images(holders)))
+        for cards in (self.weapons, self.unseated):
+            size *= _arrangements([holders[card] for card in cards])
+
+        return size
+
+    def representative(self, key):
+        """
+        Deals the representative of a class: the deal whose key it is with the cards of each category given out in
+        the order of their names.
+
+        :param key: the key of a class (see canonical)
+        :rtype : tuple<list<string>, list<list<string>>>
+        :return: the envelope (suspect, weapon, room) and the hand of each seat, as from auto.kernel.deal
+        """
+        weapons, unseated, seated, rooms = key
+
+        holders = dict(zip(self.weapons, weapons))
+        holders.update(zip(self.unseated, unseated))
+        holders.update(zip(self.seated, seated))
+        holders.update(zip(self.rooms, rooms))
+
+        envelope = [card for category in (_suspects, _weapons, self.rooms) for card in sorted(category)
+                    if holders[card] == 0]
+        hands = [sorted(card for card, holder in holders.items() if holder == seat + 1)
+                 for seat in range(self.number_of_players)]
+
+        return envelope, hands
+
+    def _room_images(self, holders):
+        """
+        :return: the holders of the rooms, in the order of self.rooms, after each relabeling of the rooms
+        """
+        return [tuple(holders[permutation[room]] for room in self.rooms) for permutation in self.room_permutations]
+
+    @staticmethod
+    def _holders(envelope, hands):
+        """
+        :rtype : dictionary<string:int>
+        :return: the holder of each card: 0 for the envelope and seat + 1 for a seat
+        """
+        holders = dict.fromkeys(envelope, 0)
+        for seat, hand in enumerate(hands):
+            holders.update(dict.fromkeys(hand, seat + 1))
+
+        return holders
+
+
+def deal_classes(seeds, number_of_players, board=None, deals=None, cache=None, symmetry=None):
+    """
+    Group the games dealt from seeds into classes of deals that play the same.
+
+    :param seeds: the seeds of the games (see auto.kernel.deal) <list<int>>
+    :param number_of_players: the number of players at the table <int>
+    :param board: the auto.board.Board played on, defaults to the Clue-Less board
+    :param deals: the envelope and hands of each game to group instead of the games dealt from the seeds <list<tuple>>
+    :param cache: an auto.tablecache.TableCache for the symmetry tables (see DealSymmetry)
+    :param symmetry: the DealSymmetry of the table, when the caller has one already. The board and cache are then
+    not used
+    :rtype : dictionary<tuple:dict>
+    :return: for the key of each class (see DealSymmetry.canonical), the seeds dealing a game of the class and the
+    number of deals in the class
+    """
+    if symmetry is None:
+        symmetry = DealSymmetry(number_of_players, board, cache)
+
+    if deals is None:
+        deals = [deal(seed, number_of_players) for seed in seeds]
+
+    classes = {}
+    for seed, (envelope, hands) in zip(seeds, deals):
+        key = symmetry.canonical(envelope, hands)
+
+        if key not in classes:
+            classes[key] = {'seeds': [], 'size': symmetry.class_size(envelope, hands)}
+        classes[key]['seeds'].append(seed)
+
+    return classes
+
+
+def play_classes(seeds, number_of_players, deals, board=None, max_turns=500, cache=None):
+    """
+    Play a batch of deals with auto.kernel.GameKernel, playing the representative of each class of deals once
+    instead of every deal of the class.
+
+    This is for batches whose deals share classes, such as deals relabeled from one another or the same deals
+    replayed. With the full deck there are over a million classes even for three players, so games dealt from
+    random seeds seldom share one. Play those with auto.kernel.GameKernel directly.
+
+    :param seeds: the seed standing for each deal in the classes (see deal_classes) <list<int>>
+    :param number_of_players: the number of players at the table <int>
+    :param deals: the envelope and hands of each game to play <list<tuple>>
+    :param board: the auto.board.Board played on, defaults to the Clue-Less board
+    :param max_turns: games still going after this many turns end without a winner <int>
+    :param cache: an auto.tablecache.TableCache for the symmetry tables (see DealSymmetry)
+    :rtype : dict<string:numpy.ndarray>
+    :return: for each class, the winning seat (-1 for none), the turns taken, the weight, which is the number of
+    seeds dealing a game of the class, and the number of deals in the class (size). A statistic of the seeds is the
+    weighted statistic of the classes.
+    """
+    symmetry = DealSymmetry(number_of_players, board, cache)
+    classes = deal_classes(seeds, number_of_players, deals=deals, symmetry=symmetry)
+
+    # each class is played with the seed of its first game
+    kernel = GameKernel([value['seeds'][0] for value in classes.values()], number_of_players, board, max_turns,
+                        deals=[symmetry.representative(key) for key in classes])
+    results = kernel.run()
+
+    return {'winner': results['winner'], 'turns': results['turns'],
+            'weight': np.array([len(value['seeds']) for value in classes.values()]),
+            'size': np.array([value['size'] for value in classes.values()])}
+
+
+def _arrangements(holders):
+    """
+    :param holders: the holder of each card of a category <list<int>>
+    :rtype : int
+    :return: the number of ways to give the cards to the same holders, as many cards to each holder
+    """
+    arrangements = math.factorial(len(holders))
+    for holder in set(holders):
+        arrangements //= math.factorial(holders.count(holder))
+
+    return arrangements
@@ -0,0 +1,97 @@
+from auto.padstack import PadStack
+
+"""
+    :module:: table
+    :platform: Unix, Windows
+    :synopsis: The computer players co-hosted at one Clue-Less game table.
+
+"""
+
+
+class Table:
+    """
+    The computer players seated at one game table. The caller (server) can send a game state meant for every seat
+    to the table once instead of to each player.
+
+    """
+
+    def __init__(self, players, stacked=False):
+        """
+        Seat a set of computer players at the table.
+
+        :param players: the auto.automaton.Player objects hosted at this table <list>
+        :param stacked: if true, the pads of all of the players are moved into one auto.padstack.PadStack so that
+        updates meant for every seat are applied to all of the pads at once
+
+        :var
+            _players: dictionary<player_id<string>:auto.automaton.Player>
+            _seats: dictionary<player_id<string>:int>
+            _stack: auto.padstack.PadStack or None
+        """
+        self._players = {player.player_id: player for player in players}
+        self._seats = {player_id: seat for seat, player_id in enumerate(self._players)}
+        self._stack = None
+
+        if stacked:
+            # copy what each player has marked so far into the stack and give each player its seat in the stack
+            self._stack = PadStack.from_pads([player._pad for player in self._players.values()])
+            for player_id, player in self._players.items():
+                player._pad = self._stack.pad(self._seats[player_id])
+
+    @property
+    def stack(self):
+        """
+        Gets the stack holding the pads of the players when the table is stacked
+
+        :rtype : auto.padstack.PadStack or None
+        """
+        return self._stack
+
+    @property
+    def players(self):
+        """
+        Gets the computer players seated at this table
+
+        :rtype : list<auto.automaton.Player>
+        :return: the players in the order they were seated
+        """
+        return list(self._players.values())
+
+    def broadcast(self, game_state, exclude=()):
+        """
+        Send the same game state to every seat at the table.
+
+        Each seat's update handles the game state. When the table is stacked, the undirected answer that a player
+        has one of the suggested cards is decoded once and marked in c2 of every seat in one pass over the stack;
+        each seat then acknowledges the answer with the same events, diagnostics and guard as update.
+
+        :param game_state: a game state dictionary (see auto.automaton.Player.update)
+        :param exclude: ids of players that should not receive the game state, such as the asking player
+        :return: the response of each seat that received the game state
+        :rtype: dict<player_id<string>:dict>
+        """
+        players = [player for player_id, player in self._players.items() if player_id not in exclude]
+
+        if self._stack is not None and self._is_has_card_answer(game_state):
+            # decode the message once for all of the seats
+            self._stack.mark_has_card([self._seats[player.player_id] for player in players],
+                                      game_state['answer']['from_player'], tuple(game_state['cards']))
+
+            return {player.player_id: player._acknowledge_marked_answer(game_state) for player in players}
+
+        return {player.player_id: player.update(game_state) for player in players}
+
+    @staticmethod
+    def _is_has_card_answer(game_state):
+        """
+        Checks whether the game state is the undirected answer that a player has one of the suggested cards.
+
+        :param game_state: a game state dictionary
+        :rtype: bool
+        """
+        if 'positions' in game_state or 'suggestion' in game_state or 'cards' not in game_state:
+            return False
+
+        answer = game_state.get('answer')
+
+        return isinstance(answer, dict) and answer.get('has_card') is True
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+"""
+    :module:: tablecache
+    :platform: Unix, Windows
+    :synopsis: Precomputed tables kept on disk and memory-mapped read-only by every process using them.
+
+"""
+
+# the version of the code building the cached tables. Change it whenever a table would be built differently, so
+# that tables built by older code are rebuilt
+ENGINE_VERSION = 1
+
+
+class TableCache:
+    """
+    A directory of precomputed tables. A set of tables is identified by a name and a key, such as the hash of the
+    board spec the tables were built for, and is stored along with ENGINE_VERSION:
+
+        <directory>/<name>/<hash of the key and engine version>/<table>.npy
+        <directory>/<name>/<hash of the key and engine version>/meta.json
+
+    A set of tables is built the first time it is asked for and written to a temporary directory that is then
+    renamed into place, so a process never reads a set that is partly written. After that, every process maps the
+    files read-only instead of building the tables, and the operating system shares the pages between processes.
+
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: the directory holding the tables. Created if it doesn't exist <string>
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, name, key, build):
+        """
+        Gets a set of tables, building and storing it if it isn't in the cache or was built by another engine
+        version.
+
+        :param name: the name of the set of tables, such as 'board' <string>
+        :param key: what the tables are built from, using only builtin types <dict>
+        :param build: a function returning the tables when they need to be built <dict<string:numpy.ndarray>>
+        :rtype : dict<string:numpy.memmap>
+        :return: each table, mapped read-only
+        """
+        digest = hashlib.sha1(json.dumps({'engine_version': ENGINE_VERSION, 'key': key},
+                                         sort_keys=True).encode('UTF-8')).hexdigest()
+        path = os.path.join(self.directory, name, digest)
+
+        tables = self._load(path)
+        if tables is None:
+            self._store(path, key, build())
+            self._prune(name)
+            tables = self._load(path)
+
+        return tables
+
+    @staticmethod
+    def _load(path):
+        """
+        :rtype : dict<string:numpy.memmap>
+        :return: the tables stored at a path, or None if they aren't there or are from another engine version
+        """
+        try:
+            with open(os.path.join(path, 'meta.json')) as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get('engine_version') != ENGINE_VERSION:
+            return None
+
+        return {table: np.load(os.path.join(path, table + '.npy'), mmap_mode='r') for table in meta['tables']}
+
+    def _store(self, path, key, tables):
+        """
+        Write a set of tables into place. When another process has put the same set in place first, theirs is kept.
+        """
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+
+        temporary = tempfile.mkdtemp(dir=parent, prefix='.building-')
+        try:
+            for table, values in tables.items():
+                np.save(os.path.join(temporary, table + '.npy'), np.ascontiguousarray(values))
+
+            with open(os.path.join(temporary, 'meta.json'), 'w') as meta_file:
+                json.dump({'engine_version': ENGINE_VERSION, 'key': key, 'tables': sorted(tables)}, meta_file,
+                          sort_keys=True)
+
+            os.rename(temporary, path)
+        except OSError:
+            # the tables were put in place by another process in the meantime
+            if self._load(path) is None:
+                raise
+        finally:
+            shutil.rmtree(temporary, ignore_errors=True)
+
+    def _prune(self, name):
+        """
+        Remove the sets of tables of a name built by other engine versions. Sets built for other keys by the same
+        engine version can still be in use and are kept.
+        """
+        directory = os.path.join(self.directory, name)
+
+        for entry in os.listdir(directory):
+            path = os.path.join(directory, entry)
+            if not entry.startswith('.') and self._load(path) is None:
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,172 @@
+import unittest
+import logging
+import sys
+import asyncio
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from unittest import mock
+
+from auto.automaton import Player
+from auto.accusation import AccusationPolicy
+from auto.diagnostics import SlowCallRecorder
+from auto.events import EventSink
+
+
+class _RecordingExecutor(ThreadPoolExecutor):
+    """
+    A thread executor keeping the arguments of every function submitted to it.
+    """
+
+    def __init__(self):
+        super().__init__(1)
+        self.submitted = []
+
+    def submit(self, function, *args, **kwargs):
+        self.submitted.append(args)
+
+        return super().submit(function, *args, **kwargs)
+
+
+class AutoAsyncUnitTests(unittest.TestCase):
+    """
+    Testing the async variants of take_turn and update
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var two players dealt the same cards and given the same answers, one for the sync and one for the async API
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        self.players = []
+        for _ in range(2):
+            player = Player('p04', ['Peacock'], 4)
+            player.receive_cards(['Wrench', 'Green', 'Study', 'Hall'])
+            for card, other in [('Mustard', 'p01'), ('White', 'p02'), ('Peacock', 'p03'), ('Rope', 'p01')]:
+                player._pad.mark_card(other, card)
+            player.update({'answer': {'from_player': 'p02', 'has_card': True}, 'cards': {'Scarlet', 'Kitchen', 'Study'}})
+            self.players.append(player)
+
+        self.game_state = {'positions': {'p01': 'Kitchen', 'p02': 'Conservatory', 'p03': 'Hallway_11',
+                                         'p04': 'Hallway_01'}}
+
+    def test_update_async_returns_the_same_accusations_as_update(self):
+        """
+        Tests that with a seeded accusation policy, the async variant makes the same decisions as update, whether the
+        policy runs in a thread or in another process.
+        """
+        sync_player, async_player = self.players
+
+        answers = [{'move_made': True, 'answer': {'from_player': 'p03', 'card': card}}
+                   for card in ['Knife', 'Pipe', 'Billiard', 'Lounge', 'Dining', 'Ballroom', 'Library']]
+
+        for executor in (ThreadPoolExecutor(2), ProcessPoolExecutor(2)):
+            with executor:
+                sync_player.set_accusation_policy(AccusationPolicy(threshold=0.2, time_limit=1, max_samples=300,
+                                                                   seed=7))
+                async_player.set_accusation_policy(AccusationPolicy(threshold=0.2, time_limit=1, max_samples=300,
+                                                                    seed=7))
+                async_player.set_executor(executor)
+
+                accusations = 0
+                for answer in answers:
+                    expected = sync_player.update(answer)
+                    actual = asyncio.run(async_player.update_async(answer))
+
+                    self.assertEqual(actual, expected)
+                    accusations += 'accusation' in expected
+
+                self.assertGreater(accusations, 0)
+
+        # the default executor of the event loop
+        async_player.set_executor(None)
+
+        self.assertEqual(asyncio.run(async_player.update_async({'move_made': True})), {'turn_complete': True})
+        self.assertEqual(asyncio.run(async_player.update_many_async(answers[:2])), sync_player.update_many(answers[:2]))
+
+    def test_take_turn_async_matches_take_turn_and_leaves_the_event_loop_free(self):
+        """
+        Tests that without a deadline the async turn is the sync turn, and that in anytime mode the estimate runs
+        in the executor while other coroutines keep running and the turn is returned before the deadline.
+        """
+        sync_player, async_player = self.players
+
+        random.seed(3)
+        expected = sync_player.take_turn(dict(self.game_state))
+        random.seed(3)
+        self.assertEqual(asyncio.run(async_player.take_turn_async(dict(self.game_state))), expected)
+
+        async_player._prior_moves = {'Study', 'Hallway_01'}
+        async_player.set_executor(ThreadPoolExecutor(1))
+
+        async def take_turn_while_ticking():
+            ticks = 0
+            deadline = time.monotonic() + 0.1
+            turn = asyncio.ensure_future(async_player.take_turn_async(dict(self.game_state), deadline=deadline))
+
+            while not turn.done():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+            return turn.result(), ticks, time.monotonic() - deadline
+
+        response, ticks, overrun = asyncio.run(take_turn_while_ticking())
+
+        self.assertGreater(ticks, 2)
+        self.assertLess(overrun, 0.01)
+        self.assertEqual(response['move'], 'Hall')
+        self.assertIn('Plum', response['suggestion']['cards'])
+
+    def test_executor_reads_a_snapshot_of_the_pad(self):
+        """
+        Tests that the analysis run in the executor is given a copy of the pad, so that updates handled by the event
+        loop meanwhile don't change what it reads.
+        """
+        _, async_player = self.players
+        async_player.set_accusation_policy(AccusationPolicy(threshold=0.2, time_limit=1, max_samples=50, seed=7))
+
+        with _RecordingExecutor() as executor:
+            async_player.set_executor(executor)
+
+            asyncio.run(async_player.update_async({'move_made': True, 'answer': {'from_player': 'p03',
+                                                                                 'card': 'Knife'}}))
+            async_player._prior_moves = {'Study', 'Hallway_01'}
+            asyncio.run(async_player.take_turn_async(dict(self.game_state), deadline=time.monotonic() + 0.05))
+
+        # the pad is the second argument of both the policy decision and the envelope estimate
+        pads = [arguments[1] for arguments in executor.submitted]
+        self.assertEqual(len(pads), 2)
+        for pad in pads:
+            self.assertIsNot(pad, async_player._pad)
+            self.assertTrue(pad.has_card('p03', 'Knife'))
+            self.assertEqual(pad.c2_groups('p02'), async_player._pad.c2_groups('p02'))
+
+    def test_take_turn_async_is_recorded_and_guarded(self):
+        """
+        Tests that in diagnostic mode an async turn is recorded like a turn, and that with an event sink the events
+        are dumped when an async turn raises.
+        """
+        _, async_player = self.players
+
+        with tempfile.TemporaryDirectory() as directory:
+            async_player.set_diagnostics(SlowCallRecorder(directory, latency_threshold=0))
+            asyncio.run(async_player.take_turn_async(dict(self.game_state)))
+            async_player.set_diagnostics(None)
+
+            self.assertEqual(os.listdir(os.path.join(directory, 'slow_call_00')).count('call.json'), 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            sink = EventSink(directory)
+            async_player.set_event_sink(sink)
+
+            with mock.patch.object(async_player, '_choose_turn', side_effect=KeyError('p09')):
+                with self.assertRaises(KeyError):
+                    asyncio.run(async_player.take_turn_async(dict(self.game_state)))
+
+            self.assertFalse(sink.guarding)
+            self.assertEqual(len([name for name in os.listdir(directory) if name.endswith('.npy')]), 1)
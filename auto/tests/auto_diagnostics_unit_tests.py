@@ -0,0 +1,170 @@
+import unittest
+import asyncio
+import logging
+import sys
+import os
+import json
+import pstats
+import tempfile
+import threading
+import tracemalloc
+
+from auto.automaton import Player
+from auto.diagnostics import SlowCallRecorder
+
+
+class AutoDiagnosticsUnitTests(unittest.TestCase):
+    """
+    Testing the capture of profiles for slow take_turn and update calls
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var an instantiated player object
+        :var a temporary directory for the ring of slow call traces
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        available_suspects = ['Peacock', 'Plum', 'Green', 'Mustard']
+
+        self.player = Player('p04', available_suspects, 4)
+        self.player.receive_cards(['Wrench', 'Green', 'Study', 'Hall'])
+
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_slow_calls_are_recorded_in_a_bounded_ring(self):
+        """
+        Tests that with a zero latency threshold every call is recorded with its input and the player state from
+        before the call, and that no more than ring_size calls are kept.
+        """
+        recorder = SlowCallRecorder(self.directory.name, latency_threshold=0, ring_size=2)
+        self.player.set_diagnostics(recorder)
+
+        game_state = {'positions': {'p01': 'Kitchen', 'p02': 'Conservatory', 'p03': 'Hallway_11', 'p04': 'Hallway_01'}}
+        self.player.take_turn(game_state)
+        self.player.update({'move_made': True})
+        response = self.player.update({'answer': {'from_player': 'p02', 'has_card': True},
+                                       'cards': {'Plum', 'Hall', 'Candlestick'}})
+
+        # the call made while recording returns the same response
+        self.assertEqual(response, {'acknowledged': True})
+
+        slots = sorted(name for name in os.listdir(self.directory.name) if name.startswith('slow_call_'))
+        self.assertEqual(slots, ['slow_call_00', 'slow_call_01'])
+
+        # the third call overwrote the first slot
+        slot = os.path.join(self.directory.name, 'slow_call_00')
+        with open(os.path.join(slot, 'call.json')) as call_file:
+            call = json.load(call_file)
+
+        self.assertEqual(call['call'], 'update')
+        self.assertEqual(call['player_id'], 'p04')
+        self.assertEqual(call['game_state']['cards'], ['Candlestick', 'Hall', 'Plum'])
+        self.assertEqual(call['player_state']['pad']['p04']['c1'], ['Green', 'Hall', 'Study', 'Wrench'])
+        self.assertEqual(call['player_state']['pad']['p02']['c2'], {})
+        self.assertEqual(self.player._pad.c2_entries('p02', 'Hall'), {1})
+
+        self.assertTrue(pstats.Stats(os.path.join(slot, 'profile.prof')).total_calls > 0)
+        self.assertTrue(tracemalloc.Snapshot.load(os.path.join(slot, 'tracemalloc.snapshot')))
+
+    def test_calls_under_thresholds_are_not_recorded(self):
+        """
+        Tests that nothing is written for calls under the thresholds and that tracing is stopped after the call.
+        """
+        self.player.set_diagnostics(SlowCallRecorder(self.directory.name, latency_threshold=60,
+                                                     allocation_threshold=10 ** 9))
+
+        self.player.update({'move_made': True})
+
+        self.assertEqual(os.listdir(self.directory.name), [])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_recording_is_per_thread(self):
+        """
+        Tests that a call being recorded in one thread doesn't stop a call made in another thread from being
+        recorded.
+        """
+        recorder = SlowCallRecorder(self.directory.name, latency_threshold=0)
+        seen = []
+
+        def call(game_state):
+            # another thread looks at the recorder while this call is being recorded
+            thread = threading.Thread(target=lambda: seen.append(recorder.recording))
+            thread.start()
+            thread.join()
+
+            return recorder.recording
+
+        self.assertTrue(recorder.record(self.player, call, {}))
+        self.assertEqual(seen, [False])
+        self.assertFalse(recorder.recording)
+
+    def test_calls_recorded_in_several_threads_at_once(self):
+        """
+        Tests that players updated in several threads at once with a shared recorder all get their responses, that
+        every call is written to the ring and that tracing is stopped once the last call has finished.
+        """
+        recorder = SlowCallRecorder(self.directory.name, latency_threshold=0, ring_size=4)
+        barrier = threading.Barrier(4)
+        responses = []
+        errors = []
+
+        def play(player_id):
+            player = Player(player_id, ['Peacock', 'Plum', 'Green', 'Mustard'], 4)
+            player.set_diagnostics(recorder)
+            barrier.wait()
+            try:
+                for _ in range(20):
+                    responses.append(player.update({'answer': {'from_player': 'p02', 'has_card': True},
+                                                    'cards': {'Plum', 'Hall', 'Candlestick'}}))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=play, args=(player_id,)) for player_id in ('p01', 'p03', 'p04', 'p05')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(responses, [{'acknowledged': True}] * 80)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        with open(os.path.join(self.directory.name, 'ring.json')) as ring_file:
+            self.assertEqual(json.load(ring_file), {'next_slot': 0})
+        for slot in range(4):
+            with open(os.path.join(self.directory.name, 'slow_call_{0:02d}'.format(slot), 'call.json')) as call_file:
+                self.assertEqual(json.load(call_file)['call'], 'update')
+
+    def test_overlapping_async_calls_are_profiled_one_at_a_time(self):
+        """
+        Tests that of two calls recorded at once in one event loop, the call started while the other is being
+        profiled is recorded without a profile, and the profile of the first call is kept.
+        """
+        recorder = SlowCallRecorder(self.directory.name, latency_threshold=0)
+
+        async def call(game_state):
+            await asyncio.sleep(0.01)
+            return game_state['n']
+
+        async def overlap():
+            return await asyncio.gather(recorder.record_async(self.player, call, {'n': 0}),
+                                        recorder.record_async(self.player, call, {'n': 1}))
+
+        self.assertEqual(asyncio.run(overlap()), [0, 1])
+
+        calls = {}
+        for slot in ('slow_call_00', 'slow_call_01'):
+            with open(os.path.join(self.directory.name, slot, 'call.json')) as call_file:
+                call_recorded = json.load(call_file)
+            calls[call_recorded['game_state']['n']] = (slot, call_recorded['profiled'])
+
+        self.assertTrue(calls[0][1])
+        self.assertFalse(calls[1][1])
+        self.assertTrue(pstats.Stats(os.path.join(self.directory.name, calls[0][0], 'profile.prof')).total_calls > 0)
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, calls[1][0], 'profile.prof')))
@@ -0,0 +1,151 @@
+import unittest
+import logging
+import sys
+import os
+import tempfile
+
+from auto import events
+from auto.automaton import Player
+from auto.events import EventSink, format_events
+from auto.table import Table
+
+
+class _Clock:
+    """
+    A clock that only moves when told to.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class AutoEventsUnitTests(unittest.TestCase):
+    """
+    Testing the trace events of the computer players
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var a directory for the dumps and a player dealt cards, with Mustard known to be held by p01
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        self.directory = tempfile.TemporaryDirectory()
+
+        self.player = Player('p02', ['Plum'], 3)
+        self.player.receive_cards(['Wrench', 'Green', 'Study', 'Hall', 'Rope', 'Lounge'])
+        self.player._pad.mark_card('p01', 'Mustard')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_events_are_sampled_by_seat_kind_and_rate(self):
+        """
+        Tests that only the events of the chosen seats and kinds are kept, that the rate limit allows bursts of up
+        to a second of events, and that the ring buffer keeps the last events.
+        """
+        clock = _Clock()
+        sink = EventSink(self.directory.name, capacity=8, seats=[0, 1], sample_rates={'no_match': 0.0},
+                         rate_limit=4, clock=clock)
+
+        sink.emit(events.NO_MATCH, 0)
+        sink.emit(events.ANSWER, 2, 0, sink.code('Knife'))
+        self.assertEqual(len(sink.events()), 0)
+        self.assertEqual(sink.dropped, 1)
+
+        for _ in range(6):
+            sink.emit(events.ANSWER, 1, 0, sink.code('Knife'))
+        self.assertEqual(len(sink.events()), 4)
+        self.assertEqual(sink.dropped, 3)
+
+        # half a second later, two more events are allowed
+        clock.now += 0.5
+        for card in ['Rope', 'Pipe', 'Wrench']:
+            sink.emit(events.ANSWER, 0, 1, sink.code(card))
+
+        clock.now += 10
+        for card in ['Hall', 'Study', 'Lounge']:
+            sink.emit(events.ANSWER, 0, 1, sink.code(card))
+
+        kept = sink.events()
+        self.assertEqual([sink.names[record['fields'][1]] for record in kept],
+                         ['Knife'] * 3 + ['Rope', 'Pipe', 'Hall', 'Study', 'Lounge'])
+        self.assertEqual(sink.dropped, 4)
+        self.assertTrue((kept['time'][1:] >= kept['time'][:-1]).all())
+
+    def test_events_are_dumped_on_error(self):
+        """
+        Tests that a player's turns and answers are sent as events, that nothing is written while calls succeed and
+        that the events are dumped and read back as text when a call raises.
+        """
+        sink = EventSink(self.directory.name)
+        self.player.set_event_sink(sink)
+
+        self.player.update({'suggestion': {'from_player': 'p01', 'cards': {'Scarlet', 'Knife', 'Kitchen'}}})
+        response = self.player.take_turn({'positions': {'p01': 'Kitchen', 'p02': 'Hallway_03',
+                                                        'p03': 'Hallway_05'}})
+        self.player.update({'move_made': True, 'answer': {'from_player': 'p03', 'card': 'Knife'}})
+        self.player.update({'answer': {'from_player': 'p01', 'has_card': True},
+                            'cards': {'Scarlet', 'Pipe', 'Ballroom'}})
+
+        self.assertEqual([events.KINDS[kind] for kind in sink.events()['kind']],
+                         ['suggestion', 'turn', 'answer', 'has_card'])
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+        # an answer from a player who isn't in the game
+        with self.assertRaises(KeyError):
+            self.player.update({'move_made': True, 'answer': {'from_player': 'p09', 'card': 'Pipe'}})
+        self.assertFalse(sink.guarding)
+
+        dumps = sorted(name[:-len('.npy')] for name in os.listdir(self.directory.name) if name.endswith('.npy'))
+        self.assertEqual(len(dumps), 1)
+
+        lines = list(format_events(os.path.join(self.directory.name, dumps[0])))
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[0].endswith('seat 1 suggestion seat 0 Kitchen Knife Scarlet'))
+        self.assertIn('seat 1 turn {0} {0}'.format(response['move']), lines[1])
+        self.assertTrue(lines[2].endswith('seat 1 answer seat 2 Knife'))
+        self.assertTrue(lines[3].endswith('seat 1 has_card seat 0 Ballroom Pipe Scarlet'))
+        self.assertTrue(lines[4].endswith('seat 1 error'))
+
+    def test_events_of_other_seats_are_not_kept(self):
+        """
+        Tests that the events of seats that aren't kept are not worked out.
+        """
+        sink = EventSink(self.directory.name, seats=[0])
+        self.player.set_event_sink(sink)
+
+        self.player.take_turn({'positions': {'p01': 'Kitchen', 'p02': 'Hallway_03', 'p03': 'Hallway_05'}})
+        self.player.update({'move_made': True, 'answer': 'no_match'})
+
+        self.assertEqual(len(sink.events()), 0)
+        self.assertEqual(sink.dropped, 0)
+
+    def test_events_of_a_stacked_table(self):
+        """
+        Tests that the players of a stacked table send their events and dump them on error like separate players.
+        """
+        other = Player('p01', ['Mustard'], 3)
+        table = Table([other, self.player], stacked=True)
+
+        sink = EventSink(self.directory.name)
+        for player in table.players:
+            player.set_event_sink(sink)
+
+        table.broadcast({'suggestion': {'from_player': 'p03', 'cards': {'Scarlet', 'Pipe', 'Ballroom'}}})
+        self.player.update({'move_made': True, 'answer': {'from_player': 'p03', 'card': 'Knife'}})
+
+        self.assertEqual([(record['seat'], events.KINDS[record['kind']]) for record in sink.events()],
+                         [(0, 'suggestion'), (1, 'suggestion'), (1, 'answer')])
+
+        with self.assertRaises(KeyError):
+            self.player.update({'move_made': True, 'answer': {'from_player': 'p09', 'card': 'Pipe'}})
+
+        dumps = [name for name in os.listdir(self.directory.name) if name.endswith('.npy')]
+        lines = list(format_events(os.path.join(self.directory.name, dumps[0][:-len('.npy')])))
+        self.assertTrue(lines[-1].endswith('seat 1 error'))
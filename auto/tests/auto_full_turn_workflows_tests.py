@@ -227,12 +227,12 @@ class AutoFullTurnWorkflowsUnitTests(unittest.TestCase):
             print('\t\t{0} responds: {1}'.format(p02.player_id, response))
 
             # server constructs this message for all other players
-            game_state = game_state.setdefault('cards', turn_msg['suggestion']['cards'])
+            game_state = {'answer': 'no_match', 'cards': turn_msg['suggestion']['cards']}
 
             print('\n+ server sends all other players this no_match response: {0}', game_state)
             # example of how p03 responds
             response = players[2].update(game_state)
-            print('\t\t{0} acknowledges the update by sending: {1}'.format(player[2].player_id, response))
+            print('\t\t{0} acknowledges the update by sending: {1}'.format(players[2].player_id, response))
 
         # The server will then construct position game_state, which is first sent as an update to all players
         # Then, game_state is explicitly sent to the next player in line in a call to take_turn and so on...
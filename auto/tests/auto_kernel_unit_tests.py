@@ -0,0 +1,142 @@
+import unittest
+import logging
+import sys
+
+import numpy as np
+
+from auto.kernel import GameKernel, deal, reference_game
+
+
+class AutoKernelUnitTests(unittest.TestCase):
+    """
+    Testing the vectorized game kernel against games played by auto.automaton.Player objects
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var the seeds shared by the kernel and the reference games
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        self.seeds = [3, 17, 29, 101]
+        self.number_of_players = 4
+
+    def test_kernel_replays_reference_games_turn_for_turn(self):
+        """
+        Tests that, given the moves and suggestions the players chose, the kernel finds the same moves legal, asks
+        the same player to answer, accuses on the same turn with the same winner and ends with the same cards known
+        to each player as the players' pads.
+        """
+        references = [reference_game(seed, self.number_of_players) for seed in self.seeds]
+        kernel = GameKernel(self.seeds, self.number_of_players)
+
+        location_index = {location: l for l, location in enumerate(kernel.locations)}
+
+        for turn in range(max(len(reference['turns']) for reference in references)):
+            records = [reference['turns'][min(turn, len(reference['turns']) - 1)] for reference in references]
+            moves = np.array([location_index[record['move']] for record in records])
+
+            # the player's move is one the kernel allows: a free neighbor, staying in a room the player's suspect
+            # was summoned to, or staying when there is nowhere to go
+            seat = turn % self.number_of_players
+            for g in np.flatnonzero(~kernel.finished):
+                location = kernel.location[g, seat]
+                occupied = np.zeros(len(kernel.locations), dtype=bool)
+                occupied[kernel.location[g]] = True
+                possible = kernel._adjacency[location] & ~occupied
+
+                if moves[g] == location:
+                    self.assertTrue(kernel.summoned[g, seat] or not possible.any())
+                else:
+                    self.assertTrue(possible[moves[g]])
+
+            result = self._step_as_recorded(kernel, records)
+
+            for i, g in enumerate(result['games']):
+                record = records[g]
+                self.assertEqual(result['answerer'][i], record['answerer'])
+                self.assertEqual(result['accused'][i], record['accused'])
+                if record['shown']:
+                    self.assertIn(record['shown'], deal(self.seeds[g], self.number_of_players)[1][record['answerer']])
+
+        self.assertTrue(kernel.finished.all())
+        for g, reference in enumerate(references):
+            self.assertEqual(kernel.winner[g], reference['winner'])
+            self.assertEqual(kernel.turns[g], len(reference['turns']))
+
+            for seat, player in enumerate(reference['players']):
+                pad = player._pad
+                known = {card for card in pad.cards if any(pad.has_card(other, card) for other in pad.players_list)}
+                self.assertEqual({kernel.cards[c] for c in np.flatnonzero(kernel.known[g, seat])}, known)
+
+    def test_kernel_accuses_after_a_suggestion_nobody_answers(self):
+        """
+        Tests that a player told that nobody could answer their suggestion accuses when only the envelope is unknown,
+        and that the kernel replaying the game accuses on the same turn.
+        """
+        # in this game, the first player holds both rooms next to their starting hallway. Knowing every card of the
+        # other players, they suggest the envelope's suspect and weapon from their own room, which nobody can answer
+        seed = 2
+        hands = deal(seed, self.number_of_players)[1]
+        self.assertTrue({'Hall', 'Lounge'}.issubset(hands[0]))
+
+        def setup(seat, player):
+            if seat == 0:
+                for other in range(1, self.number_of_players):
+                    for card in hands[other]:
+                        player._pad.mark_card('p{0:02d}'.format(other + 1), card)
+
+        reference = reference_game(seed, self.number_of_players, setup=setup)
+        self.assertEqual(len(reference['turns']), 1)
+        self.assertEqual(reference['turns'][0]['answerer'], -1)
+        self.assertTrue(reference['turns'][0]['accused'])
+        self.assertEqual(reference['winner'], 0)
+
+        # the kernel's first seat is given the same knowledge
+        kernel = GameKernel([seed], self.number_of_players)
+        for other in range(1, self.number_of_players):
+            kernel.holder[0, 0, [kernel.cards.index(card) for card in hands[other]]] = other
+
+        result = self._step_as_recorded(kernel, reference['turns'])
+        self.assertTrue(result['accused'][0])
+        self.assertEqual(kernel.winner[0], 0)
+
+    def test_kernel_plays_a_batch_of_games_to_the_end(self):
+        """
+        Tests that the games of a large batch end with a correct accusation and that a seed deals the same game.
+        """
+        seeds = list(range(2000))
+        kernel = GameKernel(seeds, self.number_of_players)
+
+        self.assertEqual(deal(5, 4), deal(5, 4))
+        self.assertEqual(kernel.hands.sum(axis=(1, 2)).tolist(), [18] * len(seeds))
+
+        results = kernel.run()
+
+        # a game only ends without a winner when it runs out of turns
+        self.assertGreater((results['winner'] >= 0).mean(), 0.99)
+        self.assertTrue((results['turns'][results['winner'] < 0] == kernel.max_turns).all())
+
+        # the winner's unknown cards are the envelope
+        games = np.flatnonzero(results['winner'] >= 0)
+        unknown = ~kernel.known[games, results['winner'][games]]
+        self.assertTrue(unknown[np.arange(len(games))[:, None], kernel.envelope[games]].all())
+
+    # region: helper functions
+    @staticmethod
+    def _step_as_recorded(kernel, records):
+        """
+        Play a turn of each game with the move, suggestion and card shown of its record in a reference game.
+        """
+        location_index = {location: l for l, location in enumerate(kernel.locations)}
+        card_index = {card: c for c, card in enumerate(kernel.cards)}
+
+        moves = np.array([location_index[record['move']] for record in records])
+        suggestions = np.array([[card_index[card] for card in record['suggestion']]
+                                if record['suggestion'] else [-1, -1] for record in records])
+        shown = np.array([card_index[record['shown']] if record['shown'] else -1 for record in records])
+
+        return kernel.step(moves, suggestions, shown)
+    # endregion
@@ -0,0 +1,91 @@
+import unittest
+import logging
+import sys
+import random
+from unittest import mock
+
+from boneyard.autoloadgen import ROOMS, table_script, run, summarize, _latency_percentiles
+
+
+class AutoLoadgenUnitTests(unittest.TestCase):
+    """
+    Testing the scripts and the summary of the load generator
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+    def test_table_script(self):
+        """
+        Tests that each turn sends the positions to every player, asks the other players, answers the asking player
+        with one of the suggested cards and tells the others, and that a seed gives the same script.
+        """
+        messages = table_script(2, 3, 2, random.Random(5))
+
+        self.assertEqual(messages, table_script(2, 3, 2, random.Random(5)))
+        self.assertTrue(all(message['table'] == 2 for message in messages))
+        self.assertEqual([message['player_id'] for message in messages[:3]], ['p01', 'p02', 'p03'])
+
+        # 3 entries, then 3 positions, 2 suggestions, 1 answer, 2 undirected answers and 1 move for each of 6 turns
+        self.assertEqual(len(messages), 3 + 6 * 9)
+
+        turn = messages[3:12]
+        self.assertEqual([message['msg_type'] for message in turn],
+                         ['positions'] * 3 + ['suggestion'] * 2 + ['answer'] * 3 + ['move_made'])
+
+        cards = turn[3]['suggestion']['cards']
+        self.assertEqual(turn[3]['suggestion']['from_player'], 'p01')
+        self.assertEqual(cards[0], turn[0]['positions']['p01'])
+        self.assertIn(cards[0], ROOMS)
+
+        self.assertEqual(turn[5]['player_id'], 'p01')
+        self.assertEqual(turn[5]['answer']['from_player'], 'p02')
+        self.assertIn(turn[5]['answer']['card'], cards)
+        self.assertEqual([message['player_id'] for message in turn[6:8]], ['p02', 'p03'])
+        self.assertEqual(turn[6]['cards'], cards)
+
+    def test_summarize(self):
+        """
+        Tests that the summary counts messages and errors overall and by message type.
+        """
+        results = [('answer', 0.002, None), ('answer', 0.004, 'ConnectionRefusedError'), ('positions', 0.001, None)]
+
+        summary = summarize(results, 2.0)
+
+        self.assertEqual(summary['messages'], 3)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['throughput'], 1.5)
+        self.assertAlmostEqual(summary['p50'], 2.0)
+        self.assertEqual(sorted(summary['msg_types']), ['answer', 'positions'])
+        self.assertEqual(summary['msg_types']['answer']['error_rate'], 0.5)
+        self.assertAlmostEqual(summary['msg_types']['positions']['p99'], 1.0)
+
+        self.assertEqual(summarize([], 0)['throughput'], 0.0)
+
+    def test_latency_percentiles(self):
+        """
+        Tests the nearest rank percentiles, in milliseconds.
+        """
+        self.assertEqual(_latency_percentiles([]), {'p50': 0.0, 'p99': 0.0})
+        self.assertEqual(_latency_percentiles([0.003]), {'p50': 3.0, 'p99': 3.0})
+
+        percentiles = _latency_percentiles([x / 1000.0 for x in range(100, 0, -1)])
+        self.assertAlmostEqual(percentiles['p50'], 50.0)
+        self.assertAlmostEqual(percentiles['p99'], 99.0)
+
+    def test_table_errors_are_raised(self):
+        """
+        Tests that an error other than a connection error in a table is raised by run rather than dropped.
+        """
+        with mock.patch('boneyard.autoloadgen.send_receive', side_effect=RuntimeError('bug')):
+            with self.assertRaises(RuntimeError):
+                run(tables=2, players=3, turns=1, seed=1)
+
+        with mock.patch('boneyard.autoloadgen.send_receive', side_effect=ConnectionRefusedError()):
+            summary = run(tables=2, players=3, turns=1, seed=1)
+
+        self.assertEqual(summary['errors'], summary['messages'])
+        self.assertEqual(summary['messages'], 2 * (3 + 3 * 9))
@@ -3,6 +3,7 @@ import logging
 import sys
 
 from auto.automaton import Player
+from auto.board import Board
 
 
 class AutoMoveUnitTests(unittest.TestCase):
@@ -40,6 +41,50 @@ class AutoMoveUnitTests(unittest.TestCase):
                             {'Hallway_04', 'Hallway_06', 'Hallway_07', 'Hallway_09'})
         self.assertSetEqual(self.player._next_moves('Kitchen'), {'Hallway_10', 'Hallway_12', 'Study'})
 
+    def test_board_location_masks_match_next_moves(self):
+
+        """
+        Tests that the precomputed location masks on the board give the same next moves as the board graph.
+        """
+        board = self.player._board
+
+        for location in board._board.nodes:
+            self.assertSetEqual(board.locations(board.neighbor_mask(location)), board.neighborhood(location, 1))
+
+        occupied = board.location_mask(['Hallway_06', 'Hallway_04', 'Hallway_07'])
+        self.assertSetEqual(board.locations(board.neighbor_mask('Billiard') & ~occupied), {'Hallway_09'})
+
+    def test_player_moves_on_a_board_variant(self):
+
+        """
+        Tests that a board variant is compiled from its spec once and that a player moves on it.
+        """
+        spec = {'rooms': ['Study', 'Hall', 'Library', 'Billiard'],
+                'hallways': {'Hallway_01': ['Study', 'Hall'], 'Hallway_03': ['Study', 'Library'],
+                             'Hallway_04': ['Hall', 'Billiard'], 'Hallway_06': ['Library', 'Billiard']},
+                'secret_passages': [['Study', 'Billiard']],
+                'starting_positions': {'Plum': 'Hallway_03', 'Peacock': 'Hallway_06'}}
+
+        board = Board.from_spec(spec)
+
+        # the same spec gets the same compiled board, and players share the compiled Clue-Less board
+        self.assertIs(board, Board.from_spec(dict(reversed(list(spec.items())))))
+        self.assertIs(self.player._board, Board.from_spec())
+
+        self.assertSetEqual(board.neighbors('Study'), {'Hallway_01', 'Hallway_03', 'Billiard'})
+        self.assertEqual(board.distance('Hallway_01', 'Billiard'), 2)
+
+        player = Player('p02', ['Plum'], 4, board=board)
+        player.receive_cards(['Wrench', 'Green', 'Study', 'Hall'])
+        self.assertEqual(player._location, 'Hallway_03')
+
+        move_response = player.take_turn({'positions': {'p01': 'Library', 'p02': 'Hallway_03'}})
+        self.assertEqual(move_response['move'], 'Study')
+        self.assertIn('Study', move_response['suggestion']['cards'])
+
+        spec['hallways']['Hallway_02'] = ['Hall', 'Lounge']
+        self.assertRaises(ValueError, Board, spec)
+
     def test_should_not_include_library_as_valid_move_because_p01_there_so_should_move_p04_to_billiard(self):
 
         """
@@ -147,3 +192,45 @@ class AutoMoveUnitTests(unittest.TestCase):
         # once. If so, it will appear to this player that the move was never taken. This is not a
         # big issue, but worth noting this edge case.
         self.assertNotIn(move_taken, self.player._prior_moves)
+
+    def test_position_deltas_update_the_mirror_and_gaps_ask_for_a_resync(self):
+        """
+        Tests that position deltas are applied to the mirror of positions used by take_turn, that deltas already
+        applied are skipped, that a missing delta is answered with a resync request until all of the positions
+        are sent again and that positions older than the mirror are ignored.
+        """
+        game_state = {'positions': {'p01': 'Lounge', 'p02': 'Billiard', 'p03': 'Hallway_01', 'p04': 'Hallway_03'},
+                      'version': 7}
+        self.assertIsNone(self.player.update(game_state))
+
+        # p01 moves into the Library, blocking it, and the same delta is sent again
+        delta = {'version': 8, 'player_id': 'p01', 'from': 'Lounge', 'to': 'Hallway_05'}
+        self.assertIsNone(self.player.update({'position_deltas': [delta]}))
+        delta = {'version': 9, 'player_id': 'p01', 'from': 'Hallway_05', 'to': 'Library'}
+        self.assertIsNone(self.player.update({'position_deltas': [delta, delta]}))
+
+        self.assertEqual(self.player._positions['p01'], 'Library')
+        self.assertEqual(self.player._positions_version, 9)
+
+        # from Hallway_03, the Library is blocked so the Study is the only move
+        response = self.player.take_turn({'position_deltas': [delta]})
+        self.assertEqual(response['move'], 'Study')
+
+        # version 10 is missing
+        delta = {'version': 11, 'player_id': 'p02', 'from': 'Billiard', 'to': 'Hallway_09'}
+        expected_response = {'resync': {'from_player': 'p04', 'version': 9}}
+        self.assertEqual(self.player.update({'position_deltas': [delta]}), expected_response)
+        self.assertEqual(self.player.take_turn({'position_deltas': [delta]}), expected_response)
+
+        game_state = {'positions': {'p01': 'Library', 'p02': 'Hallway_09', 'p03': 'Hallway_01', 'p04': 'Study'},
+                      'version': 11}
+        self.player.update(game_state)
+        self.assertEqual(self.player._positions_version, 11)
+
+        # positions of version 9 arriving late don't take the mirror back
+        stale = {'positions': {'p01': 'Library', 'p02': 'Billiard', 'p03': 'Hallway_01', 'p04': 'Hallway_03'},
+                 'version': 9}
+        self.player.update(stale)
+        self.assertEqual(self.player._positions_version, 11)
+        self.assertEqual(self.player._positions['p02'], 'Hallway_09')
+        self.assertEqual(self.player._location, 'Study')
@@ -0,0 +1,137 @@
+import unittest
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from auto.automaton import Player
+from auto.opening import OpeningBook, build_tables, hand_class, _CANDIDATES, _PLAYERS
+from auto.tablecache import TableCache
+
+
+class AutoOpeningUnitTests(unittest.TestCase):
+    """
+    Testing the opening book of first turns
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var a book with a single opening: Scarlet, in a game of 3, holding Hall, one suspect and two weapons moves
+        into Lounge and suggests a suspect they hold and an unknown weapon
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        self.hand = ['Hall', 'Scarlet', 'Knife', 'Rope', 'Study', 'Kitchen']
+        self.assertEqual(hand_class(self.hand, ['Hall', 'Lounge']), (1 * 7 + 1) * 7 + 2)
+
+        openings = np.full((6, 4 * 7 * 7, len(_PLAYERS)), -1, dtype=np.int8)
+        openings[0, hand_class(self.hand, ['Hall', 'Lounge']), 0] = _CANDIDATES.index((1, 1, 0))
+        self.book = OpeningBook({'openings': openings, 'values': np.zeros(openings.shape, dtype=np.float32)})
+
+    def test_lookup(self):
+        """
+        Tests that an opening is found for its suspect, hand class and number of players only.
+        """
+        self.assertEqual(self.book.lookup('Scarlet', self.hand, 3), ('Lounge', True, False))
+
+        # another hand of the same class
+        self.assertEqual(self.book.lookup('Scarlet', ['Hall', 'Plum', 'Pipe', 'Wrench', 'Dining', 'Ballroom'], 3),
+                         ('Lounge', True, False))
+
+        self.assertIsNone(self.book.lookup('Scarlet', self.hand, 4))
+        self.assertIsNone(self.book.lookup('Scarlet', ['Lounge', 'Scarlet', 'Knife', 'Rope'], 3))
+        self.assertIsNone(self.book.lookup('Plum', self.hand, 3))
+        self.assertIsNone(self.book.lookup('Scarlet', self.hand, 2))
+
+    def test_first_turn_follows_the_book(self):
+        """
+        Tests that a player with a book takes its first turn from the book and later turns as usual, whether or not
+        the positions were sent before the first turn, and that the opening isn't played when its room is occupied.
+        """
+        positions = {'p01': 'Hallway_02', 'p02': 'Hallway_03', 'p03': 'Hallway_05'}
+
+        for attempt in range(10):
+            player = Player('p01', ['Scarlet'], 3)
+            player.set_opening_book(self.book)
+            player.receive_cards(self.hand)
+
+            # the server sends the positions to every player before the first turn
+            if attempt % 2:
+                player.update({'positions': dict(positions)})
+
+            response = player.take_turn({'positions': {'p01': 'Hallway_02', 'p02': 'Hallway_03',
+                                                       'p03': 'Hallway_05'}})
+
+            self.assertEqual(response['move'], 'Lounge')
+            cards = response['suggestion']['cards']
+            self.assertEqual(cards & {'Lounge', 'Scarlet'}, {'Lounge', 'Scarlet'})
+            self.assertEqual(len(cards & {'Knife', 'Rope'}), 0)
+            self.assertEqual(player._location, 'Lounge')
+
+            # the second turn isn't an opening
+            player.update({'move_made': True})
+            response = player.take_turn({'positions': {'p01': 'Lounge', 'p02': 'Hallway_03', 'p03': 'Hallway_05'}})
+            self.assertNotEqual(response['move'], 'Lounge')
+
+        player = Player('p01', ['Scarlet'], 3)
+        player.set_opening_book(self.book)
+        player.receive_cards(self.hand)
+
+        response = player.take_turn({'positions': {'p01': 'Hallway_02', 'p02': 'Lounge', 'p03': 'Hallway_05'}})
+        self.assertEqual(response['move'], 'Hall')
+
+    def test_opening_is_not_refined_in_anytime_mode(self):
+        """
+        Tests that with a deadline the suggestion of the opening is returned as the book has it, holding the suspect,
+        instead of being refined towards the unknown cards, by take_turn and take_turn_async.
+        """
+        game_state = {'positions': {'p01': 'Hallway_02', 'p02': 'Hallway_03', 'p03': 'Hallway_05'}}
+
+        for asynchronous in (False, True):
+            player = Player('p01', ['Scarlet'], 3)
+            player.set_opening_book(self.book)
+            player.receive_cards(self.hand)
+
+            deadline = time.monotonic() + 0.2
+            if asynchronous:
+                response = asyncio.run(player.take_turn_async(dict(game_state), deadline=deadline))
+            else:
+                response = player.take_turn(dict(game_state), deadline=deadline)
+
+            self.assertEqual(response['move'], 'Lounge')
+            self.assertEqual(response['suggestion']['cards'] & {'Lounge', 'Scarlet'}, {'Lounge', 'Scarlet'})
+
+    def test_book_is_built_once_by_self_play(self):
+        """
+        Tests that a book built by self-play has openings for the seated suspects only, with the share of games won,
+        and that it is read back from the cache without being built again.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            cache = TableCache(directory)
+
+            book = OpeningBook.from_cache(cache, players=(3,), games=200, min_games=5)
+
+            # only the first three suspects of the starting positions are seated in a game of 3
+            self.assertTrue((book.openings[:3, :, 0] >= 0).any())
+            self.assertFalse((book.openings[3:] >= 0).any())
+            self.assertFalse((book.openings[:, :, 1:] >= 0).any())
+
+            values = book.values[book.openings >= 0]
+            self.assertTrue(((values >= 0) & (values <= 1)).all())
+
+            # the book is the same as one built directly
+            np.testing.assert_array_equal(book.openings, build_tables(players=(3,), games=200,
+                                                                      min_games=5)['openings'])
+
+            def build():
+                raise AssertionError('the book was built again')
+
+            again = OpeningBook(cache.get('opening', {'spec_hash': book._board.spec_hash, 'players': [3],
+                                                      'games': 200, 'seed': 0, 'max_turns': 500, 'min_games': 5},
+                                          build))
+            np.testing.assert_array_equal(again.openings, book.openings)
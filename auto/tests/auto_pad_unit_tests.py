@@ -1,10 +1,20 @@
 import unittest
 import logging
 import sys
+import gc
+import os
+import random
+import subprocess
+import tracemalloc
 
 import numpy as np
 
+import auto
+from auto.accusation import envelope_probabilities
 from auto.automaton import Player
+from auto.pad import Pad
+from auto.padstack import PadStack
+from auto.playermatrix import PlayerMatrix
 
 
 class AutoPadUnitTests(unittest.TestCase):
@@ -40,6 +50,32 @@ class AutoPadUnitTests(unittest.TestCase):
         expected_list_of_keys = ['p01', 'p02', 'p03', 'p04']
         self.assertEqual(sorted(self.player._pad.players_list), expected_list_of_keys)
 
+    def test_player_tables_are_created_on_first_write(self):
+        """
+        Tests that a pad only creates the tables of players that something has been written for.
+        """
+        pad = self.player._pad
+
+        def created_tables():
+            return [player for player in pad.players_list if pad.player_pad[pad.seat(player)] is not None]
+
+        # only this player's dealt cards have been marked
+        self.assertEqual(created_tables(), ['p04'])
+
+        # reading an untouched table doesn't create it
+        self.assertFalse(pad.has_card('p02', 'Plum'))
+        self.assertEqual(pad.c2_entries('p02', 'Plum'), frozenset())
+        self.assertEqual(len(pad.unknown_cards()), 17)
+        pad.clear_c2('Plum')
+        self.assertEqual(created_tables(), ['p04'])
+
+        # writing to a table creates it
+        self.player.update({'answer': {'from_player': 'p02', 'has_card': True}, 'cards': {'Plum', 'Hall', 'Rope'}})
+        self.assertEqual(created_tables(), ['p02', 'p04'])
+        self.assertEqual(pad.c2_entries('p02', 'Plum'), {1})
+
+        self.assertRaises(KeyError, pad.get_player_table, 'p05')
+
     def test_p01_answers_p04_has_one_card_suggested(self):
         # scenario: p04 asks p01 if he/she/it has a card. p01 responds that he/she/it
         # has one of the cards suggested. As a result, p04 marks p01's sub-table c1 Plum
@@ -152,4 +188,186 @@ class AutoPadUnitTests(unittest.TestCase):
         self.player.update(game_state)
 
         for card in cards:
-            self.assertTrue(2 in p03['c2'][card])
\ No newline at end of file
+            self.assertTrue(2 in p03['c2'][card])
+
+    def test_update_many_clears_c2_for_cards_confirmed_in_batch(self):
+        """
+        Tests that c2 cells are cleared for a card confirmed in a batch, including c2 cells marked later in the batch.
+        """
+        game_states = [{'answer': {'has_card': True, 'from_player': 'p02'}, 'cards': {'White', 'Kitchen', 'Revolver'}},
+                       {'move_made': True, 'answer': {'card': 'White', 'from_player': 'p01'}},
+                       {'answer': {'has_card': True, 'from_player': 'p03'}, 'cards': {'White', 'Hall', 'Pipe'}}]
+
+        responses = self.player.update_many(game_states)
+
+        self.assertEqual(responses, [{'acknowledged': True}, {'turn_complete': True}, {'acknowledged': True}])
+        self.assertEqual(self.player._pad.get_player_table('p01').c1.White, 1)
+
+        for player in self.player._pad.players_list:
+            self.assertFalse(self.player._pad.get_player_table(player).c2.White)
+
+        # cards not confirmed keep their c2 cells
+        self.assertTrue(1 in self.player._pad.get_player_table('p02').c2.Kitchen)
+        self.assertTrue(1 in self.player._pad.get_player_table('p03').c2.Pipe)
+
+    def test_pad_for_more_than_nine_players_with_an_extended_deck(self):
+        """
+        Tests that a pad tracks more than 9 players, players with any ids and a deck with extra cards.
+        """
+        pad = Pad(12)
+        self.assertEqual(pad.players_list[8:], ['p09', 'p10', 'p11', 'p12'])
+        self.assertEqual(pad.seat('p12'), 11)
+
+        extra_cards = ['Poison', 'Axe', 'Garage', 'Cellar']
+        player_ids = ['alice', 'bot-7', 'guest_3']
+        pad = Pad(3, player_ids, PlayerMatrix.cards + extra_cards)
+
+        self.assertEqual(len(pad.cards), 25)
+
+        pad.mark_card('bot-7', 'Poison')
+        pad.mark_has_card('guest_3', ['Axe', 'Garage', 'Plum'])
+
+        self.assertTrue(pad.has_card('bot-7', 'Poison'))
+        self.assertEqual(pad.get_player_table('bot-7').shape[0], 25)
+        self.assertEqual(pad.c2_entries('guest_3', 'Garage'), {1})
+        self.assertEqual(len(pad.unknown_cards()), 24)
+
+        self.assertRaises(ValueError, Pad, 4, player_ids)
+
+    def test_card_ids_are_the_same_in_every_process(self):
+        """
+        Tests that the card ids don't depend on the hash seed of the process, since they index arrays shared between
+        processes.
+        """
+        script = 'from auto.pad import Pad; print(Pad(3).cards)'
+        outputs = {subprocess.run([sys.executable, '-c', script], env=dict(os.environ, PYTHONHASHSEED=str(seed)),
+                                  stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout
+                   for seed in range(3)}
+
+        self.assertEqual(outputs, {str(sorted(PlayerMatrix.cards)) + '\n'})
+
+    def test_last_possible_card_of_a_has_card_answer_is_promoted_to_c1(self):
+        """
+        Tests that once the other cards of an undirected answer are marked in c1 for other players, the answering
+        player is marked in c1 for the last card, and that promoted cards can force more cards in turn.
+        """
+        self.player.update({'answer': {'has_card': True, 'from_player': 'p02'},
+                            'cards': {'White', 'Kitchen', 'Revolver'}})
+        self.player.update({'answer': {'has_card': True, 'from_player': 'p03'}, 'cards': {'Plum', 'Revolver', 'Hall'}})
+
+        # White goes to p01. p02 still holds Kitchen or Revolver
+        self.player.update({'move_made': True, 'answer': {'from_player': 'p01', 'card': 'White'}})
+        self.assertFalse(self.player._pad.has_card('p02', 'Kitchen') or self.player._pad.has_card('p02', 'Revolver'))
+
+        # Kitchen goes to p01, so p02 holds Revolver. p04 holds Hall, so p03 then holds Plum
+        self.player.update({'move_made': True, 'answer': {'from_player': 'p01', 'card': 'Kitchen'}})
+
+        self.assertTrue(self.player._pad.has_card('p02', 'Revolver'))
+        self.assertTrue(self.player._pad.has_card('p03', 'Plum'))
+
+        # an answer with a single possible card is promoted right away, on a stacked pad as well
+        stacked = PadStack.from_pads([self.player._pad]).pad(0)
+        stacked.mark_has_card('p01', ['Revolver', 'Plum', 'Rope'])
+
+        self.assertTrue(stacked.has_card('p01', 'Rope'))
+
+    def test_answers_with_no_card_in_common_are_separate_groups(self):
+        """
+        Tests that two undirected answers of a player with no card in common share a c2 entry but stay two groups,
+        on a pad and on a stacked pad, and that the envelope is estimated against each of them.
+        """
+        categories = [{'s1', 's2', 's3'}, {'w1', 'w2', 'w3'}, {'r1', 'r2', 'r3'}]
+        pad = Pad(3, cards=sorted(set().union(*categories)))
+
+        pad.mark_has_card('p02', ['s1', 'w1', 'r1'])
+        pad.mark_has_card('p02', ['s2', 'w2', 'r2'])
+        groups = [frozenset({'s1', 'w1', 'r1'}), frozenset({'s2', 'w2', 'r2'})]
+
+        self.assertEqual(pad.c2_entries('p02', 's1'), pad.c2_entries('p02', 's2'))
+        self.assertEqual(pad.c2_groups('p02'), groups)
+        self.assertEqual(PadStack.from_pads([pad]).pad(0).c2_groups('p02'), groups)
+
+        # p02 holds a card of each answer, so neither answer can be the envelope
+        probabilities = envelope_probabilities(pad, 'p01', categories, time_limit=1, rng=random.Random(1))
+        self.assertNotIn(groups[0], probabilities)
+        self.assertNotIn(groups[1], probabilities)
+
+    def test_suggestion_counts_carry_over_to_a_stacked_pad(self):
+        """
+        Tests that the suggestions noted on a pad are copied into a stack and counted there afterwards.
+        """
+        pad = Pad(3)
+        pad.note_suggestion('p02', ['Plum', 'Hall', 'Rope'])
+        pad.note_suggestion('p02', ['Plum', 'Lounge', 'Rope'])
+
+        stacked = PadStack.from_pads([pad]).pad(0)
+        stacked.note_suggestion('p02', ['Plum'])
+
+        self.assertEqual(stacked.suggestion_count('p02', 'Plum'), 3)
+        self.assertEqual(stacked.suggestion_count('p03', 'Plum'), 0)
+        self.assertEqual(stacked.envelope_weights('p01')['Plum'], 2.0)
+        self.assertEqual(stacked.envelope_weights('p02')['Plum'], 1.0)
+
+    def test_answers_are_marked_without_keeping_memory(self):
+        """
+        Tests that once the player tables are created, handling card and no_match answers keeps no memory allocated
+        by the auto package and that the short-lived objects of each update are freed before the next, and that a
+        repeated has_card answer only keeps its new c2 entry.
+
+        The interpreter keeps some freed objects for reuse, so a few hundred bytes can stay allocated at the end of
+        any run of updates. What is checked is that what stays allocated doesn't grow with the number of updates.
+        """
+        game_states = [{'move_made': True, 'answer': {'from_player': 'p03', 'card': 'Knife'}},
+                       {'move_made': True, 'answer': 'no_match'},
+                       {'answer': 'no_match', 'cards': {'Scarlet', 'Kitchen', 'Rope'}},
+                       {'answer': {'has_card': True, 'from_player': 'p02'}, 'cards': {'Scarlet', 'Kitchen', 'Rope'}}]
+        updates = 1000
+
+        # the modules of the package, leaving out these tests
+        filters = [tracemalloc.Filter(True, os.path.join(os.path.dirname(auto.__file__), '*')),
+                   tracemalloc.Filter(False, os.path.join(os.path.dirname(__file__), '*'))]
+        growth = []
+        peaks = []
+
+        tracemalloc.start()
+        try:
+            # the first answers create the player tables
+            for game_state in game_states:
+                self.player.update(game_state)
+
+            self.assertEqual(self.player.update(game_states[1]), {'turn_complete': True})
+
+            for game_state in game_states:
+                gc.collect()
+                before = tracemalloc.take_snapshot().filter_traces(filters)
+
+                tracemalloc.reset_peak()
+                start = tracemalloc.get_traced_memory()[0]
+
+                for _ in range(updates):
+                    self.player.update(game_state)
+
+                peaks.append(tracemalloc.get_traced_memory()[1] - start)
+
+                gc.collect()
+                after = tracemalloc.take_snapshot().filter_traces(filters)
+
+                growth.append({os.path.basename(stat.traceback[0].filename): stat.size_diff / updates
+                               for stat in after.compare_to(before, 'filename') if stat.size_diff})
+        finally:
+            tracemalloc.stop()
+
+        # an update still makes short-lived objects, such as its response. They are freed before the next update,
+        # so the most memory in use over all of the updates stays that of a few updates
+        for peak in peaks[:3]:
+            self.assertLess(peak, 16 * 1024, peaks)
+
+        # the smallest object takes 16 bytes, so less than 8 bytes for each update is no object kept for any of them
+        for file_growth in growth[:3]:
+            self.assertLess(sum(file_growth.values()), 8, growth)
+
+        # the c2 cells grow by the entries of the repeated answers, and the answer is watched only once
+        self.assertGreater(growth[3]['pad.py'], 16)
+        self.assertLess(sum(size for file, size in growth[3].items() if file != 'pad.py'), 8, growth)
+        self.assertEqual(len(self.player._pad.c2_entries('p02', 'Kitchen')), updates + 1)
+        self.assertEqual(len(self.player._pad.c2_groups('p02')), 1)
@@ -0,0 +1,160 @@
+import unittest
+import logging
+import sys
+import os
+import tempfile
+
+from auto.automaton import Player
+from auto.pad import Pad, REPEATED_SUGGESTION_WEIGHT
+from auto.priors import OpponentPriors, SUGGESTED, SUGGESTED_HELD
+from auto.table import Table
+
+
+class AutoPriorsUnitTests(unittest.TestCase):
+    """
+    Testing what the computer players learn about their opponents across games
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var a directory for the saved priors
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'priors.npz')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_rows_are_bounded_and_saved(self):
+        """
+        Tests that the opponent seen least recently gives up their row once the table is full, and that the priors
+        are saved and loaded, keeping the most recently seen opponents when loaded into fewer rows.
+        """
+        priors = OpponentPriors(capacity=2)
+
+        # each opponent suggests Plum, whose holder isn't known, a weapon they hold and Hall, which 'me' holds
+        for opponents in (['alice', 'bob'], ['alice', 'carol']):
+            game = Pad(3, ['me'] + opponents)
+            game.mark_card('me', 'Hall')
+            for opponent, weapon in zip(opponents, ['Rope', 'Knife']):
+                game.mark_card(opponent, weapon)
+                game.note_suggestion(opponent, ['Plum', weapon, 'Hall'])
+            priors.note_game(game, 'me')
+
+        self.assertEqual(priors.counts.shape, (2, 2, 3))
+        self.assertEqual(list(priors._rows), ['alice', 'carol'])
+        self.assertEqual(list(priors.counts[priors._rows['alice'], SUGGESTED]), [0, 2, 2])
+        self.assertEqual(list(priors.counts[priors._rows['alice'], SUGGESTED_HELD]), [0, 2, 0])
+        self.assertEqual(list(priors.counts[priors._rows['carol'], SUGGESTED]), [0, 1, 1])
+        self.assertEqual(priors.trust('bob'), [1.0, 1.0, 1.0])
+
+        # a missing file starts empty priors
+        self.assertEqual(len(OpponentPriors.load(self.path)._rows), 0)
+
+        priors.save(self.path)
+        self.assertEqual(os.listdir(self.directory.name), ['priors.npz'])
+
+        loaded = OpponentPriors.load(self.path)
+        self.assertEqual(loaded.trust('alice'), priors.trust('alice'))
+        self.assertEqual(loaded.trust('carol'), priors.trust('carol'))
+
+        smaller = OpponentPriors.load(self.path, capacity=1)
+        self.assertEqual(list(smaller._rows), ['carol'])
+
+    def test_opponents_suggesting_their_own_cards_are_trusted_less(self):
+        """
+        Tests that a player who kept suggesting their own weapons in past games has their repeated weapon
+        suggestions count for less in the envelope weights, and that their other suggestions count as before. Cards
+        whose holder isn't known by the end of a game aren't counted.
+        """
+        priors = OpponentPriors()
+
+        for _ in range(5):
+            game = Pad(3, ['me', 'bluffer', 'honest'])
+            game.mark_card('bluffer', 'Rope')
+            game.mark_card('honest', 'Knife')
+            game.mark_card('me', 'Pipe')
+            for suggester, weapons in (('bluffer', ['Rope', 'Wrench']), ('honest', ['Pipe', 'Wrench'])):
+                game.note_suggestion(suggester, weapons)
+            priors.note_game(game, 'me')
+
+        self.assertEqual(list(priors.counts[priors._rows['bluffer'], SUGGESTED]), [0, 5, 0])
+        self.assertEqual(list(priors.counts[priors._rows['bluffer'], SUGGESTED_HELD]), [0, 5, 0])
+        self.assertEqual(list(priors.counts[priors._rows['honest'], SUGGESTED]), [0, 5, 0])
+        self.assertEqual(list(priors.counts[priors._rows['honest'], SUGGESTED_HELD]), [0, 0, 0])
+
+        trust = priors.trust('bluffer')
+        self.assertEqual(trust[0], 1.0)
+        self.assertLess(trust[1], 1.0)
+        self.assertGreater(priors.trust('honest')[1], 1.0)
+
+        pad = Pad(3, ['me', 'bluffer', 'honest'], priors=priors)
+        plain = Pad(3, ['me', 'bluffer', 'honest'])
+        for each in (pad, plain):
+            for _ in range(3):
+                each.note_suggestion('bluffer', ['Wrench', 'Plum'])
+                each.note_suggestion('honest', ['Candlestick'])
+
+        weights = pad.envelope_weights('me')
+        plain_weights = plain.envelope_weights('me')
+
+        self.assertEqual(plain_weights['Wrench'], 1.0 + 2 * REPEATED_SUGGESTION_WEIGHT)
+        self.assertLess(weights['Wrench'], plain_weights['Wrench'])
+        self.assertEqual(weights['Plum'], plain_weights['Plum'])
+        self.assertGreater(weights['Candlestick'], plain_weights['Candlestick'])
+
+    def test_priors_carry_over_to_a_stacked_table(self):
+        """
+        Tests that stacking the pads of a table keeps the trust each pad was given by its priors.
+        """
+        players = ['me', 'bluffer', 'other']
+        priors = OpponentPriors()
+
+        for _ in range(5):
+            game = Pad(3, players)
+            game.mark_card('bluffer', 'Rope')
+            game.note_suggestion('bluffer', ['Rope'])
+            priors.note_game(game, 'me')
+
+        player = Player('me', ['Plum'], 3, player_ids=players, opponent_priors=priors)
+        for _ in range(3):
+            player.update({'suggestion': {'from_player': 'bluffer', 'cards': {'White', 'Knife', 'Kitchen'}}})
+
+        weights = player._pad.envelope_weights('me')
+        self.assertLess(weights['Knife'], 1.0 + 2 * REPEATED_SUGGESTION_WEIGHT)
+
+        Table([player], stacked=True)
+
+        self.assertEqual(player._pad.envelope_weights('me'), weights)
+
+    def test_player_learns_across_games(self):
+        """
+        Tests that a player adds what it sees in a game to the priors when the game is over, and that the next
+        player given the priors is biased by them.
+        """
+        players = ['me', 'bluffer', 'other']
+        priors = OpponentPriors()
+
+        player = Player('me', ['Plum'], 3, player_ids=players, opponent_priors=priors)
+        player.receive_cards(['Wrench', 'Green', 'Study', 'Hall', 'Rope', 'Lounge'])
+
+        for _ in range(3):
+            player.update({'suggestion': {'from_player': 'bluffer', 'cards': {'White', 'Knife', 'Kitchen'}}})
+        player.update({'move_made': True, 'answer': {'from_player': 'bluffer', 'card': 'Knife'}})
+
+        self.assertIsNone(player.update({'game_over': True, 'winning_player': 'other'}))
+        self.assertEqual(list(priors.counts[priors._rows['bluffer'], SUGGESTED]), [0, 3, 0])
+        self.assertEqual(list(priors.counts[priors._rows['bluffer'], SUGGESTED_HELD]), [0, 3, 0])
+
+        priors.save(self.path)
+
+        next_player = Player('me', ['Plum'], 3, player_ids=players, opponent_priors=OpponentPriors.load(self.path))
+        for _ in range(3):
+            next_player.update({'suggestion': {'from_player': 'bluffer', 'cards': {'White', 'Pipe', 'Kitchen'}}})
+
+        weights = next_player._pad.envelope_weights('me')
+        self.assertLess(weights['Pipe'], weights['White'])
@@ -0,0 +1,70 @@
+import unittest
+import logging
+import sys
+import tempfile
+
+import numpy as np
+
+from auto.results import ResultStore, NONE
+
+
+class AutoResultsUnitTests(unittest.TestCase):
+    """
+    Testing the memory-mapped store of simulation results
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var a temporary directory for the store
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_results_are_mapped_back_as_structured_arrays(self):
+        """
+        Tests that records appended through a small buffer are all written and mapped back with their columns, and
+        that a second store on the same directory appends to the same tables.
+        """
+        with ResultStore(self.directory.name, buffer_rows=2) as store:
+            store.append_game(7, 0, 'Plum', True, 12, 10, 0.5)
+            store.append_game(7, 1, 'Green', False, 11, 11, 0.25)
+            store.append_game(8, 0, 'Plum', False, 9, 9, 0.125)
+            store.append_turn(7, 0, 1, 'Hallway_03', None, 0.001)
+            store.append_turn(7, 0, 2, 'Library', ['Rope', 'Library', 'Green'], 0.003)
+
+        store = ResultStore(self.directory.name)
+        store.append_game(9, 2, 'White', True, 5, 5, 0.0)
+        store.flush()
+
+        games = store.games()
+        self.assertIsInstance(games, np.memmap)
+        self.assertEqual(len(games), 4)
+        self.assertEqual(games['seed'].tolist(), [7, 7, 8, 9])
+        self.assertEqual(games['turns'].sum(), 37)
+
+        turns = store.turns()
+        self.assertEqual(turns['move'][0], store.locations.index('Hallway_03'))
+        self.assertEqual(turns['suggestion'][0].tolist(), [NONE] * 3)
+        self.assertEqual({store.cards[code] for code in turns['suggestion'][1]}, {'Rope', 'Library', 'Green'})
+
+        self.assertEqual(store.win_rate_by_suspect(), {'Plum': 0.5, 'Green': 0.0, 'White': 1.0})
+        self.assertAlmostEqual(store.decision_time_percentiles((50,))[50], 0.002)
+
+    def test_store_rejects_a_different_record_layout(self):
+        """
+        Tests that opening a store written with a different record layout fails rather than misreading it.
+        """
+        ResultStore(self.directory.name)
+
+        with open(self.directory.name + '/schema.json') as schema_file:
+            schema = schema_file.read()
+        with open(self.directory.name + '/schema.json', 'w') as schema_file:
+            schema_file.write(schema.replace('"won"', '"winner"'))
+
+        self.assertRaises(ValueError, ResultStore, self.directory.name)
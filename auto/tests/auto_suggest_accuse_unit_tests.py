@@ -1,8 +1,31 @@
 import unittest
 import logging
 import sys
+import random
+import time
+from unittest import mock
 
 from auto.automaton import Player
+from auto.accusation import AccusationPolicy, envelope_probabilities
+
+
+class _SimulatedClock:
+    """
+    A clock that moves step seconds each time it is read, and stall_time seconds more on the stall-th reading.
+    """
+
+    def __init__(self, step, stall=None, stall_time=0.0):
+        self.now = 100.0
+        self.step = step
+        self.stall = stall
+        self.stall_time = stall_time
+        self.readings = 0
+
+    def __call__(self):
+        self.readings += 1
+        self.now += self.step + (self.stall_time if self.readings == self.stall else 0.0)
+
+        return self.now
 
 
 class AutoSuggestAccuseUnitTests(unittest.TestCase):
@@ -274,6 +297,157 @@ class AutoSuggestAccuseUnitTests(unittest.TestCase):
 
         self.assertEqual(expected_response, actual_response)
 
+    def test_update_many_accuses_once_batch_is_applied(self):
+        """
+        Tests that a batch of game states acknowledges each game state and that the accusation is returned with
+        the last directed answer once the whole batch has been applied.
+        """
+        # same pre-condition as test_accuse except that p03's cards and Kitchen arrive in one batch
+        cards = self.player._cards
+        for card in ['Plum', 'Rope', 'Dining', 'Kitchen', 'Study', 'Green', 'Wrench', 'Hall']:
+            cards.remove(card)
+
+        for card in cards[0:5]:
+            self.player._pad.get_player_table('p01')['c1'][card] = 1
+        for card in cards[5:10]:
+            self.player._pad.get_player_table('p02')['c1'][card] = 1
+
+        game_states = [{'move_made': True, 'answer': {'from_player': 'p03', 'card': card}} for card in cards[10:13]]
+        game_states.append({'answer': {'from_player': 'p01', 'has_card': True}, 'cards': {'Plum', 'Rope', 'Hall'}})
+        game_states.append({'move_made': True, 'answer': {'from_player': 'p03', 'card': 'Kitchen'}})
+
+        responses = self.player.update_many(game_states)
+
+        expected_responses = [{'turn_complete': True}, {'turn_complete': True}, {'turn_complete': True},
+                              {'acknowledged': True},
+                              {'accusation': {'from_player': 'p04', 'cards': {'Plum', 'Rope', 'Dining'}},
+                               'turn_complete': True}]
+
+        self.assertEqual(expected_responses, responses)
+
+    def test_accuse_with_policy_once_top_hypothesis_passes_threshold(self):
+        """
+        Tests that with an accusation policy, the player accuses while four cards are still unknown because the c2
+        marks show that another player holds one of them, and that the policy isn't run for an undirected answer.
+        """
+        # Plum, Rope, Dining and Kitchen are unknown. Kitchen or Dining is held by another player
+        cards = self.player._cards
+        for card in ['Plum', 'Rope', 'Dining', 'Kitchen', 'Study', 'Green', 'Wrench', 'Hall']:
+            cards.remove(card)
+
+        for card in cards[0:5]:
+            self.player._pad.get_player_table('p01')['c1'][card] = 1
+        for card in cards[5:10]:
+            self.player._pad.get_player_table('p02')['c1'][card] = 1
+        for card in cards[10:12]:
+            self.player._pad.get_player_table('p03')['c1'][card] = 1
+
+        # the last answer: p03 has one of Kitchen, Dining, Hall. p04 holds Hall, so p03 holds Kitchen or Dining
+        game_state = {'move_made': True, 'answer': {'from_player': 'p03', 'card': cards[12]}}
+        self.player.update({'answer': {'from_player': 'p03', 'has_card': True}, 'cards': {'Kitchen', 'Dining', 'Hall'}})
+
+        # without a policy, four unknown cards isn't enough to accuse
+        self.assertEqual(self.player.update(game_state), {'turn_complete': True})
+
+        # either room is as likely to be in the envelope
+        categories = [self.player._get_suspects(), self.player._get_weapons(), self.player._get_rooms()]
+        probabilities = envelope_probabilities(self.player._pad, 'p04', categories, time_limit=1)
+        hypotheses = [frozenset({'Plum', 'Rope', 'Dining'}), frozenset({'Plum', 'Rope', 'Kitchen'})]
+        self.assertEqual(set(probabilities), set(hypotheses))
+        self.assertAlmostEqual(probabilities[hypotheses[0]], 0.5, delta=0.15)
+
+        self.player.set_accusation_policy(AccusationPolicy(threshold=0.4, time_limit=1, seed=1))
+
+        # an undirected answer is only acknowledged, so the pad isn't analyzed for it
+        with mock.patch.object(self.player._accusation_policy, 'decide') as decide:
+            self.assertEqual(self.player.update({'answer': {'from_player': 'p01', 'has_card': True},
+                                                 'cards': {'Scarlet', 'Knife', 'Lounge'}}), {'acknowledged': True})
+        decide.assert_not_called()
+
+        response = self.player.update(game_state)
+        self.assertIn(frozenset(response['accusation']['cards']), hypotheses)
+
+    def test_accusation_policy_respects_time_limit_and_turn_budget(self):
+        """
+        Tests that the probability estimate stops at the time limit and that the turn budget forces an accusation.
+        """
+        categories = [self.player._get_suspects(), self.player._get_weapons(), self.player._get_rooms()]
+
+        # nothing but p04's cards is known. A zero time limit takes no samples, so every hypothesis is equally likely
+        probabilities = envelope_probabilities(self.player._pad, 'p04', categories, time_limit=0)
+        self.assertEqual(len(probabilities), 5 * 5 * 7)
+        self.assertAlmostEqual(sum(probabilities.values()), 1.0)
+
+        policy = AccusationPolicy(threshold=0.9, time_limit=0.001, seed=1)
+        self.assertIsNone(policy.decide(self.player._pad, 'p04', categories))
+
+        policy = AccusationPolicy(threshold=0.9, turn_budget=10, time_limit=0.001, seed=1)
+        self.assertEqual(len(policy.decide(self.player._pad, 'p04', categories)), 3)
+
+    def test_take_turn_refines_suggestion_until_deadline(self):
+        """
+        Tests that in anytime mode the turn is returned before the deadline with the unknown suspect most likely to
+        be in the envelope, that a sample stalled by a busy CPU stops the sampling in time, and that a deadline
+        already passed returns the usual turn right away. The clock is simulated so that the test doesn't depend on
+        the load of the machine: every reading of it takes step seconds, and one reading stalls.
+        """
+        # Plum and Scarlet are the unknown suspects. p02 holds Scarlet or Kitchen, so Plum is more likely hidden
+        for card, player in [('Mustard', 'p01'), ('White', 'p02'), ('Peacock', 'p03')]:
+            self.player._pad.mark_card(player, card)
+        self.player.update({'answer': {'from_player': 'p02', 'has_card': True}, 'cards': {'Scarlet', 'Kitchen', 'Study'}})
+
+        game_state = {'positions': {'p01': 'Kitchen', 'p02': 'Conservatory', 'p03': 'Hallway_11', 'p04': 'Hallway_01'}}
+
+        for stall in (None, 10, 40, 100):
+            clock = _SimulatedClock(step=0.0001, stall=stall, stall_time=0.02)
+
+            with mock.patch('time.monotonic', clock), mock.patch('time.perf_counter', clock):
+                self.player._prior_moves = {'Study', 'Hallway_01'}
+                deadline = clock.now + 0.05
+                response = self.player.take_turn(game_state, deadline=deadline)
+
+            self.assertLess(clock.now, deadline)
+            self.assertEqual(response['move'], 'Hall')
+            self.assertEqual(len(response['suggestion']['cards']), 3)
+            if stall is None:
+                self.assertIn('Plum', response['suggestion']['cards'])
+
+        start = time.monotonic()
+        response = self.player.take_turn(game_state, deadline=start - 1)
+        self.assertLess(time.monotonic() - start, 0.05)
+        self.assertEqual(len(response['suggestion']['cards']), 3)
+
+    def test_repeated_suggestions_of_other_players_weigh_envelope_cards(self):
+        """
+        Tests that the suggestions of the other players are counted on the pad and that cards another player keeps
+        suggesting are favored in suggestions and in the envelope probabilities.
+        """
+        for _ in range(3):
+            self.player.update({'suggestion': {'from_player': 'p02', 'cards': {'Plum', 'Kitchen', 'Rope'}}})
+
+        # this player's own suggestions aren't part of the model
+        self.player.update({'suggestion': {'from_player': 'p04', 'cards': {'Plum', 'Kitchen', 'Rope'}}})
+
+        self.assertEqual(self.player._pad.suggestion_count('p02', 'Rope'), 3)
+        self.assertEqual(self.player._pad.suggestion_count('p04', 'Rope'), 0)
+
+        weights = self.player._pad.envelope_weights('p04')
+        self.assertEqual(weights['Rope'], 2.0)
+        self.assertEqual(weights['Knife'], 1.0)
+
+        # with no samples, the probabilities follow the weights
+        categories = [self.player._get_suspects(), self.player._get_weapons(), self.player._get_rooms()]
+        probabilities = envelope_probabilities(self.player._pad, 'p04', categories, 0, weights=weights)
+        self.assertAlmostEqual(probabilities[frozenset({'Plum', 'Rope', 'Kitchen'})] /
+                               probabilities[frozenset({'Scarlet', 'Knife', 'Lounge'})], 8.0)
+
+        # the other players' repeated suggestions tip the weapon suggested by this player towards the Rope
+        self.player._pad.note_suggestion('p03', ['Rope'] * 60)
+        rng = random.Random(1)
+        suggestions = [self.player._make_suggestion({'move': 'Hall'}, False, rng)['suggestion']['cards']
+                       for _ in range(20)]
+        self.assertGreater(sum('Rope' in cards for cards in suggestions), 10)
+
     # region helper classes
     def _subdictionary_from_dictionary(self, subset_dictionary, dictionary):
         """
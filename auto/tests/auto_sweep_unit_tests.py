@@ -0,0 +1,67 @@
+import unittest
+import logging
+import sys
+import os
+import json
+import tempfile
+
+from auto.sweep import sweep, _play_batch
+
+
+class AutoSweepUnitTests(unittest.TestCase):
+    """
+    Testing the sweep of player configurations by self-play
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var a results file in a temporary directory
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'sweep.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_worse_configurations_are_stopped_early(self):
+        """
+        Tests that a configuration accusing on its first answer is stopped before playing every game, that the others
+        play every game, and that each batch is written to the results file.
+        """
+        configurations = [{'accusation': None}, {'accusation': {'threshold': 0.0, 'max_samples': 20}}]
+
+        results = sweep(configurations, self.path, max_games=60, batch_games=10, processes=2)
+
+        self.assertEqual(results[0]['games'], 60)
+        self.assertFalse(results[0]['stopped'])
+        self.assertTrue(results[1]['stopped'])
+        self.assertLess(results[1]['games'], 60)
+        self.assertLess(results[1]['win_rate'], results[0]['win_rate'])
+
+        with open(self.path) as results_file:
+            records = [json.loads(line) for line in results_file]
+
+        batches = [record for record in records if record['event'] == 'batch' and record['index'] == 0]
+        self.assertEqual(sorted(batch['seeds'][0] for batch in batches), list(range(0, 60, 10)))
+        self.assertEqual(sum(batch['wins'] for batch in batches), results[0]['wins'])
+
+        self.assertEqual([(record['index'], record['best']) for record in records if record['event'] == 'stopped'],
+                         [(1, 0)])
+        self.assertEqual([record['index'] for record in records if record['event'] == 'result'], [0, 1])
+
+        with self.assertRaises(ValueError):
+            sweep([{'move_weights': [1, 2]}], self.path)
+
+    def test_batches_are_repeatable(self):
+        """
+        Tests that the games of a batch are the same whenever they are played, so configurations are compared on
+        the same games.
+        """
+        configuration = {'accusation': {'threshold': 0.6, 'max_samples': 50, 'time_limit': 1}}
+
+        self.assertEqual(_play_batch(configuration, 3, list(range(5)), 500),
+                         _play_batch(configuration, 3, list(range(5)), 500))
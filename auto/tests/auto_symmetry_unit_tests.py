@@ -0,0 +1,94 @@
+import unittest
+import logging
+import sys
+import itertools
+from unittest import mock
+
+import numpy as np
+
+from auto.kernel import deal
+from auto.symmetry import DealSymmetry, deal_classes, play_classes
+
+
+class AutoSymmetryUnitTests(unittest.TestCase):
+    """
+    Testing the classes of deals that play the same
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var the symmetry of a four player game and a deal to relabel
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        self.number_of_players = 4
+        self.symmetry = DealSymmetry(self.number_of_players)
+        self.envelope, self.hands = deal(11, self.number_of_players)
+
+    def _relabel(self, relabeling):
+        envelope = [relabeling.get(card, card) for card in self.envelope]
+        hands = [sorted(relabeling.get(card, card) for card in hand) for hand in self.hands]
+
+        return envelope, hands
+
+    def test_relabeled_deals_are_one_class_of_the_counted_size(self):
+        """
+        Tests that every relabeling of weapons and of the suspects no one plays gives a deal of the same class, that
+        the size of the class is the number of different deals found this way and that the representative of the
+        class is a deal of the class.
+        """
+        symmetry = self.symmetry
+        key = symmetry.canonical(self.envelope, self.hands)
+
+        # the Clue-Less board has no symmetry once a seat's starting position is fixed
+        self.assertEqual(len(symmetry.room_permutations), 1)
+        self.assertEqual(symmetry.unseated, ['Green', 'White'])
+
+        deals = set()
+        for weapons in itertools.permutations(symmetry.weapons):
+            for unseated in itertools.permutations(symmetry.unseated):
+                relabeling = dict(zip(symmetry.weapons, weapons))
+                relabeling.update(zip(symmetry.unseated, unseated))
+                envelope, hands = self._relabel(relabeling)
+
+                self.assertEqual(symmetry.canonical(envelope, hands), key)
+                deals.add((tuple(envelope), tuple(map(tuple, hands))))
+
+        self.assertEqual(symmetry.class_size(self.envelope, self.hands), len(deals))
+
+        representative = symmetry.representative(key)
+        self.assertIn((tuple(representative[0]), tuple(map(tuple, representative[1]))), deals)
+
+        # relabeling a seat's suspect or a room is another class
+        self.assertNotEqual(symmetry.canonical(*self._relabel({'Scarlet': 'Green', 'Green': 'Scarlet'})), key)
+        self.assertNotEqual(symmetry.canonical(*self._relabel({'Study': 'Hall', 'Hall': 'Study'})), key)
+
+    def test_each_class_is_played_once_and_weighted_by_its_games(self):
+        """
+        Tests that a batch of relabeled deals is played as one game per class, fewer games than deals, with each
+        class weighted by the number of games in it.
+        """
+        relabelings = [{}, {'Rope': 'Knife', 'Knife': 'Rope'}, {'Green': 'White', 'White': 'Green'},
+                       {'Pipe': 'Wrench', 'Wrench': 'Pipe', 'Green': 'White', 'White': 'Green'}]
+        deals = [self._relabel(relabeling) for relabeling in relabelings] + [deal(12, self.number_of_players)]
+        seeds = list(range(len(deals)))
+
+        classes = deal_classes(seeds, self.number_of_players, deals=deals)
+        self.assertEqual(sorted(len(value['seeds']) for value in classes.values()), [1, 4])
+
+        # the symmetry tables are built, or read from the cache, once for the batch
+        with mock.patch('auto.symmetry.DealSymmetry', wraps=DealSymmetry) as symmetry:
+            results = play_classes(seeds, self.number_of_players, deals)
+        self.assertEqual(symmetry.call_count, 1)
+
+        self.assertEqual(len(results['winner']), 2)
+        self.assertLess(len(results['winner']), len(deals))
+        self.assertEqual(results['weight'].sum(), len(deals))
+        self.assertTrue((results['size'] >= results['weight']).all())
+        self.assertTrue((results['turns'] > 0).all())
+
+        # a statistic of the batch is weighted by the classes
+        win_rate = np.average(results['winner'] >= 0, weights=results['weight'])
+        self.assertTrue(0.0 <= win_rate <= 1.0)
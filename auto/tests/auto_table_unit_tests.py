@@ -0,0 +1,162 @@
+import unittest
+import logging
+import sys
+import os
+import tempfile
+
+from auto import events
+from auto.automaton import Player
+from auto.accusation import AccusationPolicy
+from auto.diagnostics import SlowCallRecorder
+from auto.events import EventSink
+from auto.table import Table
+
+
+class AutoTableUnitTests(unittest.TestCase):
+    """
+    Testing the computer players co-hosted at one game table
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var a table with five computer players (p02 - p06). p01 is assumed to be a human player.
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        available_suspects = ['Mustard', 'Peacock', 'Plum', 'Green', 'Scarlet', 'White']
+
+        players = []
+        for x in range(2, 7):
+            player = Player('p0' + str(x), available_suspects, 6)
+            available_suspects.remove(player._selected_suspect)
+            players.append(player)
+
+        self.table = Table(players)
+
+    def test_broadcast_has_card_answer_marks_every_seat(self):
+        """
+        Tests that an undirected answer broadcast to the table is marked on the pad of every seat except the ones
+        excluded, the same way update marks it.
+        """
+        game_state = {'answer': {'from_player': 'p03', 'has_card': True}, 'cards': {'Mustard', 'Kitchen', 'Revolver'}}
+
+        responses = self.table.broadcast(game_state, exclude=('p02',))
+
+        self.assertEqual(responses, {'p03': {'acknowledged': True}, 'p04': {'acknowledged': True},
+                                     'p05': {'acknowledged': True}, 'p06': {'acknowledged': True}})
+
+        for player in self.table.players:
+            p03 = player._pad.get_player_table('p03')
+            for card in game_state['cards']:
+                if player.player_id == 'p02':
+                    self.assertFalse(p03['c2'][card])
+                else:
+                    self.assertEqual(p03['c2'][card], {1})
+
+        # a second answer from p03 sharing a card is marked with the next increment by the seats that heard the first
+        game_state = {'answer': {'from_player': 'p03', 'has_card': True}, 'cards': {'Plum', 'Kitchen', 'Rope'}}
+        self.table.broadcast(game_state)
+
+        for player in self.table.players:
+            expected_entry = 1 if player.player_id == 'p02' else 2
+            self.assertTrue(expected_entry in player._pad.get_player_table('p03')['c2']['Kitchen'])
+
+    def test_broadcast_has_card_answer_sends_events_and_is_recorded(self):
+        """
+        Tests that the seats of a table, stacked or not, send the event of an undirected answer to their event sink
+        and have the call recorded in diagnostic mode, as update does.
+        """
+        game_state = {'answer': {'from_player': 'p03', 'has_card': True}, 'cards': {'Mustard', 'Kitchen', 'Revolver'}}
+
+        for stacked in (False, True):
+            with tempfile.TemporaryDirectory() as directory:
+                sink = EventSink(os.path.join(directory, 'events'))
+                recorder = SlowCallRecorder(os.path.join(directory, 'slow_calls'), latency_threshold=0)
+                players = [Player(player_id, ['Mustard', 'Plum', 'Green'], 3) for player_id in ('p01', 'p02', 'p03')]
+                for player in players:
+                    player.set_event_sink(sink)
+                    player.set_diagnostics(recorder)
+
+                Table(players, stacked=stacked).broadcast(game_state, exclude=('p03',))
+
+                self.assertEqual([(record['seat'], events.KINDS[record['kind']]) for record in sink.events()],
+                                 [(0, 'has_card'), (1, 'has_card')])
+                self.assertEqual(sorted(os.listdir(os.path.join(directory, 'slow_calls'))),
+                                 ['ring.json', 'slow_call_00', 'slow_call_01'])
+
+    def test_broadcast_other_game_states_are_sent_to_each_seat(self):
+        """
+        Tests that game states other than an undirected answer are handled by each seat's update
+        """
+        responses = self.table.broadcast({'move_made': True})
+
+        self.assertEqual(sorted(responses.keys()), ['p02', 'p03', 'p04', 'p05', 'p06'])
+        for response in responses.values():
+            self.assertEqual(response, {'turn_complete': True})
+
+    def test_stacked_table_marks_pads_the_same_way_as_separate_pads(self):
+        """
+        Tests that the seats of a stacked table mark, read and clear their pads the same way as separate pads.
+        """
+        # p02 learns a card before being seated so the stack has to copy it
+        p02 = self.table.players[0]
+        p02.receive_cards(['Wrench', 'Green', 'Study'])
+
+        table = Table(self.table.players, stacked=True)
+
+        self.assertEqual(table.stack.c1.shape, (5, 6, 21))
+        self.assertTrue(p02._pad.has_card('p02', 'Wrench'))
+        self.assertEqual(p02._pad.get_player_table('p02')['c1']['Study'], 1)
+
+        game_states = [{'answer': {'from_player': 'p03', 'has_card': True}, 'cards': {'Mustard', 'Kitchen', 'Revolver'}},
+                       {'answer': {'from_player': 'p03', 'has_card': True}, 'cards': {'Plum', 'Kitchen', 'Rope'}}]
+        for game_state in game_states:
+            table.broadcast(game_state, exclude=('p03',))
+
+        for player in table.players:
+            p03 = player._pad.get_player_table('p03')
+            if player.player_id == 'p03':
+                self.assertFalse(p03['c2']['Kitchen'])
+            else:
+                self.assertEqual(p03['c2']['Kitchen'], {1, 2})
+                self.assertEqual(p03['c2']['Mustard'], {1})
+                self.assertEqual(p03['c2']['Rope'], {2})
+
+        # a directed answer to p02 marks c1 in the stack and clears c2 for the card in p02's pad only
+        p02.update({'move_made': True, 'answer': {'from_player': 'p03', 'card': 'Kitchen'}})
+
+        self.assertEqual(table.stack.c1[0, 2].sum(), 1)
+        self.assertFalse(p02._pad.get_player_table('p03')['c2']['Kitchen'])
+        self.assertEqual(table.players[2]._pad.get_player_table('p03')['c2']['Kitchen'], {1, 2})
+
+        self.assertEqual(p02._get_unknown_cards(), set(p02._cards) - {'Wrench', 'Green', 'Study', 'Kitchen'})
+        self.assertEqual(table.stack.unknown_cards_mask().sum(axis=1).tolist(), [17, 21, 21, 21, 21])
+
+    def test_accusation_policy_runs_on_a_stacked_table(self):
+        """
+        Tests that a seat of a stacked table gives the same c2 groups as its separate pad, so that an accusation
+        policy can analyze it.
+        """
+        game_states = [{'answer': {'from_player': 'p03', 'has_card': True}, 'cards': {'Mustard', 'Kitchen', 'Revolver'}},
+                       {'answer': {'from_player': 'p03', 'has_card': True}, 'cards': {'Plum', 'Kitchen', 'Rope'}}]
+        for game_state in game_states:
+            self.table.broadcast(game_state, exclude=('p03',))
+
+        p02 = self.table.players[0]
+        expected = p02._pad.c2_groups('p03')
+        self.assertEqual(len(expected), 2)
+
+        table = Table(self.table.players, stacked=True)
+
+        self.assertEqual(p02._pad.c2_groups('p03'), expected)
+        self.assertEqual(p02._pad.c2_groups('p04'), [])
+
+        # a policy accusing at any probability accuses on the first directed answer
+        p02.set_accusation_policy(AccusationPolicy(threshold=0.0, max_samples=20, seed=1))
+        response = p02.update({'move_made': True, 'answer': {'from_player': 'p04', 'card': 'Knife'}})
+
+        self.assertEqual(len(response['accusation']['cards']), 3)
+        self.assertNotIn('Knife', response['accusation']['cards'])
+        self.assertEqual(table.stack.c1[0].sum(), 1)
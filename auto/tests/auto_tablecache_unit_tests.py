@@ -0,0 +1,93 @@
+import unittest
+import logging
+import sys
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import auto.tablecache
+from auto.board import Board, CLUE_LESS
+from auto.symmetry import DealSymmetry
+from auto.tablecache import TableCache
+
+
+def _load_without_building(directory):
+    """
+    Gets the board tables in another process, failing if they would have to be built there.
+    """
+    def build():
+        raise AssertionError('the tables were built again')
+
+    return np.asarray(TableCache(directory).get('board', {'spec_hash': Board.from_spec().spec_hash}, build)
+                      ['distances']).tolist()
+
+
+class AutoTableCacheUnitTests(unittest.TestCase):
+    """
+    Testing the on-disk cache of precomputed tables
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var a temporary directory for the cache
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = TableCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_tables_are_built_once_and_mapped_read_only(self):
+        """
+        Tests that a board compiled from the cache has the same distances as one compiled without it, that the
+        tables are mapped read-only from disk, and that another process maps them without building them.
+        """
+        board = Board(cache=self.cache)
+        expected = Board()
+
+        distances = board._distances
+        self.assertIsInstance(distances, np.memmap)
+        self.assertFalse(distances.flags.writeable)
+
+        for location in ['Study', 'Hallway_01', 'Kitchen']:
+            for n in range(4):
+                self.assertEqual(board.neighborhood(location, n), expected.neighborhood(location, n))
+        self.assertEqual(board.distance('Hallway_01', 'Billiard'), expected.distance('Hallway_01', 'Billiard'))
+
+        with ProcessPoolExecutor(1) as executor:
+            self.assertEqual(executor.submit(_load_without_building, self.directory.name).result(),
+                             distances.tolist())
+
+        # the symmetry tables as well
+        symmetry = DealSymmetry(4, board, cache=self.cache)
+        self.assertEqual(symmetry.room_permutations, DealSymmetry(4, board).room_permutations)
+        self.assertEqual(len(DealSymmetry(0, board, cache=self.cache).room_permutations), 8)
+
+    def test_stale_tables_are_rebuilt(self):
+        """
+        Tests that tables are rebuilt for another board spec and for another engine version, and that the tables
+        of an older engine version are removed.
+        """
+        spec = dict(CLUE_LESS, secret_passages=[])
+        self.assertEqual(Board(spec, cache=self.cache).distance('Study', 'Kitchen'), 8)
+        self.assertEqual(Board(cache=self.cache).distance('Study', 'Kitchen'), 1)
+        self.assertEqual(len(os.listdir(os.path.join(self.directory.name, 'board'))), 2)
+
+        builds = []
+        version = auto.tablecache.ENGINE_VERSION
+        auto.tablecache.ENGINE_VERSION = version + 1
+        try:
+            tables = self.cache.get('board', {'spec_hash': 'x'}, lambda: builds.append(1) or {'t': np.arange(3)})
+            self.cache.get('board', {'spec_hash': 'x'}, lambda: builds.append(1) or {'t': np.arange(3)})
+        finally:
+            auto.tablecache.ENGINE_VERSION = version
+
+        self.assertEqual(builds, [1])
+        self.assertEqual(tables['t'].tolist(), [0, 1, 2])
+        self.assertEqual(len(os.listdir(os.path.join(self.directory.name, 'board'))), 1)
@@ -0,0 +1,163 @@
+import unittest
+import logging
+import sys
+import os
+import json
+import gzip
+import tempfile
+
+from auto.automaton import Player
+from auto.playermatrix import PlayerMatrix
+from auto.traces import GameReplay, read_trace, analyze_trace, analyze_traces
+
+
+class AutoTracesUnitTests(unittest.TestCase):
+    """
+    Testing the streaming replay of game traces
+    """
+
+    def setUp(self):
+        """
+        unittest class setup
+
+        :var a temporary directory for trace files
+        :var the cards dealt to p01, p02 and p03 (a human player, not traced) and the envelope
+        """
+        logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+
+        self.directory = tempfile.TemporaryDirectory()
+
+        cards = sorted(PlayerMatrix.cards)
+        self.envelope = ['Plum', 'Knife', 'Kitchen']
+        for card in self.envelope:
+            cards.remove(card)
+
+        self.hands = {'p01': cards[0:6], 'p02': cards[6:12], 'p03': cards[12:18]}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write_trace(self, name, records, extra_lines=()):
+        path = os.path.join(self.directory.name, name)
+        opener = gzip.open if name.endswith('.gz') else open
+
+        with opener(path, 'wt') as trace_file:
+            for record in records:
+                trace_file.write(json.dumps(record) + '\n')
+            for line in extra_lines:
+                trace_file.write(line + '\n')
+
+        return path
+
+    def _game(self, game):
+        """
+        A game where p01 is shown every card p03 holds and then every card p02 holds, one card a turn.
+        """
+        records = [{'game': game, 'call': 'start', 'players': ['p01', 'p02', 'p03']}]
+        records += [{'game': game, 'call': 'receive_cards', 'player_id': player_id, 'cards': self.hands[player_id]}
+                    for player_id in ('p01', 'p02')]
+
+        for holder in ('p03', 'p02'):
+            for card in self.hands[holder]:
+                records.append({'game': game, 'call': 'take_turn', 'player_id': 'p01', 'elapsed': 0.002,
+                                'game_state': {'positions': {}}})
+                records.append({'game': game, 'call': 'update', 'player_id': 'p01', 'elapsed': 0.004,
+                                'game_state': {'move_made': True, 'answer': {'from_player': holder, 'card': card}}})
+                records.append({'game': game, 'call': 'update', 'player_id': 'p02', 'elapsed': 0.001,
+                                'game_state': {'answer': {'from_player': holder, 'has_card': True},
+                                               'cards': [card, 'Plum', 'Knife']}})
+
+        return records
+
+    def test_game_metrics_measure_deduction_lag_against_omniscient_pad(self):
+        """
+        Tests that the omniscient pad is solved once p03's cards are shown and p01 once p02's cards are also shown,
+        and that a truncated line and an unfinished interleaved game don't stop the replay.
+        """
+        records = self._game('g1')
+        unfinished = self._game('g2')[:5]
+        records = records[:3] + unfinished + records[3:] + [{'game': 'g1', 'call': 'end'}]
+
+        path = self._write_trace('trace.jsonl.gz', records, extra_lines=['{"game": "g2", "call": "upd'])
+
+        self.assertEqual(sum(1 for _ in read_trace(path)), len(records))
+
+        metrics = list(analyze_trace(path))
+        self.assertEqual([game['game'] for game in metrics], ['g1', 'g2'])
+
+        game = metrics[0]
+        self.assertEqual(game['turns'], 12)
+        self.assertEqual(game['omniscient_solved_turn'], 6)
+
+        self.assertEqual(game['players']['p01']['solved_turn'], 12)
+        self.assertEqual(game['players']['p01']['lag'], 6)
+        self.assertEqual(game['players']['p01']['decisions'], 24)
+        self.assertAlmostEqual(game['players']['p01']['decision_time_mean'], 0.003)
+        self.assertAlmostEqual(game['players']['p01']['decision_time_max'], 0.004)
+
+        # p02 only ever hears that a player has one of the cards
+        self.assertIsNone(game['players']['p02']['solved_turn'])
+        self.assertIsNone(game['players']['p02']['lag'])
+
+        self.assertEqual(metrics[1]['turns'], 1)
+
+    def test_replay_marks_pads_as_the_players_did(self):
+        """
+        Tests that a replayed player ends the game with the pad of a player sent the same records.
+        """
+        records = self._game('g1')
+        records.insert(3, {'game': 'g1', 'call': 'update', 'player_id': 'p02',
+                           'game_state': {'suggestion': {'from_player': 'p03', 'cards': ['Plum', 'Rope', 'Hall']}}})
+
+        replay = GameReplay('g1', ['p01', 'p02', 'p03'])
+        player = Player('p02', ['Mustard'], 3)
+        for record in records[1:]:
+            replay.replay(record)
+            if record['player_id'] == 'p02':
+                if record['call'] == 'receive_cards':
+                    player.receive_cards(record['cards'])
+                else:
+                    player.update(record['game_state'])
+
+        replayed = replay._replayed['p02']
+        self.assertEqual(replayed._get_state()['pad'], player._get_state()['pad'])
+        self.assertEqual(replayed._pad.suggestion_count('p03', 'Rope'), 1)
+        self.assertEqual(replayed._pad.c2_groups('p03'), player._pad.c2_groups('p03'))
+
+    def test_bad_records_end_only_their_game(self):
+        """
+        Tests that a game with a record that can't be replayed reports the error and the records skipped, and that
+        the other games of the trace, and a game started without its players, don't stop the replay.
+        """
+        bad = self._game('g1')[:4]
+        # failed moves are acknowledged more times than the replayed player has moves to take back, since its turns
+        # aren't replayed
+        bad += [{'game': 'g1', 'call': 'update', 'player_id': 'p01', 'game_state': {'move_made': False}}] * 3
+        bad += self._game('g1')[4:7] + [{'game': 'g1', 'call': 'end'}]
+
+        records = [{'game': 'g0', 'call': 'start'}] + bad + self._game('g2') + [{'game': 'g2', 'call': 'end'}]
+        path = self._write_trace('trace.jsonl', records)
+
+        metrics = list(analyze_trace(path))
+        self.assertEqual([game['game'] for game in metrics], ['g1', 'g2'])
+
+        self.assertTrue(metrics[0]['error'].startswith('IndexError'))
+        self.assertEqual(metrics[0]['skipped_records'], 5)
+
+        self.assertIsNone(metrics[1]['error'])
+        self.assertEqual(metrics[1]['skipped_records'], 0)
+        self.assertEqual(metrics[1]['players']['p01']['lag'], 6)
+
+    def test_traces_are_analyzed_in_parallel(self):
+        """
+        Tests that each file's games are analyzed by the worker processes.
+        """
+        paths = [self._write_trace('trace_{0}.jsonl'.format(x), self._game('g' + str(x)) +
+                                   [{'game': 'g' + str(x), 'call': 'end'}]) for x in range(3)]
+
+        results = dict(analyze_traces(paths, processes=2))
+
+        self.assertEqual(sorted(results), sorted(paths))
+        for path in paths:
+            self.assertEqual(len(results[path]), 1)
+            self.assertEqual(results[path][0]['players']['p01']['lag'], 6)
@@ -0,0 +1,251 @@
+import json
+import gzip
+from multiprocessing import Pool
+
+from auto.automaton import Player
+from auto.pad import Pad
+from auto.playermatrix import _suspects
+
+"""
+    :module:: traces
+    :platform: Unix, Windows
+    :synopsis: Streaming replay of logged game traces through pads and per-game analytics.
+
+A trace is a log of the messages sent to the computer players during games, one json object per line:
+
+    the start of a game:    {'game': <str>, 'call': 'start', 'players': [player_id<str>, ...]}
+    the cards dealt:        {'game': <str>, 'call': 'receive_cards', 'player_id': <str>, 'cards': [<str>, ...]}
+    a turn or an update:    {'game': <str>, 'call': 'take_turn' | 'update', 'player_id': <str>,
+                             'game_state': <dict>, 'elapsed': seconds<float>}
+    the end of a game:      {'game': <str>, 'call': 'end'}
+
+The game states are the ones documented in auto.automaton.Player.update and take_turn. Lines of different games
+can be interleaved. A game missing its end line is closed when the trace ends. A record that can't be replayed,
+such as one that is malformed or out of order, ends the replay of its game only: the game's metrics hold the error
+and the number of records skipped, and the other games of the trace are replayed as usual.
+
+"""
+
+
+def read_trace(path):
+    """
+    Read the records of a trace one line at a time. Only the current line is held in memory, so traces of any size
+    can be read. Traces ending in .gz are decompressed as they are read.
+
+    :param path: path of the trace file
+    :rtype : generator<dict>
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+
+    with opener(path, 'rt') as trace_file:
+        for line in trace_file:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # a line cut off by a crash or a log rotation is skipped rather than ending the replay
+                continue
+
+
+class GameReplay:
+    """
+    Replays one game's records through an auto.automaton.Player for each player in the trace, so that each pad is
+    marked by the same update code as in the game, and through an omniscient pad.
+
+    The omniscient pad pools everything known at the table: the cards dealt to every traced player and every card
+    shown to any player. The turn at which a pad is solved is the first turn after which three or fewer of its cards
+    are unknown, which is when auto.automaton.Player would accuse. The deduction lag of a player is the number of
+    turns it is solved after the omniscient pad.
+
+    """
+
+    def __init__(self, game, players):
+        """
+        :param game: the id of the game
+        :param players: the ids of the players at the table <list<string>>
+
+        :var
+            _replayed: dictionary<player_id<string>:auto.automaton.Player>, created for players as their records are
+            replayed
+            _omniscient: auto.pad.Pad
+            _turns: int, take_turn records replayed so far
+            _solved: dictionary<player_id<string>:int>, the turn each pad was solved
+            _decisions: dictionary<player_id<string>:list>, [count, total seconds, most seconds] for each player
+            _error: string, the error of the first record that couldn't be replayed, or None
+            _skipped: int, the records not replayed since that error, including the record that raised it
+        """
+        self.game = game
+        self._players = list(players)
+        self._replayed = {}
+        self._omniscient = Pad(len(self._players), self._players)
+        self._omniscient_solved = None
+        self._turns = 0
+        self._solved = {}
+        self._decisions = {}
+        self._error = None
+        self._skipped = 0
+
+    def replay(self, record):
+        """
+        Apply one record of the game to the pads. Once a record has failed, the pads no longer follow the game, so
+        the game's later records are skipped.
+
+        :param record: a trace record (see the module documentation)
+        """
+        if self._error is None:
+            try:
+                self._replay(record)
+                return
+            except Exception as error:
+                self._error = '{0}: {1}'.format(type(error).__name__, error)
+
+        self._skipped += 1
+
+    def _replay(self, record):
+        call = record.get('call')
+        player_id = record.get('player_id')
+
+        if call == 'take_turn':
+            self._turns += 1
+
+        if player_id is not None and player_id in self._players:
+            player = self._get_player(player_id)
+            pad = player._pad
+
+            if call == 'receive_cards':
+                player.receive_cards(record['cards'])
+                for card in record['cards']:
+                    self._omniscient.mark_card(player_id, card)
+            elif call == 'update':
+                game_state = record.get('game_state') or {}
+                player.update(game_state)
+
+                # every card shown to a player is known at the table
+                answer = game_state.get('answer')
+                if Player._is_directed_answer(game_state) and isinstance(answer, dict) and 'card' in answer:
+                    self._omniscient.mark_card(answer['from_player'], answer['card'])
+
+            if 'elapsed' in record:
+                decisions = self._decisions.setdefault(player_id, [0, 0.0, 0.0])
+                decisions[0] += 1
+                decisions[1] += record['elapsed']
+                decisions[2] = max(decisions[2], record['elapsed'])
+
+            if player_id not in self._solved and self._is_solved(pad):
+                self._solved[player_id] = self._turns
+
+        if self._omniscient_solved is None and self._is_solved(self._omniscient):
+            self._omniscient_solved = self._turns
+
+    def metrics(self):
+        """
+        :rtype : dict
+        :return: the turns the game took, the replay error (None if every record was replayed) and the records
+        skipped, and for each player, the turn it was solved (None if it never was), the deduction lag in turns and
+        the number, mean and most seconds of its decisions
+        """
+        players = {}
+        for player_id in self._replayed:
+            solved = self._solved.get(player_id)
+            count, total, most = self._decisions.get(player_id, [0, 0.0, 0.0])
+
+            players[player_id] = {
+                'solved_turn': solved,
+                'lag': solved - self._omniscient_solved
+                if solved is not None and self._omniscient_solved is not None else None,
+                'decisions': count,
+                'decision_time_mean': total / count if count else 0.0,
+                'decision_time_max': most}
+
+        return {'game': self.game, 'turns': self._turns, 'omniscient_solved_turn': self._omniscient_solved,
+                'error': self._error, 'skipped_records': self._skipped, 'players': players}
+
+    def _get_player(self, player_id):
+        """
+        Gets the replayed player of a traced player, creating it on the player's first record. The suspect it plays
+        doesn't matter, since its turns aren't replayed.
+
+        :rtype : auto.automaton.Player
+        """
+        player = self._replayed.get(player_id)
+        if player is None:
+            player = self._replayed[player_id] = Player(player_id, sorted(_suspects)[:1], len(self._players),
+                                                        player_ids=self._players)
+
+        return player
+
+    @staticmethod
+    def _is_solved(pad):
+        """
+        :rtype : bool
+        """
+        return len(pad.unknown_cards()) <= 3
+
+
+def analyze_trace(path):
+    """
+    Replay a trace and yield the metrics of each game as the game ends. Only the games in progress are held in
+    memory, so memory use doesn't grow with the size of the trace.
+
+    :param path: path of the trace file
+    :rtype : generator<dict>
+    :return: the metrics of each game (see GameReplay.metrics)
+    """
+    games = {}
+
+    for record in read_trace(path):
+        game = record.get('game')
+        call = record.get('call')
+
+        if call == 'start':
+            # a game started without its players can't be replayed, so its records are ignored
+            if isinstance(record.get('players'), list):
+                games[game] = GameReplay(game, record['players'])
+        elif call == 'end':
+            if game in games:
+                yield games.pop(game).metrics()
+        elif game in games:
+            games[game].replay(record)
+
+    # games the trace ends in the middle of
+    for replay in games.values():
+        yield replay.metrics()
+
+
+def analyze_traces(paths, processes=None):
+    """
+    Analyze trace files in parallel, one file per worker process at a time.
+
+    :param paths: paths of the trace files <list<string>>
+    :param processes: the number of worker processes, defaults to the number of CPUs
+    :rtype : generator<tuple<string, list<dict>>>
+    :return: each path with the metrics of its games, in the order the files finish
+    """
+    with Pool(processes) as pool:
+        for result in pool.imap_unordered(_analyze_trace_file, paths):
+            yield result
+
+
+def _analyze_trace_file(path):
+    """
+    Worker for analyze_traces. The metrics of a file's games are small, so they are sent back together.
+    """
+    return path, list(analyze_trace(path))
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(description='replay game traces and write the metrics of each game as json lines')
+    parser.add_argument('traces', nargs='+', help='trace files, one json message per line (.gz for compressed)')
+    parser.add_argument('-j', '--processes', type=int, default=None, help='worker processes, defaults to CPUs')
+
+    args = parser.parse_args()
+
+    for trace_path, game_metrics in analyze_traces(args.traces, args.processes):
+        for metrics in game_metrics:
+            metrics['trace'] = trace_path
+            sys.stdout.write(json.dumps(metrics) + '\n')
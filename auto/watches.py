@@ -0,0 +1,147 @@
+"""
+    :module:: watches
+    :platform: Unix, Windows
+    :synopsis: Watched cards for resolving the groups of cards that players are known to hold one of.
+
+"""
+
+
+class WatchedGroups:
+    """
+    Resolves the c2 groups of a pad as cards are marked in c1. A group is the three cards of an undirected answer:
+    the answering player holds at least one of them. A card of the group is still possible for that player until
+    another player is marked as holding it. When only one card of a group is still possible, the player must hold
+    it and the card is forced into c1.
+
+    Every group added is also kept for the player it was added for, resolved or not, so the pad can list each
+    answer as its own group (see auto.pad.Pad.c2_groups).
+
+    Each pending group watches two of its possible cards and is only looked at again when one of those two cards is
+    marked in c1, so marking a card doesn't scan every group of every player.
+
+    """
+
+    def __init__(self):
+        """
+        :var
+            _watching: dictionary<card<string>:list<_Group>>, the groups watching each card
+            _groups: dictionary<player_id<string>:dictionary<frozenset<string>:None>>, the groups added for each
+                player, in the order they were first added
+        """
+        self._watching = {}
+        self._groups = {}
+
+    def groups(self, player_id):
+        """
+        :param player_id: id of a player
+        :rtype : list<frozenset<string>>
+        :return: the groups added for the player, pending or not, in the order they were first added
+        """
+        return list(self._groups.get(player_id, ()))
+
+    def add(self, pad, player_id, cards):
+        """
+        Start watching a group.
+
+        :param pad: the auto.pad.Pad the group was marked on
+        :param player_id: id of the player that holds one of the cards
+        :param cards: the cards of the group <iterable<string>>
+        :rtype : list<tuple<string, string>>
+        :return: (player_id, card) for a card the player is forced to hold, if any
+        """
+        group = _Group(player_id, sorted(set(cards)))
+
+        # a repeated answer is kept once
+        self._groups.setdefault(player_id, {}).setdefault(frozenset(group.cards), None)
+
+        if self._is_satisfied(pad, group) or self._is_watched(group):
+            return []
+
+        possible = [card for card in group.cards if self._is_possible(pad, player_id, card)]
+
+        # with no possible card left the answer contradicts the pad, so there is nothing to deduce from it
+        if len(possible) < 2:
+            return [(player_id, card) for card in possible]
+
+        group.watched = possible[:2]
+        for card in group.watched:
+            self._watching.setdefault(card, []).append(group)
+
+        return []
+
+    def card_held(self, pad, player_id, card):
+        """
+        Look at the groups watching a card that has just been marked in c1.
+
+        :param pad: the auto.pad.Pad the card was marked on
+        :param player_id: id of the player holding the card
+        :param card: the card marked
+        :rtype : list<tuple<string, string>>
+        :return: (player_id, card) for each card a player is now forced to hold
+        """
+        forced = []
+
+        for group in list(self._watching.get(card, ())):
+            # the player holds one of the cards of their own group
+            if group.player_id == player_id or self._is_satisfied(pad, group):
+                self._drop(group)
+                continue
+
+            # the card is no longer possible for the player. Watch another possible card instead
+            replacement = next((other for other in group.cards if other not in group.watched and
+                                self._is_possible(pad, group.player_id, other)), None)
+
+            if replacement is not None:
+                self._watching[card].remove(group)
+                group.watched[group.watched.index(card)] = replacement
+                self._watching.setdefault(replacement, []).append(group)
+            else:
+                # the other watched card is the only one left
+                self._drop(group)
+
+                remaining = group.watched[1 - group.watched.index(card)]
+                if self._is_possible(pad, group.player_id, remaining):
+                    forced.append((group.player_id, remaining))
+
+        return forced
+
+    def _is_watched(self, group):
+        """
+        :rtype : bool
+        :return: true if the same group is already being watched, as after a repeated answer
+        """
+        return any(other.player_id == group.player_id and other.cards == group.cards
+                   for card in group.cards for other in self._watching.get(card, ()))
+
+    def _drop(self, group):
+        for card in group.watched:
+            self._watching[card].remove(group)
+
+    @staticmethod
+    def _is_satisfied(pad, group):
+        """
+        :rtype : bool
+        :return: true if the player is marked as holding one of the cards of the group
+        """
+        return any(pad.has_card(group.player_id, card) for card in group.cards)
+
+    @staticmethod
+    def _is_possible(pad, player_id, card):
+        """
+        :rtype : bool
+        :return: true if no other player is marked as holding the card
+        """
+        return not any(pad.has_card(other, card) for other in pad.players_list if other != player_id)
+
+
+class _Group:
+    """
+    A group of cards that a player holds at least one of and the two cards of the group being watched.
+
+    """
+    __slots__ = ('player_id', 'cards', 'watched')
+
+    def __init__(self, player_id, cards):
+        self.player_id = player_id
+        self.cards = cards
+        self.watched = []
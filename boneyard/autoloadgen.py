@@ -0,0 +1,203 @@
+import socket
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+"""
+A load generator for the game server protocol. Simulates concurrent tables of scripted server/human clients that
+send the game states a computer player receives during a game and reports throughput, latency and error rates.
+
+Each message is sent the way autoclient_integration_test sends it: a json object literal on a new connection to the
+server, which answers with a json object literal.
+
+"""
+
+SUSPECTS = ['Scarlet', 'Plum', 'Mustard', 'Peacock', 'Green', 'White']
+ROOMS = ['Study', 'Hall', 'Lounge', 'Library', 'Billiard', 'Dining', 'Conservatory', 'Ballroom', 'Kitchen']
+WEAPONS = ['Knife', 'Wrench', 'Revolver', 'Pipe', 'Rope', 'Candlestick']
+STARTING_POSITIONS = ['Hallway_02', 'Hallway_03', 'Hallway_05', 'Hallway_08', 'Hallway_11', 'Hallway_12']
+
+
+def table_script(table, players, turns, rng):
+    """
+    Build the messages a server sends during a game at one table. Each player takes turns in order: positions are
+    sent to every player, the suggestion is asked of the other players, the asking player gets the answer and the
+    remaining players get the undirected answer.
+
+    :param table: the table number <int>
+    :param players: the number of players at the table (3 - 6) <int>
+    :param turns: the number of turns each player takes <int>
+    :param rng: random.Random used for choosing the suggested cards
+    :return: the messages to send, in order
+    :rtype: list<dict>
+    """
+    player_ids = ['p0' + str(x) for x in range(1, players + 1)]
+    positions = dict(zip(player_ids, STARTING_POSITIONS))
+
+    messages = [{'msg_type': 'enter_game', 'table': table, 'player_id': player_id} for player_id in player_ids]
+
+    for turn in range(turns):
+        for asking, player_id in enumerate(player_ids):
+            positions[player_id] = rng.choice(ROOMS)
+
+            for receiving_player in player_ids:
+                messages.append({'msg_type': 'positions', 'table': table, 'player_id': receiving_player,
+                                 'positions': dict(positions)})
+
+            cards = [positions[player_id], rng.choice(SUSPECTS), rng.choice(WEAPONS)]
+            answering = player_ids[(asking + 1) % players]
+
+            for receiving_player in player_ids:
+                if receiving_player != player_id:
+                    messages.append({'msg_type': 'suggestion', 'table': table, 'player_id': receiving_player,
+                                     'suggestion': {'from_player': player_id, 'cards': cards}})
+
+            messages.append({'msg_type': 'answer', 'table': table, 'player_id': player_id, 'move_made': True,
+                             'answer': {'from_player': answering, 'card': rng.choice(cards)}})
+
+            for receiving_player in player_ids:
+                if receiving_player != player_id:
+                    messages.append({'msg_type': 'answer', 'table': table, 'player_id': receiving_player,
+                                     'answer': {'from_player': answering, 'has_card': True}, 'cards': cards})
+
+            messages.append({'msg_type': 'move_made', 'table': table, 'player_id': player_id, 'move_made': True})
+
+    return messages
+
+
+def send_receive(server_address, send_msg, timeout):
+    """
+    Send one message on a new connection and wait for the server's json response.
+
+    :return: the response
+    :rtype: dict
+    """
+    with socket.create_connection(server_address, timeout=timeout) as connection:
+        connection.sendall(bytes(json.dumps(send_msg), 'UTF-8'))
+
+        received = b''
+        while True:
+            chunk = connection.recv(1024)
+            if not chunk:
+                break
+            received += chunk
+            try:
+                return json.loads(received.decode('UTF-8'))
+            except ValueError:
+                # the response isn't complete yet
+                continue
+
+    raise ConnectionError('connection closed without a response')
+
+
+def run_table(server_address, messages, timeout, results, lock):
+    """
+    Send a table's messages in order, timing each one. Connection and response errors are counted in the results.
+    Any other error is raised.
+    """
+    for send_msg in messages:
+        start = time.perf_counter()
+        try:
+            send_receive(server_address, send_msg, timeout)
+            error = None
+        except (OSError, ValueError) as e:
+            error = type(e).__name__
+        latency = time.perf_counter() - start
+
+        with lock:
+            results.append((send_msg['msg_type'], latency, error))
+
+
+def run(host='localhost', port=10000, tables=4, players=6, turns=5, timeout=5.0, seed=None):
+    """
+    Run the tables concurrently against the server and summarize the results.
+
+    :return: the summary with throughput in messages per second and latencies in milliseconds
+    :rtype: dict
+    :raise
+        any error raised by a table other than the connection and response errors counted in the summary
+    """
+    rng = random.Random(seed)
+    scripts = [table_script(table, players, turns, random.Random(rng.random())) for table in range(tables)]
+
+    results = []
+    lock = threading.Lock()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=tables) as executor:
+        futures = [executor.submit(run_table, (host, port), messages, timeout, results, lock) for messages in scripts]
+
+        # a table that failed would otherwise be left out of the summary without a word
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    return summarize(results, elapsed)
+
+
+def summarize(results, elapsed):
+    """
+    :param results: (msg_type, latency in seconds, error name or None) for each message sent
+    :param elapsed: seconds taken to send all of the messages
+    :rtype: dict
+    """
+    summary = {'messages': len(results),
+               'errors': sum(1 for result in results if result[2]),
+               'elapsed': elapsed,
+               'throughput': len(results) / elapsed if elapsed else 0.0,
+               'msg_types': {}}
+
+    summary.update(_latency_percentiles([result[1] for result in results]))
+
+    for msg_type in sorted({result[0] for result in results}):
+        typed = [result for result in results if result[0] == msg_type]
+        errors = sum(1 for result in typed if result[2])
+        summary['msg_types'][msg_type] = dict(messages=len(typed), errors=errors, error_rate=errors / len(typed),
+                                              **_latency_percentiles([result[1] for result in typed]))
+
+    return summary
+
+
+def _latency_percentiles(latencies):
+    """
+    :return: p50 and p99 of the latencies in milliseconds (nearest rank)
+    :rtype: dict
+    """
+    if not latencies:
+        return {'p50': 0.0, 'p99': 0.0}
+
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        return latencies[max(0, math.ceil(p / 100.0 * len(latencies)) - 1)] * 1000
+
+    return {'p50': percentile(50), 'p99': percentile(99)}
+
+
+def print_summary(summary):
+    print('{0} messages in {1:.2f}s: {2:.1f} messages/s, {3} errors ({4:.2%})'
+          .format(summary['messages'], summary['elapsed'], summary['throughput'], summary['errors'],
+                  summary['errors'] / summary['messages'] if summary['messages'] else 0.0))
+    print('latency p50 {0:.2f}ms p99 {1:.2f}ms'.format(summary['p50'], summary['p99']))
+
+    for msg_type, typed in summary['msg_types'].items():
+        print('\t{0:<12} {1:>7} messages  p50 {2:8.2f}ms  p99 {3:8.2f}ms  errors {4:.2%}'
+              .format(msg_type, typed['messages'], typed['p50'], typed['p99'], typed['error_rate']))
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='simulate concurrent game tables against the server on localhost')
+    parser.add_argument('-p', '--port', type=int, default=10000, help='server port')
+    parser.add_argument('-k', '--tables', type=int, default=4, help='number of concurrent tables')
+    parser.add_argument('-n', '--players', type=int, default=6, choices=range(3, 7), help='players at each table')
+    parser.add_argument('-t', '--turns', type=int, default=5, help='turns taken by each player')
+    parser.add_argument('--timeout', type=float, default=5.0, help='seconds to wait for each response')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the scripted suggestions')
+
+    args = parser.parse_args()
+
+    print_summary(run('localhost', args.port, args.tables, args.players, args.turns, args.timeout, args.seed))